@@ -18,12 +18,60 @@ SOCRATA_DATASETS = {
     "income": "prwj-nzxa",
     "cashflow": "ctcp-462n",
 }
+SOCRATA_SELECT_COLUMNS = (
+    "nit,fecha_corte,periodo,concepto,valor,"
+    "numero_radicado,id_punto_entrada,punto_entrada,id_taxonomia,codigo_instancia"
+)
+SOCRATA_PAGE_LIMIT = 5000
+# Opt-in: pages requested at once per dataset when a filer spans several
+# pages. Above 1 the remaining pages are fetched with $offset after a
+# count(*); the default 1 keeps sequential keyset paging.
+SOCRATA_PAGE_CONCURRENCY = 1
+SOCRATA_BULK_EXPORT_URL = "https://www.datos.gov.co/api/views/{dataset_id}/rows.csv?accessType=DOWNLOAD"
+SOCRATA_MIRROR_MMAP_BYTES = 256 * 1024 * 1024
+# A mirrored dataset older than this is ignored and queries go online again
+# until it is re-ingested; bulk exports do not include later filings.
+SOCRATA_MIRROR_MAX_AGE_SECONDS = 30 * 24 * 60 * 60
+# Opt-in: prune comparative periods and concepts no metric reads on the server.
+SOCRATA_REDUCED_PAYLOAD = False
 
 HTTP_TIMEOUT_SECONDS = 35
+SOCRATA_MAX_WORKERS = 3
+SOCRATA_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+SOCRATA_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Expired cache entries are topped up with newer filings only; a full
+# download still happens this often to pick up amendments to old periods.
+SOCRATA_FULL_RESYNC_SECONDS = 90 * 24 * 60 * 60
+SOCRATA_NIT_BATCH_SIZE = 100
+# Below this many rows the pure-Python normalizer beats pandas' setup cost.
+VECTORIZED_NORMALIZER_MIN_ROWS = 20_000
+# Distinct strings remembered by normalize_text, and raw concept labels
+# remembered by the shared concept vocabulary before it starts over.
+TEXT_NORMALIZE_CACHE_SIZE = 65_536
+CONCEPT_VOCABULARY_MAX_LABELS = 200_000
+# Statement layouts (ordered concept key sets) whose resolved metric roles
+# are remembered per matcher; most filers share a handful of NIIF layouts.
+CONCEPT_LAYOUT_CACHE_SIZE = 4096
+# Canonical debt concepts whose segment, core wording and base score are
+# remembered by the debt resolution.
+DEBT_CONCEPT_CACHE_SIZE = 16_384
 USER_AGENT = "AnalizadorEmpresasSupersociedades/1.0 (+https://www.supersociedades.gov.co/)"
 
 DEFAULT_LOOKBACK_YEARS = 7
 MAX_SEARCH_RESULTS = 50
+SEARCH_CACHE_TTL_SECONDS = 6 * 60 * 60
+SEARCH_CACHE_MAX_ENTRIES = 512
+SEARCH_CACHE_MAX_BYTES = 16 * 1024 * 1024
+# Each save rewrites the whole company name index, so portal harvests are
+# written at most this often; batches and shutdown flush the rest.
+COMPANY_INDEX_SAVE_INTERVAL_SECONDS = 60
+# Batch NIT lookups: parallel detail requests, and a per-host request rate
+# that keeps bulk enrichment polite towards the superwas portal.
+SEARCH_MAX_WORKERS = 4
+SUPERWAS_MAX_REQUESTS_PER_SECOND = 4.0
+# Financial rows for a highlighted company start downloading after this
+# pause, so scrolling through search results does not fire a request per row.
+PREFETCH_DELAY_SECONDS = 0.4
 
 BLUE_THEME = {
     "bg": "#E9F1FF",
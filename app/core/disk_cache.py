@@ -0,0 +1,175 @@
+﻿"""Persistent on-disk cache with TTL expiry and size-capped LRU eviction."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Sequence
+
+from app.core.paths import get_cache_path
+
+LOGGER = logging.getLogger(__name__)
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    stored_at: float
+
+
+class DiskCache:
+    """Store JSON-serializable values as gzip files under the app workspace.
+
+    Entries expire ``ttl_seconds`` after being written. File modification
+    times double as the LRU clock: reads touch the file, and when the
+    namespace grows past ``max_bytes`` the least recently used files are
+    deleted first. The namespace size is kept as a running total, so a write
+    only lists the folder when it pushes the total past the cap.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: float,
+        max_bytes: int,
+        root: Path | None = None,
+    ) -> None:
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._root = root
+        self._lock = threading.Lock()
+        # File name -> bytes, loaded from the folder on the first write.
+        self._sizes: Dict[str, int] | None = None
+        self._total_bytes = 0
+
+    @property
+    def folder(self) -> Path:
+        # Resolved lazily so building a service never touches the Desktop.
+        if self._root is None:
+            self._root = get_cache_path()
+        folder = self._root / self.namespace
+        folder.mkdir(parents=True, exist_ok=True)
+        return folder
+
+    def get(self, key: Sequence[str]) -> Any | None:
+        entry = self.get_entry(key)
+        if entry is None or not self.is_fresh(entry):
+            return None
+        return entry.value
+
+    def get_entry(self, key: Sequence[str]) -> CacheEntry | None:
+        """Return the stored entry even when expired, so callers can refresh it."""
+        path = self._path_for(key)
+        entry = self._read(path)
+        if entry is None:
+            return None
+        self._touch(path)
+        return CacheEntry(value=entry["value"], stored_at=float(entry["stored_at"]))
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return time.time() - entry.stored_at <= self.ttl_seconds
+
+    def set(self, key: Sequence[str], value: Any) -> None:
+        path = self._path_for(key)
+        payload = {"key": list(key), "stored_at": time.time(), "value": value}
+        data = gzip.compress(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            LOGGER.warning("Could not write cache entry %s", path, exc_info=True)
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            if self._sizes is None:
+                self._scan()
+            self._total_bytes += len(data) - self._sizes.get(path.name, 0)
+            self._sizes[path.name] = len(data)
+            over_cap = self._total_bytes > self.max_bytes
+        if over_cap:
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in self.folder.glob("*.json.gz"):
+                path.unlink(missing_ok=True)
+            self._sizes = {}
+            self._total_bytes = 0
+
+    def _path_for(self, key: Sequence[str]) -> Path:
+        digest = hashlib.sha1("\x1f".join(key).encode("utf-8")).hexdigest()
+        return self.folder / f"{digest}.json.gz"
+
+    def _read(self, path: Path) -> dict | None:
+        try:
+            raw = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError:
+            LOGGER.warning("Could not read cache entry %s", path, exc_info=True)
+            return None
+
+        try:
+            entry = json.loads(gzip.decompress(raw).decode("utf-8"))
+        except (OSError, EOFError, ValueError):
+            LOGGER.warning("Discarding corrupt cache entry %s", path)
+            self._discard(path)
+            return None
+
+        if not isinstance(entry, dict) or "stored_at" not in entry or "value" not in entry:
+            self._discard(path)
+            return None
+        return entry
+
+    def _discard(self, path: Path) -> None:
+        path.unlink(missing_ok=True)
+        with self._lock:
+            if self._sizes is not None:
+                self._total_bytes -= self._sizes.pop(path.name, 0)
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _scan(self) -> list[tuple[float, int, Path]]:
+        """List the namespace's files and reset the running size total (lock held)."""
+        files = []
+        self._sizes = {}
+        for path in self.folder.glob("*.json.gz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            self._sizes[path.name] = stat.st_size
+        self._total_bytes = sum(self._sizes.values())
+        return files
+
+    def _evict(self) -> None:
+        with self._lock:
+            # Rescan rather than trust the running total: other processes
+            # and instances may share the folder.
+            files = self._scan()
+            if self._total_bytes <= self.max_bytes:
+                return
+
+            files.sort()
+            for _, size, path in files:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                del self._sizes[path.name]
+                self._total_bytes -= size
+            LOGGER.info("Cache '%s' evicted down to %s bytes", self.namespace, self._total_bytes)
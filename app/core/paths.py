@@ -71,3 +71,17 @@ def get_temp_charts_path(create_if_missing: bool = True) -> Path:
     if create_if_missing:
         temp_charts.mkdir(parents=True, exist_ok=True)
     return temp_charts
+
+
+def get_cache_path(create_if_missing: bool = True) -> Path:
+    cache = get_app_workspace(create_if_missing=create_if_missing) / "cache"
+    if create_if_missing:
+        cache.mkdir(parents=True, exist_ok=True)
+    return cache
+
+
+def get_mirror_path(create_if_missing: bool = True) -> Path:
+    mirror = get_app_workspace(create_if_missing=create_if_missing) / "espejo_datos"
+    if create_if_missing:
+        mirror.mkdir(parents=True, exist_ok=True)
+    return mirror
@@ -0,0 +1,34 @@
+﻿"""Per-host request rate limiting shared across threads."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    """Space requests to each host at least ``1 / rate_per_second`` apart.
+
+    ``wait(url)`` reserves the next free slot for the URL's host and sleeps
+    until it arrives, so any number of worker threads together stay under
+    the rate. Different hosts never wait for each other.
+    """
+
+    def __init__(self, rate_per_second: float) -> None:
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot: Dict[str, float] = {}
+
+    def wait(self, url: str) -> None:
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
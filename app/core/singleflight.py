@@ -0,0 +1,64 @@
+﻿"""In-process request coalescing ("singleflight")."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable, Dict, Hashable, TypeVar
+
+LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: object = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run at most one in-flight call per key; concurrent callers share it.
+
+    The first caller for a key executes ``func``. Callers arriving while it
+    runs block until it finishes and receive the same result object (or the
+    same exception). Nothing is cached afterwards: the next call after
+    completion starts a fresh execution. Shared results must be treated as
+    read-only by callers.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            LOGGER.debug("Joining in-flight request key=%s", key)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result  # type: ignore[return-value]
+
+        try:
+            call.result = func()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            if call.waiters:
+                LOGGER.info("Shared one request with %s waiting callers key=%s", call.waiters, key)
+            call.done.set()
+        return call.result  # type: ignore[return-value]
@@ -0,0 +1,79 @@
+﻿"""Indicator formulas evaluated over many company-years at once with NumPy."""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Mapping, Tuple
+
+import numpy as np
+
+from app.finance.indicators import LINE_ITEMS, resolve_line_items
+
+ConceptMaps = Tuple[Dict[str, float], Dict[str, float], Dict[str, float]]
+
+
+def line_item_arrays(statements: Iterable[ConceptMaps]) -> Dict[str, np.ndarray]:
+    """Resolve ``(income, balance, cashflow)`` concept maps into one array per line item.
+
+    Element ``i`` of every array belongs to the ``i``-th statement triple and
+    missing items are NaN. Reshape the arrays to ``(company, year)`` (or any
+    other shape) before handing them to ``compute_metrics_batch``.
+    """
+    columns: Dict[str, list] = {name: [] for name in LINE_ITEMS}
+    for income, balance, cashflow in statements:
+        items = resolve_line_items(income, balance, cashflow)
+        for name in LINE_ITEMS:
+            value = items[name]
+            columns[name].append(np.nan if value is None else value)
+    return {name: np.array(values, dtype=np.float64) for name, values in columns.items()}
+
+
+def _safe_div(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return np.where(denominator == 0, np.nan, numerator / denominator)
+
+
+def compute_metrics_batch(items: Mapping[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Vectorized twin of the metrics computed by ``compute_year_snapshot``.
+
+    ``items`` maps ``LINE_ITEMS`` names to equally shaped (or broadcastable)
+    arrays, NaN meaning "not reported"; absent names count as missing
+    everywhere. Returns the same metric keys as the snapshot, each an array
+    of that shape, with NaN wherever the snapshot would report ``None``.
+    Operations follow the scalar code in the same order, so values agree
+    exactly with ``compute_year_snapshot``.
+    """
+    given = {name: np.asarray(items[name], dtype=np.float64) for name in LINE_ITEMS if name in items}
+    shape = np.broadcast_shapes(*(array.shape for array in given.values()))
+    item = {name: np.broadcast_to(given.get(name, np.nan), shape) for name in LINE_ITEMS}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ingresos = item["ingresos"]
+        ebit = item["ebit"]
+        reported_ebitda = item["ebitda_reportado"]
+        ebitda = np.where(
+            np.isnan(reported_ebitda),
+            ebit + np.where(np.isnan(item["dep_amort"]), 0.0, item["dep_amort"]),
+            reported_ebitda,
+        )
+
+        capital_neto_trabajo = item["activos_corrientes"] - item["pasivos_corrientes"]
+        dias_capital_trabajo = _safe_div(capital_neto_trabajo, ingresos) * 365
+
+        activos_totales = item["activos_totales"]
+        x1 = _safe_div(capital_neto_trabajo, activos_totales)
+        x2 = _safe_div(item["ganancias_acumuladas"], activos_totales)
+        x3 = _safe_div(ebit, activos_totales)
+        x4 = _safe_div(item["patrimonio_total"], item["pasivos_totales"])
+        z_altman = 6.56 * x1 + 3.26 * x2 + 6.72 * x3 + 1.05 * x4
+
+    return {
+        "ingresos": ingresos.copy(),
+        "utilidad_neta": item["utilidad_neta"].copy(),
+        "ebitda": ebitda,
+        "gastos_operacionales": item["gastos_operacionales"].copy(),
+        "capital_neto_trabajo": capital_neto_trabajo,
+        "deuda": item["deuda"].copy(),
+        "dias_capital_trabajo": dias_capital_trabajo,
+        "flujo_caja": item["flujo_caja"].copy(),
+        "z_altman": z_altman,
+        "balance_general": activos_totales.copy(),
+    }
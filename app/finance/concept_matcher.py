@@ -0,0 +1,175 @@
+﻿"""Compiled lookup of metric roles (ingresos, ebit, ...) in a concept map."""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from itertools import accumulate
+from typing import Callable, Dict, Generic, Mapping, Sequence, Tuple, TypeVar
+
+from app.config import CONCEPT_LAYOUT_CACHE_SIZE, ConceptPatterns
+from app.utils.text import CONCEPT_VOCABULARY
+
+T = TypeVar("T")
+
+
+class LayoutCache(Generic[T]):
+    """Bounded LRU of results that depend only on a statement's concept keys.
+
+    The key is the tuple of concept keys in map order (first-match results
+    depend on order, so a set would not do). Concept keys are interned
+    strings with cached hashes, which makes a lookup cheap next to
+    re-resolving the layout. Cached values are shared and must not be
+    mutated by callers.
+    """
+
+    def __init__(self, max_entries: int = CONCEPT_LAYOUT_CACHE_SIZE) -> None:
+        self.max_entries = max(1, max_entries)
+        self._entries: OrderedDict[Tuple[str, ...], T] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, concepts: Mapping[str, object], compute: Callable[[], T]) -> T:
+        layout = tuple(concepts)
+        with self._lock:
+            value = self._entries.get(layout)
+            if value is not None:
+                self._entries.move_to_end(layout)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            self._entries[layout] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+@dataclass(frozen=True)
+class _FirstRole:
+    name: str
+    exact: Tuple[str, ...]
+    needles: Tuple[str, ...]
+
+
+@dataclass
+class ConceptMatch:
+    """Concept keys chosen for each role of one statement.
+
+    ``first`` holds the single source concept of every pattern role (or
+    ``None``); ``summed`` the concepts, in map order, added up by every
+    sum role. Only keys are kept, so a match can be reused for any concept
+    map with the same keys.
+    """
+
+    first: Dict[str, str | None] = field(default_factory=dict)
+    summed: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+
+    def value(self, concepts: Mapping[str, float], role: str) -> float | None:
+        key = self.first.get(role)
+        return None if key is None else concepts[key]
+
+    def total(self, concepts: Mapping[str, float], role: str) -> float | None:
+        keys = self.summed.get(role)
+        if not keys:
+            return None
+        return float(sum(concepts[key] for key in keys))
+
+
+class ConceptMatcher:
+    """Resolve every metric role of a statement with a few C-level scans.
+
+    Pattern roles keep ``_find_value`` semantics: the first ``exact`` label
+    present wins; otherwise the earliest ``contains`` needle found anywhere,
+    and for that needle the first concept in map order. Sum roles keep
+    ``_sum_if_contains`` semantics: every concept containing any needle.
+
+    Patterns are canonicalized once here. ``match`` joins the keys into one
+    newline-separated text (no needle contains a newline, so nothing matches
+    across keys), locates needles with ``str.find`` and maps offsets back to
+    keys by bisection, instead of testing every needle against every key in
+    Python. A pattern needle is searched at most once per call however many
+    roles share it. Matches are cached per layout, so a statement shaped
+    like one seen before costs a single ``LayoutCache`` lookup.
+    """
+
+    def __init__(
+        self,
+        patterns: Mapping[str, ConceptPatterns],
+        sums: Mapping[str, Sequence[str]] | None = None,
+        cache_size: int = CONCEPT_LAYOUT_CACHE_SIZE,
+    ) -> None:
+        self.layouts: LayoutCache[ConceptMatch] = LayoutCache(cache_size)
+        self._first_roles = [
+            _FirstRole(
+                name=name,
+                exact=tuple(CONCEPT_VOCABULARY.canonical(label) for label in pattern.exact),
+                needles=tuple(CONCEPT_VOCABULARY.canonical(needle) for needle in pattern.contains),
+            )
+            for name, pattern in patterns.items()
+        ]
+        self._sum_roles = {
+            name: tuple(dict.fromkeys(CONCEPT_VOCABULARY.canonical(needle) for needle in needles))
+            for name, needles in (sums or {}).items()
+        }
+
+    def match(self, concepts: Mapping[str, object]) -> ConceptMatch:
+        return self.layouts.get(concepts, lambda: self._resolve(concepts))
+
+    def _resolve(self, concepts: Mapping[str, object]) -> ConceptMatch:
+        result = ConceptMatch()
+        keys = list(concepts)
+        if not keys:
+            result.first = {role.name: None for role in self._first_roles}
+            result.summed = {name: () for name in self._sum_roles}
+            return result
+
+        text = "\n".join(keys)
+        # ends[i] is where key i + 1 starts, so bisect_right gives the key index.
+        ends = list(accumulate(map((1).__add__, map(len, keys))))
+        positions: Dict[str, int] = {}
+
+        for role in self._first_roles:
+            source = None
+            for key in role.exact:
+                if key in concepts:
+                    source = key
+                    break
+            else:
+                for needle in role.needles:
+                    position = positions.get(needle)
+                    if position is None:
+                        position = positions[needle] = text.find(needle)
+                    if position >= 0:
+                        source = keys[bisect_right(ends, position)]
+                        break
+            result.first[role.name] = source
+
+        for name, needles in self._sum_roles.items():
+            indexes = set()
+            for needle in needles:
+                position = text.find(needle)
+                while position >= 0:
+                    index = bisect_right(ends, position)
+                    indexes.add(index)
+                    position = text.find(needle, ends[index])
+            result.summed[name] = tuple(keys[index] for index in sorted(indexes))
+        return result
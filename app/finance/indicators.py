@@ -3,16 +3,21 @@
 from __future__ import annotations
 
 import re
-from typing import Callable, Dict, Iterable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Tuple
 
 from app.config import (
     BALANCE_CONCEPT_PATTERNS,
     CASHFLOW_CONCEPT_PATTERNS,
+    DEBT_CONCEPT_CACHE_SIZE,
     DEP_AMORT_CONTAINS,
     INCOME_CONCEPT_PATTERNS,
     OPERATING_EXPENSE_CONTAINS,
+    ConceptPatterns,
 )
-from app.utils.text import normalize_text
+from app.finance.concept_matcher import ConceptMatcher, LayoutCache
+from app.utils.text import CONCEPT_VOCABULARY, normalize_text
 
 DEBT_INCLUDE_TERMS = [
     "obligaciones financieras",
@@ -41,15 +46,64 @@ DEBT_TOTAL_HINTS = [
     "total pasivos financieros",
 ]
 
+# Matchers compiled once from the pattern tables. "gastos_operacionales" is
+# both a sum role (itemized expense lines) and a pattern role used as the
+# fallback when no itemized line exists.
+INCOME_MATCHER = ConceptMatcher(
+    {
+        **INCOME_CONCEPT_PATTERNS,
+        "gastos_operacionales": ConceptPatterns(
+            exact=["gastos operacionales"],
+            contains=["gastos operacionales"],
+        ),
+    },
+    sums={
+        "dep_amort": DEP_AMORT_CONTAINS,
+        "gastos_operacionales": OPERATING_EXPENSE_CONTAINS,
+    },
+)
+BALANCE_MATCHER = ConceptMatcher(BALANCE_CONCEPT_PATTERNS)
+CASHFLOW_MATCHER = ConceptMatcher(CASHFLOW_CONCEPT_PATTERNS)
+
+# Inputs of the metric formulas, as returned by resolve_line_items.
+LINE_ITEMS = (
+    "ingresos",
+    "utilidad_neta",
+    "ebit",
+    "ebitda_reportado",
+    "dep_amort",
+    "gastos_operacionales",
+    "activos_corrientes",
+    "pasivos_corrientes",
+    "activos_totales",
+    "pasivos_totales",
+    "patrimonio_total",
+    "ganancias_acumuladas",
+    "deuda",
+    "flujo_caja",
+)
+
+
+def concept_layout_cache_stats() -> Dict[str, Dict[str, float]]:
+    """Hit rates of the per-layout role caches, for logging."""
+    return {
+        "income": INCOME_MATCHER.layouts.stats(),
+        "balance": BALANCE_MATCHER.layouts.stats(),
+        "cashflow": CASHFLOW_MATCHER.layouts.stats(),
+        "debt": _DEBT_LAYOUTS.stats(),
+        "debt_concepts": _debt_concept_cache_stats(),
+    }
 
+
+# Straightforward per-call lookups; ConceptMatcher must agree with these.
 def _find_value(concepts: Dict[str, float], exact: Iterable[str], contains: Iterable[str]) -> float | None:
     for candidate in exact:
-        key = normalize_text(candidate)
+        key = CONCEPT_VOCABULARY.canonical(candidate)
         if key in concepts:
             return concepts[key]
 
     for needle in contains:
-        target = normalize_text(needle)
+        target = CONCEPT_VOCABULARY.canonical(needle)
         for concept_key, value in concepts.items():
             if target in concept_key:
                 return value
@@ -59,7 +113,7 @@ def _find_value(concepts: Dict[str, float], exact: Iterable[str], contains: Iter
 
 def _sum_if_contains(concepts: Dict[str, float], needles: Iterable[str]) -> float | None:
     matches = []
-    normalized_needles = [normalize_text(n) for n in needles]
+    normalized_needles = [CONCEPT_VOCABULARY.canonical(n) for n in needles]
     for concept_key, value in concepts.items():
         for needle in normalized_needles:
             if needle in concept_key:
@@ -81,11 +135,51 @@ def _contains_any(text: str, terms: Iterable[str]) -> bool:
     return any(term in text for term in terms)
 
 
-def _debt_candidate_score(concept: str, value: float) -> float:
+# Words dropped from a debt concept to get its core ("obligaciones
+# financieras no corrientes con bancos" -> "con bancos"). "no corrientes" is
+# tried before "corrientes" so that, as in sequential substitution, the
+# longer phrase wins.
+_DEBT_NOISE_WORDS = re.compile(
+    r"\botros?\b|\btotales?\b|\bpasivos?\b|\bobligaciones?\b|\bfinancier[oa]s?\b"
+    r"|\bdeuda\b|\bprestamos?\b|\bno corrientes?\b|\bcorrientes?\b"
+    r"|\bcorto plazo\b|\blargo plazo\b"
+)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class _DebtConcept:
+    """Value-independent facts about one canonical debt concept."""
+
+    segment: str
+    core: str
+    base_score: float
+
+
+# Balance layout -> (raw key, _DebtConcept) of every debt-like line.
+_DEBT_LAYOUTS: LayoutCache[tuple[tuple[str, _DebtConcept], ...]] = LayoutCache()
+
+
+@lru_cache(maxsize=DEBT_CONCEPT_CACHE_SIZE)
+def _debt_concept(concept: str) -> _DebtConcept:
+    non_current = _contains_any(concept, DEBT_NON_CURRENT_HINTS)
+    current = not non_current and _contains_any(concept, DEBT_CURRENT_HINTS)
+    total_hint = _contains_any(concept, DEBT_TOTAL_HINTS)
+    if non_current:
+        segment = "non_current"
+    elif current:
+        segment = "current"
+    elif total_hint:
+        segment = "total"
+    else:
+        segment = "other"
+
+    # Integer weights add up exactly, so base_score + abs(value) ** 0.1 is
+    # the same float the per-candidate score always produced.
     score = 0.0
     if "deuda total" in concept:
         score += 150
-    if _contains_any(concept, DEBT_TOTAL_HINTS):
+    if total_hint:
         score += 120
     if "obligaciones financieras" in concept:
         score += 70
@@ -95,219 +189,131 @@ def _debt_candidate_score(concept: str, value: float) -> float:
         score += 60
     if "prestamo" in concept or "prestamos" in concept:
         score += 45
-    if _contains_any(concept, DEBT_CURRENT_HINTS) or _contains_any(concept, DEBT_NON_CURRENT_HINTS):
+    if non_current or _contains_any(concept, DEBT_CURRENT_HINTS):
         score += 20
-    score += abs(value) ** 0.1
-    return score
 
+    core = _WHITESPACE.sub(" ", _DEBT_NOISE_WORDS.sub(" ", normalize_text(concept))).strip()
+    return _DebtConcept(segment=segment, core=core or "deuda", base_score=score)
 
-def _pick_best_debt_candidate(
-    candidates: Iterable[tuple[str, float]],
-    predicate: Callable[[str], bool] | None = None,
-) -> tuple[str, float] | None:
-    best: tuple[str, float, float] | None = None
-    for concept, value in candidates:
-        if predicate and not predicate(concept):
-            continue
-        score = _debt_candidate_score(concept, value)
-        if (
-            best is None
-            or score > best[2]
-            or (score == best[2] and abs(value) > abs(best[1]))
-        ):
-            best = (concept, value, score)
-    if best is None:
-        return None
-    return best[0], best[1]
+
+def _debt_concept_cache_stats() -> Dict[str, int]:
+    info = _debt_concept.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+
+
+def _debt_concepts(balance_concepts: Dict[str, float]) -> tuple[tuple[str, _DebtConcept], ...]:
+    debt_concepts = []
+    for raw_concept in balance_concepts:
+        concept = CONCEPT_VOCABULARY.canonical(raw_concept)
+        if _contains_any(concept, DEBT_INCLUDE_TERMS) and not _contains_any(concept, DEBT_EXCLUDE_TERMS):
+            debt_concepts.append((raw_concept, _debt_concept(concept)))
+    return tuple(debt_concepts)
+
+
+def _is_better_debt_candidate(score: float, value: float, best: tuple[float, float] | None) -> bool:
+    """Higher score wins; ties go to the larger absolute value, then to the first seen."""
+    return best is None or score > best[1] or (score == best[1] and abs(value) > abs(best[0]))
 
 
 def _resolve_financial_debt(balance_concepts: Dict[str, float]) -> float | None:
-    candidates: list[tuple[str, float]] = []
-    for raw_concept, value in balance_concepts.items():
+    """Pick total financial debt, or current + non-current debt, from a balance sheet.
+
+    Lines that repeat the same debt (same segment and core wording, same
+    rounded amount) collapse to their best-scored line first. An explicit
+    total wins; otherwise the best current and best non-current lines are
+    added, and failing both the best line of any kind is used.
+    """
+    deduped: dict[str, tuple[float, float, _DebtConcept]] = {}
+    for raw_concept, debt in _DEBT_LAYOUTS.get(
+        balance_concepts, lambda: _debt_concepts(balance_concepts)
+    ):
+        value = balance_concepts[raw_concept]
         if value is None:
             continue
-        concept = normalize_text(raw_concept)
-        if not _contains_any(concept, DEBT_INCLUDE_TERMS):
-            continue
-        if _contains_any(concept, DEBT_EXCLUDE_TERMS):
-            continue
-        candidates.append((concept, float(value)))
+        value = float(value)
+        score = debt.base_score + abs(value) ** 0.1
+        dedupe_key = f"{debt.segment}|{debt.core}|{round(abs(value))}"
+        if _is_better_debt_candidate(score, value, deduped.get(dedupe_key)):
+            deduped[dedupe_key] = (value, score, debt)
 
-    if not candidates:
+    if not deduped:
         return None
 
-    def is_current(concept: str) -> bool:
-        return (not is_non_current(concept)) and _contains_any(concept, DEBT_CURRENT_HINTS)
-
-    def is_non_current(concept: str) -> bool:
-        return _contains_any(concept, DEBT_NON_CURRENT_HINTS)
-
-    def is_total(concept: str) -> bool:
-        if is_current(concept) or is_non_current(concept):
-            return False
-        return _contains_any(concept, DEBT_TOTAL_HINTS)
-
-    def concept_segment(concept: str) -> str:
-        if is_total(concept):
-            return "total"
-        if is_current(concept):
-            return "current"
-        if is_non_current(concept):
-            return "non_current"
-        return "other"
-
-    def concept_fingerprint(concept: str) -> str:
-        base = normalize_text(concept)
-        base = re.sub(r"\botros?\b", " ", base)
-        base = re.sub(r"\btotales?\b", " ", base)
-        base = re.sub(r"\bpasivos?\b", " ", base)
-        base = re.sub(r"\bobligaciones?\b", " ", base)
-        base = re.sub(r"\bfinancier[oa]s?\b", " ", base)
-        base = re.sub(r"\bdeuda\b", " ", base)
-        base = re.sub(r"\bprestamos?\b", " ", base)
-        base = re.sub(r"\bno corrientes?\b", " ", base)
-        base = re.sub(r"\bcorrientes?\b", " ", base)
-        base = re.sub(r"\bcorto plazo\b", " ", base)
-        base = re.sub(r"\blargo plazo\b", " ", base)
-        base = re.sub(r"\s+", " ", base).strip()
-        return f"{concept_segment(concept)}|{base or 'deuda'}"
-
-    def concept_core(concept: str) -> str:
-        base = normalize_text(concept)
-        base = re.sub(r"\botros?\b", " ", base)
-        base = re.sub(r"\btotales?\b", " ", base)
-        base = re.sub(r"\bpasivos?\b", " ", base)
-        base = re.sub(r"\bobligaciones?\b", " ", base)
-        base = re.sub(r"\bfinancier[oa]s?\b", " ", base)
-        base = re.sub(r"\bdeuda\b", " ", base)
-        base = re.sub(r"\bprestamos?\b", " ", base)
-        base = re.sub(r"\bno corrientes?\b", " ", base)
-        base = re.sub(r"\bcorrientes?\b", " ", base)
-        base = re.sub(r"\bcorto plazo\b", " ", base)
-        base = re.sub(r"\blargo plazo\b", " ", base)
-        return re.sub(r"\s+", " ", base).strip()
-
-    deduped: dict[str, tuple[str, float, float]] = {}
-    for concept, value in candidates:
-        fingerprint = concept_fingerprint(concept)
-        abs_rounded = round(abs(value))
-        dedupe_key = f"{fingerprint}|{abs_rounded}"
-        score = _debt_candidate_score(concept, value)
-        current = deduped.get(dedupe_key)
-        if (
-            current is None
-            or score > current[2]
-            or (score == current[2] and abs(value) > abs(current[1]))
-        ):
-            deduped[dedupe_key] = (concept, value, score)
-    candidates = [(concept, value) for concept, value, _ in deduped.values()]
-
-    total_candidate = _pick_best_debt_candidate(candidates, is_total)
-    if total_candidate is not None:
-        return total_candidate[1]
-
-    current_candidate = _pick_best_debt_candidate(candidates, is_current)
-    non_current_candidate = _pick_best_debt_candidate(candidates, is_non_current)
-    components = [c for c in [current_candidate, non_current_candidate] if c is not None]
+    best: dict[str, tuple[float, float, _DebtConcept]] = {}
+    for candidate in deduped.values():
+        for segment in (candidate[2].segment, "any"):
+            if _is_better_debt_candidate(candidate[1], candidate[0], best.get(segment)):
+                best[segment] = candidate
+
+    if "total" in best:
+        return best["total"][0]
+
     unique_components: dict[str, tuple[float, float]] = {}
-    for concept, value in components:
-        core = concept_core(concept)
-        dedupe_key = f"{core or 'deuda'}|{round(abs(value))}"
-        score = _debt_candidate_score(concept, value)
-        current = unique_components.get(dedupe_key)
-        if current is None or score > current[1] or (score == current[1] and abs(value) > abs(current[0])):
+    for segment in ("current", "non_current"):
+        if segment not in best:
+            continue
+        value, score, debt = best[segment]
+        dedupe_key = f"{debt.core}|{round(abs(value))}"
+        if _is_better_debt_candidate(score, value, unique_components.get(dedupe_key)):
             unique_components[dedupe_key] = (value, score)
     if unique_components:
         return float(sum(value for value, _ in unique_components.values()))
 
-    direct_candidate = _pick_best_debt_candidate(candidates)
-    return direct_candidate[1] if direct_candidate is not None else None
+    return best["any"][0]
 
 
-def compute_year_snapshot(
-    income_concepts: Dict[str, float],
-    balance_concepts: Dict[str, float],
-    cashflow_concepts: Dict[str, float],
-) -> tuple[dict, dict, dict, dict, list[str]]:
-    """Build normalized statements + requested metrics for one year."""
-    warnings: list[str] = []
+@dataclass(frozen=True)
+class MetricNode:
+    """One value of a year snapshot, computed from the values it requires."""
 
-    ingresos = _find_value(
-        income_concepts,
-        INCOME_CONCEPT_PATTERNS["ingresos"].exact,
-        INCOME_CONCEPT_PATTERNS["ingresos"].contains,
-    )
-    utilidad_neta = _find_value(
-        income_concepts,
-        INCOME_CONCEPT_PATTERNS["utilidad_neta"].exact,
-        INCOME_CONCEPT_PATTERNS["utilidad_neta"].contains,
-    )
-    ebit = _find_value(
-        income_concepts,
-        INCOME_CONCEPT_PATTERNS["ebit"].exact,
-        INCOME_CONCEPT_PATTERNS["ebit"].contains,
-    )
+    requires: Tuple[str, ...]
+    compute: Callable[..., Any]
 
-    dep_amort = _sum_if_contains(income_concepts, DEP_AMORT_CONTAINS)
-    ebitda = income_concepts.get("ebitda")
-    if ebitda is None and ebit is not None:
-        ebitda = ebit + (dep_amort or 0.0)
-
-    gastos_operacionales = _sum_if_contains(income_concepts, OPERATING_EXPENSE_CONTAINS)
-    if gastos_operacionales is None:
-        gastos_operacionales = _find_value(
-            income_concepts,
-            ["gastos operacionales"],
-            ["gastos operacionales"],
-        )
 
-    activos_corrientes = _find_value(
-        balance_concepts,
-        BALANCE_CONCEPT_PATTERNS["activos_corrientes"].exact,
-        BALANCE_CONCEPT_PATTERNS["activos_corrientes"].contains,
-    )
-    pasivos_corrientes = _find_value(
-        balance_concepts,
-        BALANCE_CONCEPT_PATTERNS["pasivos_corrientes"].exact,
-        BALANCE_CONCEPT_PATTERNS["pasivos_corrientes"].contains,
-    )
-    activos_totales = _find_value(
-        balance_concepts,
-        BALANCE_CONCEPT_PATTERNS["activos_totales"].exact,
-        BALANCE_CONCEPT_PATTERNS["activos_totales"].contains,
-    )
-    pasivos_totales = _find_value(
-        balance_concepts,
-        BALANCE_CONCEPT_PATTERNS["pasivos_totales"].exact,
-        BALANCE_CONCEPT_PATTERNS["pasivos_totales"].contains,
-    )
-    patrimonio_total = _find_value(
-        balance_concepts,
-        BALANCE_CONCEPT_PATTERNS["patrimonio_total"].exact,
-        BALANCE_CONCEPT_PATTERNS["patrimonio_total"].contains,
-    )
-    ganancias_acumuladas = _find_value(
-        balance_concepts,
-        BALANCE_CONCEPT_PATTERNS["ganancias_acumuladas"].exact,
-        BALANCE_CONCEPT_PATTERNS["ganancias_acumuladas"].contains,
+def _role_value(statement: str, role: str) -> MetricNode:
+    return MetricNode(
+        (f"{statement}_concepts", f"{statement}_roles"),
+        lambda concepts, match: match.value(concepts, role),
     )
 
-    flujo_caja = _find_value(
-        cashflow_concepts,
-        CASHFLOW_CONCEPT_PATTERNS["flujo_caja"].exact,
-        CASHFLOW_CONCEPT_PATTERNS["flujo_caja"].contains,
+
+def _role_total(statement: str, role: str) -> MetricNode:
+    return MetricNode(
+        (f"{statement}_concepts", f"{statement}_roles"),
+        lambda concepts, match: match.total(concepts, role),
     )
 
-    capital_neto_trabajo = None
-    if activos_corrientes is not None and pasivos_corrientes is not None:
-        capital_neto_trabajo = activos_corrientes - pasivos_corrientes
 
-    dias_capital_trabajo = None
-    if capital_neto_trabajo is not None and ingresos not in (None, 0):
-        dias_capital_trabajo = (capital_neto_trabajo / ingresos) * 365
+def _ebitda(reported: float | None, ebit: float | None, dep_amort: float | None) -> float | None:
+    if reported is None and ebit is not None:
+        return ebit + (dep_amort or 0.0)
+    return reported
+
+
+def _operating_expenses(itemized: float | None, direct: float | None) -> float | None:
+    return itemized if itemized is not None else direct
+
+
+def _working_capital(activos_corrientes: float | None, pasivos_corrientes: float | None) -> float | None:
+    if activos_corrientes is None or pasivos_corrientes is None:
+        return None
+    return activos_corrientes - pasivos_corrientes
+
+
+def _working_capital_days(capital_neto_trabajo: float | None, ingresos: float | None) -> float | None:
+    if capital_neto_trabajo is None or ingresos in (None, 0):
+        return None
+    return (capital_neto_trabajo / ingresos) * 365
 
-    deuda = _resolve_financial_debt(balance_concepts)
 
+def _z_altman(
+    capital_neto_trabajo: float | None,
+    ganancias_acumuladas: float | None,
+    ebit: float | None,
+    patrimonio_total: float | None,
+    activos_totales: float | None,
+    pasivos_totales: float | None,
+) -> float | None:
     # Z-Altman (version para emisores no manufactureros / mercados emergentes):
     # Z'' = 6.56*X1 + 3.26*X2 + 6.72*X3 + 1.05*X4
     # X1 = Capital de trabajo / Activos totales
@@ -318,52 +324,160 @@ def compute_year_snapshot(
     x2 = _safe_div(ganancias_acumuladas, activos_totales)
     x3 = _safe_div(ebit, activos_totales)
     x4 = _safe_div(patrimonio_total, pasivos_totales)
-    z_altman = None
-    if None not in (x1, x2, x3, x4):
-        z_altman = 6.56 * x1 + 3.26 * x2 + 6.72 * x3 + 1.05 * x4
-
-    required = {
-        "ingresos": ingresos,
-        "utilidad_neta": utilidad_neta,
-        "ebitda": ebitda,
-        "gastos_operacionales": gastos_operacionales,
-        "capital_neto_trabajo": capital_neto_trabajo,
-        "deuda": deuda,
-        "dias_capital_trabajo": dias_capital_trabajo,
-        "flujo_caja": flujo_caja,
-        "z_altman": z_altman,
-    }
+    if None in (x1, x2, x3, x4):
+        return None
+    return 6.56 * x1 + 3.26 * x2 + 6.72 * x3 + 1.05 * x4
+
+
+# Every value of a year snapshot and what it is computed from. The
+# "<statement>_concepts" inputs are the normalized concept maps; the
+# "<statement>_roles" nodes resolve all pattern roles of a statement at once.
+METRIC_GRAPH: Dict[str, MetricNode] = {
+    "income_roles": MetricNode(("income_concepts",), INCOME_MATCHER.match),
+    "balance_roles": MetricNode(("balance_concepts",), BALANCE_MATCHER.match),
+    "cashflow_roles": MetricNode(("cashflow_concepts",), CASHFLOW_MATCHER.match),
+    "ingresos": _role_value("income", "ingresos"),
+    "utilidad_neta": _role_value("income", "utilidad_neta"),
+    "ebit": _role_value("income", "ebit"),
+    "ebitda_reportado": MetricNode(("income_concepts",), lambda concepts: concepts.get("ebitda")),
+    "dep_amort": _role_total("income", "dep_amort"),
+    "gastos_itemizados": _role_total("income", "gastos_operacionales"),
+    "gastos_directos": _role_value("income", "gastos_operacionales"),
+    "activos_corrientes": _role_value("balance", "activos_corrientes"),
+    "pasivos_corrientes": _role_value("balance", "pasivos_corrientes"),
+    "activos_totales": _role_value("balance", "activos_totales"),
+    "pasivos_totales": _role_value("balance", "pasivos_totales"),
+    "patrimonio_total": _role_value("balance", "patrimonio_total"),
+    "ganancias_acumuladas": _role_value("balance", "ganancias_acumuladas"),
+    "flujo_caja": _role_value("cashflow", "flujo_caja"),
+    "deuda": MetricNode(("balance_concepts",), _resolve_financial_debt),
+    "ebitda": MetricNode(("ebitda_reportado", "ebit", "dep_amort"), _ebitda),
+    "gastos_operacionales": MetricNode(("gastos_itemizados", "gastos_directos"), _operating_expenses),
+    "capital_neto_trabajo": MetricNode(("activos_corrientes", "pasivos_corrientes"), _working_capital),
+    "dias_capital_trabajo": MetricNode(("capital_neto_trabajo", "ingresos"), _working_capital_days),
+    "z_altman": MetricNode(
+        (
+            "capital_neto_trabajo",
+            "ganancias_acumuladas",
+            "ebit",
+            "patrimonio_total",
+            "activos_totales",
+            "pasivos_totales",
+        ),
+        _z_altman,
+    ),
+    # The balance chart also plots pasivos and patrimonio.
+    "balance_general": MetricNode(
+        ("activos_totales", "pasivos_totales", "patrimonio_total"),
+        lambda activos, _pasivos, _patrimonio: activos,
+    ),
+}
+
+# Metrics reported by compute_year_snapshot; missing REQUIRED ones are warned about.
+REQUIRED_METRICS = (
+    "ingresos",
+    "utilidad_neta",
+    "ebitda",
+    "gastos_operacionales",
+    "capital_neto_trabajo",
+    "deuda",
+    "dias_capital_trabajo",
+    "flujo_caja",
+    "z_altman",
+)
+SNAPSHOT_METRICS = REQUIRED_METRICS + ("balance_general",)
+_STATEMENT_ITEMS = (
+    ("ingresos", "utilidad_neta", "ebit", "ebitda", "gastos_operacionales"),
+    (
+        "activos_corrientes",
+        "pasivos_corrientes",
+        "activos_totales",
+        "pasivos_totales",
+        "patrimonio_total",
+        "ganancias_acumuladas",
+    ),
+    ("flujo_caja",),
+)
+
+
+class LazySnapshot:
+    """Evaluate ``METRIC_GRAPH`` nodes of one company-year on demand.
+
+    Each node is computed the first time it is read, from its required
+    nodes, and remembered; nodes nobody asks for (say, the debt resolution
+    when only ``ingresos`` is shown) are never computed.
+    """
+
+    def __init__(
+        self,
+        income_concepts: Dict[str, float],
+        balance_concepts: Dict[str, float],
+        cashflow_concepts: Dict[str, float],
+    ) -> None:
+        self._values: Dict[str, Any] = {
+            "income_concepts": income_concepts,
+            "balance_concepts": balance_concepts,
+            "cashflow_concepts": cashflow_concepts,
+        }
+
+    def __getitem__(self, name: str) -> Any:
+        values = self._values
+        if name in values:
+            return values[name]
+        node = METRIC_GRAPH[name]
+        value = values[name] = node.compute(*[self[required] for required in node.requires])
+        return value
 
-    missing_required = [k for k, v in required.items() if v is None]
+    def evaluated(self, name: str) -> bool:
+        return name in self._values
+
+
+def resolve_line_items(
+    income_concepts: Dict[str, float],
+    balance_concepts: Dict[str, float],
+    cashflow_concepts: Dict[str, float],
+) -> Dict[str, float | None]:
+    """Statement line items (see ``LINE_ITEMS``) that the metrics are built from."""
+    snapshot = LazySnapshot(income_concepts, balance_concepts, cashflow_concepts)
+    return {name: snapshot[name] for name in LINE_ITEMS}
+
+
+def compute_year_snapshot(
+    income_concepts: Dict[str, float],
+    balance_concepts: Dict[str, float],
+    cashflow_concepts: Dict[str, float],
+    metrics: Iterable[str] | None = None,
+) -> tuple[dict, dict, dict, dict, list[str]]:
+    """Build normalized statements + requested metrics for one year.
+
+    ``metrics`` limits the metric work to those ``SNAPSHOT_METRICS`` (all of
+    them by default); the statements always carry every line item.
+    """
+    if metrics is None:
+        wanted = SNAPSHOT_METRICS
+    else:
+        requested = set(metrics)
+        unknown = requested.difference(SNAPSHOT_METRICS)
+        if unknown:
+            raise ValueError("Metricas desconocidas: " + ", ".join(sorted(unknown)))
+        wanted = tuple(key for key in SNAPSHOT_METRICS if key in requested)
+
+    snapshot = LazySnapshot(income_concepts, balance_concepts, cashflow_concepts)
+    metric_values = {key: snapshot[key] for key in wanted}
+
+    warnings: list[str] = []
+    missing_required = [k for k in REQUIRED_METRICS if k in metric_values and metric_values[k] is None]
     if missing_required:
         warnings.append(
             "Datos incompletos para: " + ", ".join(sorted(missing_required))
         )
 
-    income_statement = {
-        "ingresos": ingresos,
-        "utilidad_neta": utilidad_neta,
-        "ebit": ebit,
-        "ebitda": ebitda,
-        "gastos_operacionales": gastos_operacionales,
-    }
-    balance_sheet = {
-        "activos_corrientes": activos_corrientes,
-        "pasivos_corrientes": pasivos_corrientes,
-        "activos_totales": activos_totales,
-        "pasivos_totales": pasivos_totales,
-        "patrimonio_total": patrimonio_total,
-        "ganancias_acumuladas": ganancias_acumuladas,
-    }
-    cash_flow = {
-        "flujo_caja": flujo_caja,
-    }
-    metrics = {
-        **required,
-        "balance_general": activos_totales,
-    }
-
-    return income_statement, balance_sheet, cash_flow, metrics, warnings
+    # Statement line items are cheap role lookups and reports export them in
+    # full, so they are resolved whatever metrics were requested.
+    income_statement, balance_sheet, cash_flow = (
+        {name: snapshot[name] for name in names} for names in _STATEMENT_ITEMS
+    )
+    return income_statement, balance_sheet, cash_flow, metric_values, warnings
 
 
 def z_altman_zone(z_value: float | None) -> str:
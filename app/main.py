@@ -12,7 +12,10 @@ def main() -> None:
     configure_logging()
     logging.getLogger(__name__).info("Starting desktop app")
     app = AnalyzerApp()
-    app.mainloop()
+    try:
+        app.mainloop()
+    finally:
+        app.analysis_service.close()
 
 
 if __name__ == "__main__":
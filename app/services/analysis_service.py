@@ -3,41 +3,168 @@
 from __future__ import annotations
 
 import logging
-from typing import List
+import threading
+import time
+from concurrent.futures import Future
+from itertools import chain
+from typing import Dict, List, Tuple
 
-from app.config import DEFAULT_LOOKBACK_YEARS
+from app.config import DEFAULT_LOOKBACK_YEARS, PREFETCH_DELAY_SECONDS, SOCRATA_CACHE_TTL_SECONDS
 from app.core.exceptions import DataUnavailableError
-from app.finance.indicators import compute_year_snapshot
-from app.models.entities import AnalysisPackage, CompanyRecord, YearFinancialSnapshot
-from app.services.data_normalizer import normalize_statement_rows, select_recent_years
+from app.finance.indicators import compute_year_snapshot, concept_layout_cache_stats
+from app.models.entities import AnalysisPackage, CompanyRecord, StatementColumns, YearFinancialSnapshot
+from app.services.data_normalizer import (
+    normalize_statement_columns,
+    normalize_statement_stream,
+    select_recent_years,
+)
 from app.services.socrata_financials import SocrataFinancialService
 from app.services.supersoc_search import SupersocSearchService
+from app.utils.text import CONCEPT_VOCABULARY, normalize_nit, normalize_text_cache_stats
 
 LOGGER = logging.getLogger(__name__)
 
+StatementMap = Dict[int, Dict[str, float]]
+
 
 class AnalysisService:
-    def __init__(self) -> None:
-        self.search_service = SupersocSearchService()
-        self.financial_service = SocrataFinancialService()
+    def __init__(
+        self,
+        search_service: SupersocSearchService | None = None,
+        financial_service: SocrataFinancialService | None = None,
+    ) -> None:
+        self.search_service = search_service or SupersocSearchService()
+        self.financial_service = financial_service or SocrataFinancialService()
+        self._prefetch_lock = threading.Lock()
+        self._prefetches: Dict[tuple[str, int], Future] = {}
 
     def search_companies(self, query: str, by: str) -> List[CompanyRecord]:
         return self.search_service.search(query=query, by=by)
 
+    def close(self) -> None:
+        self.search_service.close()
+
+    def prefetch_financials(
+        self, company: CompanyRecord, lookback_years: int = DEFAULT_LOOKBACK_YEARS
+    ) -> None:
+        """Start downloading a company's statements before the user asks for them.
+
+        Only the most recent company is kept: prefetches for other companies
+        that have not started yet are cancelled. A later ``analyze_company``
+        for the same company reuses (or waits for) the prefetched rows while
+        they are younger than the Socrata cache TTL.
+        """
+        key = (normalize_nit(company.nit), lookback_years)
+        with self._prefetch_lock:
+            for other_key in [k for k in self._prefetches if k != key]:
+                if self._prefetches.pop(other_key).cancel():
+                    LOGGER.info("Prefetch cancelled nit=%s", other_key[0])
+            current = self._prefetches.get(key)
+            if current is not None and self._prefetch_usable(current):
+                return
+            future: Future = Future()
+            self._prefetches[key] = future
+
+        timer = threading.Timer(
+            PREFETCH_DELAY_SECONDS, self._run_prefetch, args=(future, company.nit, lookback_years)
+        )
+        timer.daemon = True
+        timer.start()
+
+    def _run_prefetch(self, future: Future, nit: str, lookback_years: int) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        LOGGER.info("Prefetching financial rows nit=%s", nit)
+        try:
+            columns = self.financial_service.fetch_company_financial_columns(
+                nit=nit, lookback_years=lookback_years
+            )
+        except BaseException as exc:
+            future.set_exception(exc)
+        else:
+            future.set_result((time.time(), columns))
+
+    @staticmethod
+    def _prefetch_usable(future: Future) -> bool:
+        """False once a prefetch failed or its rows outlived the cache TTL."""
+        if not future.done():
+            return True
+        if future.cancelled() or future.exception() is not None:
+            return False
+        fetched_at, _ = future.result()
+        return time.time() - fetched_at <= SOCRATA_CACHE_TTL_SECONDS
+
+    def _financial_columns(
+        self, company: CompanyRecord, lookback_years: int
+    ) -> Dict[str, StatementColumns]:
+        with self._prefetch_lock:
+            future = self._prefetches.pop((normalize_nit(company.nit), lookback_years), None)
+
+        # A prefetch still waiting for its delay is cancelled and replaced by a
+        # direct fetch; one already running (or finished) is awaited instead.
+        # Failed or expired prefetches fall through to a fetch that goes
+        # through the cache and its incremental sync.
+        if future is not None and not future.cancel():
+            try:
+                fetched_at, columns = future.result()
+            except Exception:
+                LOGGER.warning("Prefetch failed nit=%s; fetching again", company.nit, exc_info=True)
+            else:
+                if time.time() - fetched_at <= SOCRATA_CACHE_TTL_SECONDS:
+                    LOGGER.info("Using prefetched financial rows nit=%s", company.nit)
+                    return columns
+                LOGGER.info("Prefetched financial rows expired nit=%s; fetching again", company.nit)
+
+        return self.financial_service.fetch_company_financial_columns(
+            nit=company.nit,
+            lookback_years=lookback_years,
+        )
+
+    def _statement_maps(
+        self, company: CompanyRecord, lookback_years: int
+    ) -> Tuple[StatementMap, StatementMap, StatementMap]:
+        """Normalized ``(income, balance, cashflow)`` maps for the company.
+
+        Without a disk cache there is nothing to keep the downloaded rows for,
+        so unless a prefetch already holds them each dataset is streamed page
+        by page into the single-pass normalizer and dropped as it goes.
+        """
+        datasets = ("income", "balance", "cashflow")
+        with self._prefetch_lock:
+            future = self._prefetches.get((normalize_nit(company.nit), lookback_years))
+            prefetched = future is not None and self._prefetch_usable(future)
+        if self.financial_service.cache is None and not prefetched:
+            income_map, balance_map, cashflow_map = (
+                normalize_statement_stream(
+                    chain.from_iterable(
+                        self.financial_service.iter_dataset_pages(company.nit, dataset, lookback_years)
+                    )
+                )
+                for dataset in datasets
+            )
+            return income_map, balance_map, cashflow_map
+
+        columns = self._financial_columns(company, lookback_years)
+        empty = StatementColumns()
+        income_map, balance_map, cashflow_map = (
+            normalize_statement_columns(columns.get(dataset, empty)) for dataset in datasets
+        )
+        return income_map, balance_map, cashflow_map
+
     def analyze_company(
         self,
         company: CompanyRecord,
         selected_years: List[int] | None = None,
         lookback_years: int = DEFAULT_LOOKBACK_YEARS,
+        metric_keys: List[str] | None = None,
     ) -> AnalysisPackage:
-        rows = self.financial_service.fetch_company_financial_rows(
-            nit=company.nit,
-            lookback_years=lookback_years,
-        )
+        """Compute ``metric_keys`` (every metric by default) for the company's recent years.
 
-        income_map = normalize_statement_rows(rows.get("income", []))
-        balance_map = normalize_statement_rows(rows.get("balance", []))
-        cashflow_map = normalize_statement_rows(rows.get("cashflow", []))
+        Statements are always complete; only the intermediate values those
+        metrics need are computed. ``AnalysisPackage.missing_metrics`` tells
+        callers when a wider selection needs a new analysis.
+        """
+        income_map, balance_map, cashflow_map = self._statement_maps(company, lookback_years)
 
         recent_years = select_recent_years(
             income_map=income_map,
@@ -68,6 +195,7 @@ class AnalysisService:
                 income_concepts=income,
                 balance_concepts=balance,
                 cashflow_concepts=cashflow,
+                metrics=metric_keys,
             )
 
             if not income:
@@ -91,4 +219,15 @@ class AnalysisService:
             company.nit,
             ",".join(str(y) for y in years),
         )
-        return AnalysisPackage(company=company, years=sorted(years), snapshots=snapshots)
+        LOGGER.debug(
+            "Text caches normalize_text=%s concepts=%s layouts=%s",
+            normalize_text_cache_stats(),
+            CONCEPT_VOCABULARY.stats(),
+            concept_layout_cache_stats(),
+        )
+        return AnalysisPackage(
+            company=company,
+            years=sorted(years),
+            snapshots=snapshots,
+            metric_keys=list(metric_keys) if metric_keys is not None else None,
+        )
@@ -0,0 +1,249 @@
+﻿"""Local accent-insensitive company name index for offline search."""
+
+from __future__ import annotations
+
+import bisect
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Set
+
+from app.config import COMPANY_INDEX_SAVE_INTERVAL_SECONDS, MAX_SEARCH_RESULTS
+from app.core.paths import get_cache_path
+from app.models.entities import CompanyRecord
+from app.utils.text import normalize_nit, normalize_text
+
+LOGGER = logging.getLogger(__name__)
+
+MIN_TRIGRAM_SIMILARITY = 0.4
+# Trigrams shared by more than this share of names ("s a", "sas") barely
+# discriminate; they are skipped when gathering fuzzy candidates.
+_COMMON_TRIGRAM_RATIO = 0.05
+_FUZZY_CANDIDATES = 200
+
+
+def _search_key(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", normalize_text(text)).strip()
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class CompanyNameIndex:
+    """Answer name searches from companies already seen, without the network.
+
+    Names are normalized with ``normalize_text`` and stripped of punctuation.
+    A query matches by, in order of preference: prefix of the full name,
+    every query word being a prefix of some word in the name, or trigram
+    (Jaccard) similarity, which tolerates typos.
+    """
+
+    def __init__(
+        self, path: Path | None = None, save_interval_seconds: float = COMPANY_INDEX_SAVE_INTERVAL_SECONDS
+    ) -> None:
+        self._path = path
+        self.save_interval_seconds = save_interval_seconds
+        self._saved_at = time.time()
+        self._lock = threading.RLock()
+        self._records: Dict[str, CompanyRecord] = {}
+        self._keys: Dict[str, str] = {}
+        self._trigram_postings: Dict[str, Set[str]] = {}
+        self._sorted_keys: List[tuple[str, str]] = []
+        self._sorted_words: List[tuple[str, str]] = []
+        self._sorted_stale = False
+        self._dirty = False
+        self._loaded = False
+
+    @property
+    def path(self) -> Path:
+        if self._path is None:
+            self._path = get_cache_path() / "company_index.json.gz"
+        return self._path
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._records)
+
+    def add(self, records: Iterable[CompanyRecord]) -> int:
+        """Insert or refresh companies; returns how many entries changed."""
+        self._ensure_loaded()
+        records = list(records)
+        changed = 0
+        with self._lock:
+            # Small harvests are merged into the sorted lists in place; bulk
+            # loads rebuild them once on the next search instead.
+            bulk = len(records) > 1000 or self._sorted_stale
+            if bulk:
+                self._sorted_stale = True
+            for record in records:
+                nit = normalize_nit(record.nit)
+                if not nit or not record.razon_social:
+                    continue
+                current = self._records.get(nit)
+                # Names from the bulk datasets carry no estado/dependencia;
+                # keep the richer superwas record when we already have one.
+                if current == record or (current is not None and current.estado and not record.estado):
+                    continue
+                self._put(nit, record, keep_sorted=not bulk)
+                changed += 1
+        return changed
+
+    def add_names(self, pairs: Iterable[tuple[str, str]]) -> int:
+        return self.add(CompanyRecord(nit=nit, razon_social=name) for nit, name in pairs)
+
+    def search(self, query: str, limit: int = MAX_SEARCH_RESULTS) -> List[CompanyRecord]:
+        self._ensure_loaded()
+        key = _search_key(query)
+        if not key:
+            return []
+
+        with self._lock:
+            if self._sorted_stale:
+                self._rebuild_sorted()
+
+            ranked: Dict[str, float] = {}
+            for nit in self._prefix_matches(self._sorted_keys, key):
+                ranked.setdefault(nit, 3.0)
+            for nit in self._word_prefix_matches(key.split()):
+                ranked.setdefault(nit, 2.0)
+            if len(ranked) < limit:
+                for nit, similarity in self._fuzzy_matches(key):
+                    ranked.setdefault(nit, similarity)
+
+            ordered = sorted(ranked.items(), key=lambda item: (-item[1], self._keys[item[0]]))
+            return [self._records[nit] for nit, _ in ordered[:limit]]
+
+    def save_if_due(self) -> None:
+        """``save`` unless the index was written less than ``save_interval_seconds`` ago.
+
+        Writing gzips every entry, so frequent small harvests are batched;
+        callers ``save`` explicitly when a batch ends or the app closes.
+        """
+        with self._lock:
+            if not self._dirty or time.time() - self._saved_at < self.save_interval_seconds:
+                return
+        self.save()
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = [asdict(record) for record in self._records.values()]
+            self._dirty = False
+            self._saved_at = time.time()
+
+        data = gzip.compress(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+        tmp_path = self.path.with_name(f"{self.path.name}.{threading.get_ident()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            LOGGER.warning("Could not save company index %s", self.path, exc_info=True)
+            tmp_path.unlink(missing_ok=True)
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                raw = self.path.read_bytes()
+            except FileNotFoundError:
+                return
+            except OSError:
+                LOGGER.warning("Could not read company index %s", self.path, exc_info=True)
+                return
+            try:
+                items = json.loads(gzip.decompress(raw).decode("utf-8"))
+            except (OSError, EOFError, ValueError):
+                LOGGER.warning("Discarding corrupt company index %s", self.path)
+                return
+            for item in items:
+                record = CompanyRecord(**item)
+                self._put(normalize_nit(record.nit), record, keep_sorted=False)
+            self._sorted_stale = True
+            self._dirty = False
+            LOGGER.info("Company index loaded entries=%s", len(self._records))
+
+    def _put(self, nit: str, record: CompanyRecord, keep_sorted: bool) -> None:
+        previous_key = self._keys.get(nit)
+        key = _search_key(record.razon_social)
+        if previous_key is not None:
+            for gram in _trigrams(previous_key):
+                self._trigram_postings.get(gram, set()).discard(nit)
+            if keep_sorted:
+                self._remove_sorted(self._sorted_keys, (previous_key, nit))
+                for word in set(previous_key.split()):
+                    self._remove_sorted(self._sorted_words, (word, nit))
+
+        self._records[nit] = record
+        self._keys[nit] = key
+        for gram in _trigrams(key):
+            self._trigram_postings.setdefault(gram, set()).add(nit)
+        if keep_sorted:
+            bisect.insort(self._sorted_keys, (key, nit))
+            for word in set(key.split()):
+                bisect.insort(self._sorted_words, (word, nit))
+        self._dirty = True
+
+    @staticmethod
+    def _remove_sorted(sorted_pairs: List[tuple[str, str]], pair: tuple[str, str]) -> None:
+        position = bisect.bisect_left(sorted_pairs, pair)
+        if position < len(sorted_pairs) and sorted_pairs[position] == pair:
+            del sorted_pairs[position]
+
+    def _rebuild_sorted(self) -> None:
+        self._sorted_keys = sorted((key, nit) for nit, key in self._keys.items())
+        self._sorted_words = sorted(
+            {(word, nit) for nit, key in self._keys.items() for word in key.split()}
+        )
+        self._sorted_stale = False
+
+    @staticmethod
+    def _prefix_matches(sorted_pairs: List[tuple[str, str]], prefix: str) -> List[str]:
+        start = bisect.bisect_left(sorted_pairs, (prefix, ""))
+        matches = []
+        for text, nit in sorted_pairs[start:]:
+            if not text.startswith(prefix):
+                break
+            matches.append(nit)
+        return matches
+
+    def _word_prefix_matches(self, words: List[str]) -> Set[str]:
+        result: Set[str] | None = None
+        for word in sorted(words, key=len, reverse=True):
+            nits = set(self._prefix_matches(self._sorted_words, word))
+            result = nits if result is None else result & nits
+            if not result:
+                return set()
+        return result or set()
+
+    def _fuzzy_matches(self, key: str) -> List[tuple[str, float]]:
+        query_grams = _trigrams(key)
+        common_limit = max(10, int(len(self._records) * _COMMON_TRIGRAM_RATIO))
+        counts: Counter[str] = Counter()
+        for gram in query_grams:
+            postings = self._trigram_postings.get(gram)
+            if postings and len(postings) <= common_limit:
+                counts.update(postings)
+
+        matches = []
+        for nit, _ in counts.most_common(_FUZZY_CANDIDATES):
+            name_grams = _trigrams(self._keys[nit])
+            overlap = len(query_grams & name_grams)
+            similarity = overlap / (len(query_grams) + len(name_grams) - overlap)
+            if similarity >= MIN_TRIGRAM_SIMILARITY:
+                matches.append((nit, similarity))
+        return matches
@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import math
 from collections import defaultdict
-from typing import Dict, Iterable, Tuple
+from typing import Callable, Dict, Iterable, List, Sequence, Sized, Tuple, TypeVar
 
-from app.config import DEFAULT_LOOKBACK_YEARS
-from app.utils.numbers import parse_amount
-from app.utils.text import normalize_text
+import numpy as np
+import pandas as pd
+
+from app.config import DEFAULT_LOOKBACK_YEARS, VECTORIZED_NORMALIZER_MIN_ROWS
+from app.models.entities import StatementColumns
+from app.utils.numbers import parse_amount, parse_amounts
+from app.utils.text import CONCEPT_VOCABULARY, normalize_text
 
 
 def _extract_year(fecha_corte: str | None) -> int | None:
@@ -20,7 +25,10 @@ def _extract_year(fecha_corte: str | None) -> int | None:
 
 
 def _period_score(periodo: str | None, year: int) -> int:
-    p = normalize_text(periodo or "")
+    return _period_score_normalized(normalize_text(periodo or ""), year)
+
+
+def _period_score_normalized(p: str, year: int) -> int:
     if not p:
         return 1
     if "actual" in p:
@@ -37,11 +45,25 @@ def _clean_text(value: str | None) -> str:
 
 
 def _financial_instance_key(row: dict) -> str:
+    return _instance_key_from_parts(
+        row.get("numero_radicado"),
+        row.get("id_punto_entrada"),
+        row.get("id_taxonomia"),
+        row.get("codigo_instancia"),
+    )
+
+
+def _instance_key_from_parts(
+    numero_radicado: str | None,
+    id_punto_entrada: str | None,
+    id_taxonomia: str | None,
+    codigo_instancia: str | None,
+) -> str:
     parts = [
-        _clean_text(row.get("numero_radicado")),
-        _clean_text(row.get("id_punto_entrada")),
-        _clean_text(row.get("id_taxonomia")),
-        _clean_text(row.get("codigo_instancia")),
+        _clean_text(numero_radicado),
+        _clean_text(id_punto_entrada),
+        _clean_text(id_taxonomia),
+        _clean_text(codigo_instancia),
     ]
     if not any(parts):
         return ""
@@ -49,7 +71,10 @@ def _financial_instance_key(row: dict) -> str:
 
 
 def _is_actual_period(periodo: str | None, year: int) -> bool:
-    p = normalize_text(periodo or "")
+    return _is_actual_normalized(normalize_text(periodo or ""), year)
+
+
+def _is_actual_normalized(p: str, year: int) -> bool:
     if not p:
         return False
     if "actual" in p:
@@ -83,16 +108,9 @@ def _select_preferred_instance_by_year(rows: Iterable[dict]) -> Dict[int, str]:
             continue
 
         year_map = by_year.setdefault(year, {})
-        stat = year_map.setdefault(
-            instance_key,
-            {
-                "row_count": 0,
-                "actual_count": 0,
-                "non_zero_count": 0,
-                "concepts": set(),
-                "point_entry": normalize_text(row.get("punto_entrada") or ""),
-            },
-        )
+        stat = year_map.get(instance_key)
+        if stat is None:
+            stat = year_map[instance_key] = _new_instance_stat(row.get("punto_entrada"))
         stat["row_count"] += 1
         if _is_actual_period(row.get("periodo"), year):
             stat["actual_count"] += 1
@@ -103,6 +121,20 @@ def _select_preferred_instance_by_year(rows: Iterable[dict]) -> Dict[int, str]:
         if concept:
             stat["concepts"].add(concept)
 
+    return _preferred_instances(by_year)
+
+
+def _new_instance_stat(point_entry: str | None) -> dict:
+    return {
+        "row_count": 0,
+        "actual_count": 0,
+        "non_zero_count": 0,
+        "concepts": set(),
+        "point_entry": normalize_text(point_entry or ""),
+    }
+
+
+def _preferred_instances(by_year: Dict[int, Dict[str, dict]]) -> Dict[int, str]:
     preferred: Dict[int, str] = {}
     for year, instance_map in by_year.items():
         best_key = ""
@@ -171,6 +203,391 @@ def normalize_statement_rows(rows: Iterable[dict]) -> Dict[int, Dict[str, float]
     return dict(result)
 
 
+def normalize_statement_stream(rows: Iterable[dict]) -> Dict[int, Dict[str, float]]:
+    """Single-pass ``normalize_statement_rows`` that never materializes the rows.
+
+    Each row is parsed once and folded into per-(year, instance) statistics
+    and per-(year, instance, concept) best candidates; the preferred instance
+    per year is decided at the end and only its candidates (plus rows without
+    an instance key) compete. Memory grows with distinct concepts, not rows.
+    Output, insertion order included, matches ``normalize_statement_rows``.
+    """
+    by_year: Dict[int, Dict[str, dict]] = {}
+    # (year, instance_key, concept) -> (score, abs_value, value, winner_row, first_row)
+    candidates: Dict[Tuple[int, str, str], Tuple[int, float, float, int, int]] = {}
+
+    for position, row in enumerate(rows):
+        year = _extract_year(row.get("fecha_corte"))
+        if year is None:
+            continue
+
+        instance_key = _financial_instance_key(row)
+        concept = CONCEPT_VOCABULARY.canonical(row.get("concepto"))
+        value = parse_amount(row.get("valor"))
+        period = normalize_text(row.get("periodo") or "")
+
+        if instance_key:
+            year_map = by_year.setdefault(year, {})
+            stat = year_map.get(instance_key)
+            if stat is None:
+                stat = year_map[instance_key] = _new_instance_stat(row.get("punto_entrada"))
+            stat["row_count"] += 1
+            if _is_actual_normalized(period, year):
+                stat["actual_count"] += 1
+            if value is not None and value != 0:
+                stat["non_zero_count"] += 1
+            if concept:
+                stat["concepts"].add(concept)
+
+        if not concept or value is None:
+            continue
+
+        score = _period_score_normalized(period, year)
+        key = (year, instance_key, concept)
+        current = candidates.get(key)
+        if current is None:
+            candidates[key] = (score, abs(value), value, position, position)
+        elif score > current[0] or (score == current[0] and abs(value) > current[1]):
+            candidates[key] = (score, abs(value), value, position, current[4])
+
+    preferred_by_year = _preferred_instances(by_year)
+    # Merging per-instance winners: the best (score, |value|) wins and ties go
+    # to the earlier winning row, as in the sequential reference. Each
+    # (year, concept) keeps the first row among competing ones for output order.
+    winners: Dict[Tuple[int, str], Tuple[int, float, float, int, int]] = {}
+    for (year, instance_key, concept), candidate in candidates.items():
+        preferred_instance = preferred_by_year.get(year)
+        if preferred_instance and instance_key and preferred_instance != instance_key:
+            continue
+        key = (year, concept)
+        current = winners.get(key)
+        if current is None:
+            winners[key] = candidate
+            continue
+        score, abs_value, _, winner_row, first_row = candidate
+        first_row = min(current[4], first_row)
+        if score > current[0] or (
+            score == current[0]
+            and (abs_value > current[1] or (abs_value == current[1] and winner_row < current[3]))
+        ):
+            winners[key] = candidate[:4] + (first_row,)
+        else:
+            winners[key] = current[:4] + (first_row,)
+
+    result: Dict[int, Dict[str, float]] = {}
+    for (year, concept), winner in sorted(winners.items(), key=lambda item: item[1][4]):
+        result.setdefault(year, {})[concept] = winner[2]
+    return result
+
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
+def _memo_map(func: Callable[[_T], _R], values: Iterable[_T]) -> List[_R]:
+    """Apply ``func`` once per distinct value (columns repeat labels heavily)."""
+    memo: Dict[_T, _R] = {}
+    out: List[_R] = []
+    for value in values:
+        try:
+            out.append(memo[value])
+        except KeyError:
+            result = memo[value] = func(value)
+            out.append(result)
+    return out
+
+
+def normalize_statement_columns(columns: StatementColumns) -> Dict[int, Dict[str, float]]:
+    """Column-oriented twin of ``normalize_statement_rows`` with identical output.
+
+    Text normalization and instance keys are computed once per category (or
+    combination of categories) rather than once per row, and amounts arrive
+    already parsed.
+    """
+    years = columns.fecha_corte.map(_extract_year)
+    concepts = columns.concepto.map(CONCEPT_VOCABULARY.canonical)
+    instance_columns = (
+        columns.numero_radicado,
+        columns.id_punto_entrada,
+        columns.id_taxonomia,
+        columns.codigo_instancia,
+    )
+    instance_keys = _memo_map(
+        lambda codes: _instance_key_from_parts(
+            *(column.categories[code] for column, code in zip(instance_columns, codes))
+        ),
+        zip(*(column.codes for column in instance_columns)),
+    )
+    period_years = list(zip(columns.periodo.codes, years))
+    period_labels = columns.periodo.categories
+    actual_flags = _memo_map(
+        lambda pair: pair[1] is not None and _is_actual_period(period_labels[pair[0]], pair[1]), period_years
+    )
+    values = [None if math.isnan(value) else value for value in columns.valor]
+
+    by_year: Dict[int, Dict[str, dict]] = {}
+    for index, year in enumerate(years):
+        if year is None:
+            continue
+        instance_key = instance_keys[index]
+        if not instance_key:
+            continue
+
+        year_map = by_year.setdefault(year, {})
+        stat = year_map.get(instance_key)
+        if stat is None:
+            stat = year_map[instance_key] = _new_instance_stat(columns.punto_entrada[index])
+        stat["row_count"] += 1
+        if actual_flags[index]:
+            stat["actual_count"] += 1
+        value = values[index]
+        if value is not None and value != 0:
+            stat["non_zero_count"] += 1
+        concept = concepts[index]
+        if concept:
+            stat["concepts"].add(concept)
+
+    preferred_by_year = _preferred_instances(by_year)
+    period_scores = _memo_map(
+        lambda pair: _period_score(period_labels[pair[0]], pair[1]) if pair[1] is not None else 0,
+        period_years,
+    )
+
+    candidates: Dict[Tuple[int, str], Tuple[int, float, float]] = {}
+    for index, year in enumerate(years):
+        if year is None:
+            continue
+
+        preferred_instance = preferred_by_year.get(year)
+        row_instance = instance_keys[index]
+        if preferred_instance and row_instance and preferred_instance != row_instance:
+            continue
+
+        concept = concepts[index]
+        if not concept:
+            continue
+
+        value = values[index]
+        if value is None:
+            continue
+
+        score = period_scores[index]
+        key = (year, concept)
+        current = candidates.get(key)
+
+        if current is None:
+            candidates[key] = (score, abs(value), value)
+            continue
+
+        current_score, current_abs, _ = current
+        if score > current_score or (score == current_score and abs(value) > current_abs):
+            candidates[key] = (score, abs(value), value)
+
+    result: Dict[int, Dict[str, float]] = defaultdict(dict)
+    for (year, concept), (_, _, value) in candidates.items():
+        result[year][concept] = value
+
+    return dict(result)
+
+
+_FRAME_FIELDS = (
+    "fecha_corte",
+    "periodo",
+    "concepto",
+    "valor",
+    "numero_radicado",
+    "id_punto_entrada",
+    "id_taxonomia",
+    "codigo_instancia",
+    "punto_entrada",
+)
+
+
+def _factorize(values: np.ndarray) -> Tuple[np.ndarray, list]:
+    """Codes plus distinct values, with missing values as a trailing ``None``."""
+    codes, uniques = pd.factorize(values)
+    codes = np.where(codes < 0, len(uniques), codes)
+    return codes, list(uniques) + [None]
+
+
+def _combine_codes(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    combined, _ = pd.factorize(left * (int(right.max(initial=0)) + 1) + right)
+    return combined
+
+
+def _first_positions(codes: np.ndarray, count: int) -> np.ndarray:
+    first = np.full(count, len(codes), dtype=np.int64)
+    np.minimum.at(first, codes, np.arange(len(codes)))
+    return first
+
+
+def normalize_statement_frame(frame: pd.DataFrame) -> Dict[int, Dict[str, float]]:
+    """Vectorized ``normalize_statement_rows`` over a frame of raw Socrata rows.
+
+    Text parsing runs once per distinct label; instance scoring and duplicate
+    resolution are group-by/argmax operations on integer codes. Output is
+    identical to ``normalize_statement_rows``, which remains the reference,
+    including dict insertion order.
+    """
+    row_count = len(frame)
+    if not row_count:
+        return {}
+    raw = {}
+    for field_name in _FRAME_FIELDS:
+        column = (
+            frame[field_name].to_numpy(dtype=object, copy=True)
+            if field_name in frame
+            else np.full(row_count, None, dtype=object)
+        )
+        column[pd.isna(column)] = None
+        raw[field_name] = column
+    positions = np.arange(row_count)
+
+    year_codes, year_uniques = _factorize(raw["fecha_corte"])
+    year_table = [_extract_year(value) for value in year_uniques]
+    has_year = np.array([year is not None for year in year_table])[year_codes]
+    years = np.array([year or 0 for year in year_table], dtype=np.int64)[year_codes]
+
+    concept_codes, concept_uniques = _factorize(raw["concepto"])
+    concept_table = np.array([CONCEPT_VOCABULARY.id_for(value) for value in concept_uniques], dtype=np.int64)
+    concepts = concept_table[concept_codes]
+
+    value_codes, value_uniques = _factorize(raw["valor"])
+    amounts, missing = parse_amounts(value_uniques)
+    has_value = ~missing[value_codes]
+    values = np.where(missing, 0.0, amounts)[value_codes]
+
+    instance_parts = [
+        _factorize(raw[name])[0]
+        for name in ("numero_radicado", "id_punto_entrada", "id_taxonomia", "codigo_instancia")
+    ]
+    instance_combo = instance_parts[0]
+    for part in instance_parts[1:]:
+        instance_combo = _combine_codes(instance_combo, part)
+    combo_count = int(instance_combo.max()) + 1
+    instance_keys: List[str] = []
+    key_ids: Dict[str, int] = {}
+    combo_table = np.empty(combo_count, dtype=np.int64)
+    for combo, row in enumerate(_first_positions(instance_combo, combo_count)):
+        key = _instance_key_from_parts(
+            raw["numero_radicado"][row],
+            raw["id_punto_entrada"][row],
+            raw["id_taxonomia"][row],
+            raw["codigo_instancia"][row],
+        )
+        if not key:
+            combo_table[combo] = -1
+            continue
+        if key not in key_ids:
+            key_ids[key] = len(instance_keys)
+            instance_keys.append(key)
+        combo_table[combo] = key_ids[key]
+    instances = combo_table[instance_combo]
+
+    period_codes, period_uniques = _factorize(raw["periodo"])
+    period_combo = _combine_codes(period_codes, year_codes)
+    period_count = int(period_combo.max()) + 1
+    period_score_table = np.zeros(period_count, dtype=np.int64)
+    actual_table = np.zeros(period_count, dtype=bool)
+    for combo, row in enumerate(_first_positions(period_combo, period_count)):
+        if has_year[row]:
+            periodo = period_uniques[period_codes[row]]
+            period_score_table[combo] = _period_score(periodo, int(years[row]))
+            actual_table[combo] = _is_actual_period(periodo, int(years[row]))
+    period_scores = period_score_table[period_combo]
+    actual = actual_table[period_combo]
+
+    entry_codes, entry_uniques = _factorize(raw["punto_entrada"])
+    entry_bonus = np.array([_instance_preference_bonus(value) for value in entry_uniques], dtype=np.int64)
+
+    # Instance statistics per (year, instance), then the best instance per year.
+    scored = has_year & (instances >= 0)
+    stats = (
+        pd.DataFrame(
+            {
+                "year": years[scored],
+                "instance": instances[scored],
+                "position": positions[scored],
+                "actual": actual[scored].astype(np.int64),
+                "non_zero": (has_value & (values != 0))[scored].astype(np.int64),
+                "concept": np.where(concepts >= 0, concepts, np.nan)[scored],
+            }
+        )
+        .groupby(["year", "instance"], sort=False)
+        .agg(
+            row_count=("position", "size"),
+            first=("position", "min"),
+            actual_count=("actual", "sum"),
+            non_zero_count=("non_zero", "sum"),
+            concept_count=("concept", "nunique"),
+        )
+        .reset_index()
+    )
+    preferred = np.full(0, -1, dtype=np.int64)
+    preferred_years = np.full(0, 0, dtype=np.int64)
+    if len(stats):
+        key_rank = np.empty(len(instance_keys), dtype=np.int64)
+        key_rank[np.argsort(np.array(instance_keys, dtype=object), kind="stable")] = np.arange(len(instance_keys))
+        stats["score"] = (
+            stats["concept_count"] * 6
+            + stats["actual_count"] * 4
+            + stats["non_zero_count"] * 2
+            + stats["row_count"]
+            + entry_bonus[entry_codes[stats["first"].to_numpy()]]
+        )
+        stats["rank"] = key_rank[stats["instance"].to_numpy()]
+        best = stats.sort_values(["year", "score", "rank"]).groupby("year", sort=False).tail(1)
+        preferred_years = best["year"].to_numpy()
+        preferred = best["instance"].to_numpy()
+
+    year_slot = pd.Index(preferred_years).get_indexer(years)
+    # Years without a preferred instance map to the trailing -1 sentinel.
+    row_preferred = np.append(preferred, -1)[year_slot]
+    keep = (
+        has_year
+        & (concepts >= 0)
+        & has_value
+        & ~((row_preferred >= 0) & (instances >= 0) & (instances != row_preferred))
+    )
+
+    # Duplicate resolution: best period score, then largest |value|, then the
+    # earliest row, per (year, concept).
+    kept = positions[keep]
+    if not len(kept):
+        return {}
+    kept_years = years[kept]
+    kept_concepts = concepts[kept]
+    order = np.lexsort((kept, -np.abs(values[kept]), -period_scores[kept], kept_concepts, kept_years))
+    group_years = kept_years[order]
+    group_concepts = kept_concepts[order]
+    starts = np.flatnonzero(
+        np.r_[True, (group_years[1:] != group_years[:-1]) | (group_concepts[1:] != group_concepts[:-1])]
+    )
+    winners = kept[order][starts]
+    first_seen = np.minimum.reduceat(kept[order], starts)
+
+    result: Dict[int, Dict[str, float]] = {}
+    for group in np.argsort(first_seen, kind="stable"):
+        row = winners[group]
+        result.setdefault(int(years[row]), {})[CONCEPT_VOCABULARY.name(concepts[row])] = float(values[row])
+    return result
+
+
+def statement_rows_frame(rows: Sequence[dict]) -> pd.DataFrame:
+    return pd.DataFrame.from_records(list(rows), columns=list(_FRAME_FIELDS))
+
+
+def normalize_statements(rows: Iterable[dict]) -> Dict[int, Dict[str, float]]:
+    """Normalize with the engine that is fastest for the input size.
+
+    Large in-memory row lists go to the vectorized engine; smaller ones and
+    streaming iterators are folded in a single pass.
+    """
+    if isinstance(rows, Sized) and len(rows) >= VECTORIZED_NORMALIZER_MIN_ROWS:
+        return normalize_statement_frame(statement_rows_frame(rows))
+    return normalize_statement_stream(rows)
+
+
 def select_recent_years(
     income_map: Dict[int, Dict[str, float]],
     balance_map: Dict[int, Dict[str, float]],
@@ -2,31 +2,201 @@
 
 from __future__ import annotations
 
+import csv
 import datetime as dt
+import io
 import logging
-from typing import Dict, List
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, TypeVar
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from app.config import (
+    BALANCE_CONCEPT_PATTERNS,
+    CASHFLOW_CONCEPT_PATTERNS,
     DEFAULT_LOOKBACK_YEARS,
+    DEP_AMORT_CONTAINS,
     HTTP_TIMEOUT_SECONDS,
+    INCOME_CONCEPT_PATTERNS,
+    OPERATING_EXPENSE_CONTAINS,
     SOCRATA_BASE_URL,
+    SOCRATA_CACHE_MAX_BYTES,
+    SOCRATA_CACHE_TTL_SECONDS,
     SOCRATA_DATASETS,
+    SOCRATA_FULL_RESYNC_SECONDS,
+    SOCRATA_MAX_WORKERS,
+    SOCRATA_NIT_BATCH_SIZE,
+    SOCRATA_PAGE_CONCURRENCY,
+    SOCRATA_PAGE_LIMIT,
+    SOCRATA_REDUCED_PAYLOAD,
+    SOCRATA_SELECT_COLUMNS,
     USER_AGENT,
 )
+from app.core.disk_cache import CacheEntry, DiskCache
 from app.core.exceptions import ConnectivityError, DataUnavailableError
-from app.utils.text import normalize_nit
+from app.core.singleflight import SingleFlight
+from app.finance.indicators import DEBT_INCLUDE_TERMS
+from app.models.entities import STATEMENT_TEXT_FIELDS, StatementColumns
+from app.services.socrata_mirror import SocrataMirror
+from app.utils.numbers import parse_amounts
+from app.utils.text import normalize_nit, normalize_text
 
 LOGGER = logging.getLogger(__name__)
 
+_Rows = TypeVar("_Rows", List[dict], StatementColumns)
+
+# Shared by every service instance so the UI worker, prefetches and batch jobs
+# asking for the same NIT at once trigger a single download.
+_IN_FLIGHT = SingleFlight()
+
+# Vowels may carry an accent in the published concept labels. They become
+# single-character LIKE wildcards so the server-side filter stays a superset of
+# the accent-insensitive matching done by the normalizer.
+_ACCENTABLE_LETTERS = set("aeiou")
+
+
+def _dataset_concept_needles() -> Dict[str, List[str]]:
+    def pattern_needles(patterns: dict) -> List[str]:
+        needles: List[str] = []
+        for pattern in patterns.values():
+            needles.extend(pattern.exact)
+            needles.extend(pattern.contains)
+        return needles
+
+    return {
+        SOCRATA_DATASETS["balance"]: pattern_needles(BALANCE_CONCEPT_PATTERNS) + DEBT_INCLUDE_TERMS,
+        SOCRATA_DATASETS["income"]: (
+            pattern_needles(INCOME_CONCEPT_PATTERNS)
+            + DEP_AMORT_CONTAINS
+            + OPERATING_EXPENSE_CONTAINS
+            + ["ebitda"]
+        ),
+        SOCRATA_DATASETS["cashflow"]: pattern_needles(CASHFLOW_CONCEPT_PATTERNS),
+    }
+
+
+def _soql_like_pattern(needle: str) -> str:
+    chars = []
+    for char in needle.upper():
+        if char.lower() in _ACCENTABLE_LETTERS:
+            chars.append("_")
+        elif char == " ":
+            chars.append("%")
+        elif char == "'":
+            chars.append("''")
+        else:
+            chars.append(char)
+    return "%" + "".join(chars) + "%"
+
+
+def _reduced_payload_filter(needles: List[str]) -> str:
+    """SoQL predicate keeping current-period rows whose concept a metric can use."""
+    normalized = sorted({normalize_text(n) for n in needles if normalize_text(n)}, key=lambda n: (len(n), n))
+    # A needle that contains a shorter needle adds nothing to a LIKE filter.
+    minimal: List[str] = []
+    for needle in normalized:
+        if not any(kept in needle for kept in minimal):
+            minimal.append(needle)
+
+    concept_filter = " OR ".join(f"upper(concepto) like '{_soql_like_pattern(n)}'" for n in minimal)
+    period_filter = "(periodo IS NULL OR upper(periodo) not like '%ANTERIOR%')"
+    return f"({concept_filter}) AND {period_filter}"
+
+
+_REDUCED_PAYLOAD_FILTERS = {
+    dataset_id: _reduced_payload_filter(needles)
+    for dataset_id, needles in _dataset_concept_needles().items()
+}
+
+
+def _newest_filing(filings: Iterable[tuple[str, str]]) -> tuple[str, str] | None:
+    """Newest ``(fecha_corte, numero_radicado)`` pair; undated filings are ignored."""
+    return max((filing for filing in filings if filing[0]), default=None)
+
+
+def _sync_watermark(rows: List[dict]) -> tuple[str, str] | None:
+    """Newest ``(fecha_corte, numero_radicado)`` held locally for one dataset."""
+    return _newest_filing(
+        (str(row.get("fecha_corte") or ""), str(row.get("numero_radicado") or "")) for row in rows
+    )
+
+
+def _append_csv_page(columns: StatementColumns, text: str) -> tuple[int, str | None, str | None]:
+    """Parse one ``.csv`` resource page into ``columns``.
+
+    Returns the page size plus the keyset position of its last row.
+    """
+    reader = csv.reader(io.StringIO(text))
+    header = next(reader, None)
+    if not header:
+        return 0, None, None
+    try:
+        text_positions = [(getattr(columns, name).append, header.index(name)) for name in STATEMENT_TEXT_FIELDS]
+        value_position = header.index("valor")
+        date_position = header.index("fecha_corte")
+        id_position = header.index(":id")
+    except ValueError as exc:
+        raise DataUnavailableError(
+            "La respuesta de datos.gov.co no tiene el formato esperado."
+        ) from exc
+
+    raw_values: List[str] = []
+    record: List[str] = []
+    for record in reader:
+        for append, position in text_positions:
+            append(record[position])
+        raw_values.append(record[value_position])
+
+    count = len(raw_values)
+    if not count:
+        return 0, None, None
+    amounts, _ = parse_amounts(raw_values)
+    columns.valor.frombytes(amounts.tobytes())
+    return count, record[date_position], record[id_position]
+
+
+def _columns_from_csv_pages(pages: Iterable[str]) -> StatementColumns:
+    columns = StatementColumns()
+    for page in pages:
+        _append_csv_page(columns, page)
+    return columns
+
 
 class SocrataFinancialService:
     """Adapter for Socrata dataset queries."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        max_workers: int = SOCRATA_MAX_WORKERS,
+        cache: DiskCache | None = None,
+        use_cache: bool = True,
+        reduced_payload: bool = SOCRATA_REDUCED_PAYLOAD,
+        mirror: SocrataMirror | None = None,
+        page_concurrency: int = SOCRATA_PAGE_CONCURRENCY,
+    ) -> None:
+        self.max_workers = max(1, max_workers)
+        self.page_concurrency = max(1, page_concurrency)
+        self.reduced_payload = reduced_payload
+        # The local mirror only answers for datasets ingested recently
+        # (python -m app.services.socrata_mirror) and NITs it holds rows for;
+        # everything else goes online.
+        self.mirror = mirror or SocrataMirror()
+        if cache is None and use_cache:
+            cache = DiskCache(
+                namespace="socrata",
+                ttl_seconds=SOCRATA_CACHE_TTL_SECONDS,
+                max_bytes=SOCRATA_CACHE_MAX_BYTES,
+            )
+        self.cache = cache
         self.session = requests.Session()
         self.session.headers.update({"User-Agent": USER_AGENT})
+        # One pooled adapter shared by every worker thread, sized so parallel
+        # dataset and page downloads reuse connections instead of opening new ones.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers * self.page_concurrency)
+        self.session.mount("https://", adapter)
 
     def fetch_company_financial_rows(
         self, nit: str, lookback_years: int = DEFAULT_LOOKBACK_YEARS
@@ -35,15 +205,11 @@ class SocrataFinancialService:
         if not clean_nit:
             raise DataUnavailableError("NIT invalido para consultar informacion financiera.")
 
-        current_year = dt.date.today().year
-        min_year = current_year - max(lookback_years + 2, 7)
-        min_date = f"{min_year}-01-01T00:00:00"
-
-        all_data: Dict[str, List[dict]] = {}
-        for key, dataset_id in SOCRATA_DATASETS.items():
-            rows = self._fetch_dataset_rows(dataset_id=dataset_id, nit=clean_nit, min_date=min_date)
-            all_data[key] = rows
-            LOGGER.info("Socrata dataset=%s rows=%s nit=%s", key, len(rows), clean_nit)
+        min_date = self._min_date(lookback_years)
+        all_data = _IN_FLIGHT.do(
+            ("socrata.rows", clean_nit, min_date, self.reduced_payload),
+            lambda: self._fetch_all_datasets(self._fetch_dataset_rows, nit=clean_nit, min_date=min_date),
+        )
 
         if not any(all_data.values()):
             raise DataUnavailableError(
@@ -51,44 +217,473 @@ class SocrataFinancialService:
             )
         return all_data
 
-    def _fetch_dataset_rows(self, dataset_id: str, nit: str, min_date: str) -> List[dict]:
-        url = f"{SOCRATA_BASE_URL}/{dataset_id}.json"
+    def fetch_company_financial_columns(
+        self, nit: str, lookback_years: int = DEFAULT_LOOKBACK_YEARS
+    ) -> Dict[str, StatementColumns]:
+        """Like ``fetch_company_financial_rows`` but decoded straight into columns.
 
-        limit = 5000
-        offset = 0
-        rows: List[dict] = []
+        Network pages come from the ``.csv`` resource and are parsed into
+        ``StatementColumns`` without building a dict per row. The cache keeps
+        those pages as received and tops them up with the same incremental
+        sync as the row path; mirrored rows, and rows cached fresh by a batch
+        download, are converted. Pair with ``normalize_statement_columns``.
+        """
+        clean_nit = normalize_nit(nit)
+        if not clean_nit:
+            raise DataUnavailableError("NIT invalido para consultar informacion financiera.")
 
-        where_clause = f"nit={nit} AND fecha_corte >= '{min_date}'"
+        min_date = self._min_date(lookback_years)
+        all_data = _IN_FLIGHT.do(
+            ("socrata.columns", clean_nit, min_date, self.reduced_payload),
+            lambda: self._fetch_all_datasets(self._fetch_dataset_columns, nit=clean_nit, min_date=min_date),
+        )
 
-        while True:
-            params = {
-                "$select": (
-                    "nit,fecha_corte,periodo,concepto,valor,"
-                    "numero_radicado,id_punto_entrada,punto_entrada,id_taxonomia,codigo_instancia"
-                ),
-                "$where": where_clause,
-                "$order": "fecha_corte DESC",
-                "$limit": limit,
-                "$offset": offset,
+        if not any(len(columns) for columns in all_data.values()):
+            raise DataUnavailableError(
+                "No se encontraron estados financieros para este NIT en los datos abiertos disponibles."
+            )
+        return all_data
+
+    def fetch_many(
+        self, nits: Iterable[str], lookback_years: int = DEFAULT_LOOKBACK_YEARS
+    ) -> Dict[str, Dict[str, List[dict]]]:
+        """Fetch statements for many companies with one SoQL ``IN`` query per batch.
+
+        Returns ``{nit: {dataset_key: rows}}`` using the same per-NIT shape as
+        ``fetch_company_financial_rows``. NITs without published statements map
+        to empty lists instead of raising, so one gap does not abort a portfolio.
+        """
+        clean_nits = list(dict.fromkeys(n for n in (normalize_nit(nit) for nit in nits) if n))
+        min_date = self._min_date(lookback_years)
+        result: Dict[str, Dict[str, List[dict]]] = {nit: {} for nit in clean_nits}
+
+        # Stale entries are refreshed with a full batched download here; the
+        # per-NIT incremental sync would cost one request per company.
+        tasks: List[tuple[str, str, List[str]]] = []
+        for key, dataset_id in SOCRATA_DATASETS.items():
+            pending: List[str] = []
+            for nit in clean_nits:
+                rows = self._mirrored_rows(dataset_id, nit, min_date) or self._cached_rows(
+                    self._cache_key(dataset_id, nit, min_date)
+                )
+                if rows is None:
+                    pending.append(nit)
+                else:
+                    result[nit][key] = rows
+            for start in range(0, len(pending), SOCRATA_NIT_BATCH_SIZE):
+                tasks.append((key, dataset_id, pending[start : start + SOCRATA_NIT_BATCH_SIZE]))
+
+        workers = min(self.max_workers, len(tasks)) or 1
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="socrata") as executor:
+            futures = [
+                (key, dataset_id, batch, executor.submit(self._download_batch_rows, dataset_id, batch, min_date))
+                for key, dataset_id, batch in tasks
+            ]
+            try:
+                for key, dataset_id, batch, future in futures:
+                    rows_by_nit = future.result()
+                    for nit in batch:
+                        rows = rows_by_nit[nit]
+                        result[nit][key] = rows
+                        self._store_rows(self._cache_key(dataset_id, nit, min_date), rows, time.time())
+                    LOGGER.info(
+                        "Socrata batch dataset=%s nits=%s rows=%s",
+                        key,
+                        len(batch),
+                        sum(len(rows) for rows in rows_by_nit.values()),
+                    )
+            except Exception:
+                for *_, future in futures:
+                    future.cancel()
+                raise
+
+        return result
+
+    def iter_dataset_pages(
+        self, nit: str, dataset: str, lookback_years: int = DEFAULT_LOOKBACK_YEARS
+    ) -> Iterator[List[dict]]:
+        """Stream one dataset (``balance``/``income``/``cashflow``) page by page.
+
+        Pages are yielded as soon as they arrive so callers can normalize
+        incrementally. A mirrored or cached copy is served as a single page;
+        streamed downloads are not written to the cache because that would
+        require holding the full payload.
+        """
+        clean_nit = normalize_nit(nit)
+        if not clean_nit:
+            raise DataUnavailableError("NIT invalido para consultar informacion financiera.")
+        dataset_id = SOCRATA_DATASETS[dataset]
+        min_date = self._min_date(lookback_years)
+
+        mirrored = self._mirrored_rows(dataset_id, clean_nit, min_date)
+        if mirrored:
+            yield mirrored
+            return
+
+        cached = self._cached_rows(self._cache_key(dataset_id, clean_nit, min_date))
+        if cached is not None:
+            yield cached
+            return
+
+        where_clause = self._where_clause(dataset_id, f"nit={clean_nit}", min_date)
+        yield from self._iter_pages(dataset_id=dataset_id, where_clause=where_clause)
+
+    @staticmethod
+    def _min_date(lookback_years: int) -> str:
+        current_year = dt.date.today().year
+        min_year = current_year - max(lookback_years + 2, 7)
+        return f"{min_year}-01-01T00:00:00"
+
+    def _cache_key(self, dataset_id: str, nit: str, min_date: str) -> tuple[str, ...]:
+        if self.reduced_payload:
+            return (dataset_id, nit, min_date, "reduced")
+        return (dataset_id, nit, min_date)
+
+    def _where_clause(self, dataset_id: str, nit_filter: str, min_date: str) -> str:
+        where_clause = f"{nit_filter} AND fecha_corte >= '{min_date}'"
+        if self.reduced_payload:
+            where_clause += f" AND {_REDUCED_PAYLOAD_FILTERS[dataset_id]}"
+        return where_clause
+
+    def _fetch_all_datasets(
+        self, fetch: Callable[[str, str, str], _Rows], nit: str, min_date: str
+    ) -> Dict[str, _Rows]:
+        """Run ``fetch`` for every dataset; the first failure is re-raised as-is."""
+        all_data: Dict[str, _Rows] = {}
+        if self.max_workers == 1:
+            for key, dataset_id in SOCRATA_DATASETS.items():
+                rows = fetch(dataset_id, nit, min_date)
+                all_data[key] = rows
+                LOGGER.info("Socrata dataset=%s rows=%s nit=%s", key, len(rows), nit)
+            return all_data
+
+        # A worker freed by a failure picks the next queued dataset before the
+        # failure reaches this thread and cancels it; the flag stops that one.
+        failed = threading.Event()
+
+        def fetch_unless_failed(dataset_id: str) -> _Rows:
+            if failed.is_set():
+                raise CancelledError()
+            try:
+                return fetch(dataset_id, nit, min_date)
+            except BaseException:
+                failed.set()
+                raise
+
+        workers = min(self.max_workers, len(SOCRATA_DATASETS))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="socrata") as executor:
+            futures = {
+                key: executor.submit(fetch_unless_failed, dataset_id)
+                for key, dataset_id in SOCRATA_DATASETS.items()
             }
             try:
-                response = self.session.get(url, params=params, timeout=HTTP_TIMEOUT_SECONDS)
-                response.raise_for_status()
-            except requests.RequestException as exc:
-                raise ConnectivityError(
-                    "No fue posible conectarse con datos.gov.co para descargar estados financieros."
-                ) from exc
-
-            chunk = response.json()
-            if not isinstance(chunk, list):
-                raise DataUnavailableError(
-                    "La respuesta de datos.gov.co no tiene el formato esperado."
+                for key, future in futures.items():
+                    rows = future.result()
+                    all_data[key] = rows
+                    LOGGER.info("Socrata dataset=%s rows=%s nit=%s", key, len(rows), nit)
+            except Exception:
+                for future in futures.values():
+                    future.cancel()
+                raise
+        return all_data
+
+    def _mirrored_rows(self, dataset_id: str, nit: str, min_date: str) -> List[dict]:
+        """Rows held by a current mirror; empty when the NIT should be fetched online.
+
+        A NIT missing from the mirror may have filed after the bulk export, so
+        an empty answer is not taken as "no statements".
+        """
+        if not self.mirror.has_dataset(dataset_id):
+            return []
+        return self.mirror.fetch_rows(dataset_id, nit, min_date)
+
+    def _fetch_dataset_rows(self, dataset_id: str, nit: str, min_date: str) -> List[dict]:
+        mirrored = self._mirrored_rows(dataset_id, nit, min_date)
+        if mirrored:
+            return mirrored
+
+        cache_key = self._cache_key(dataset_id, nit, min_date)
+        entry = self._read_cache(cache_key)
+        if entry is not None and self.cache.is_fresh(entry):
+            LOGGER.info("Socrata cache hit dataset_id=%s nit=%s", dataset_id, nit)
+            return entry.value["rows"]
+
+        if entry is not None:
+            stored_rows = entry.value["rows"]
+            full_sync_at = float(entry.value.get("full_sync_at", entry.stored_at))
+            watermark = _sync_watermark(stored_rows)
+            if watermark is not None and time.time() - full_sync_at <= SOCRATA_FULL_RESYNC_SECONDS:
+                new_rows = self._download_newer_rows(dataset_id, nit, min_date, watermark)
+                LOGGER.info(
+                    "Socrata incremental sync dataset_id=%s nit=%s since=%s new_rows=%s",
+                    dataset_id,
+                    nit,
+                    watermark[0],
+                    len(new_rows),
+                )
+                # Both lists are ordered newest first and every new row is
+                # strictly past the watermark, so prepending keeps the order.
+                rows = new_rows + stored_rows
+                self._store_rows(cache_key, rows, full_sync_at)
+                return rows
+
+        rows = self._download_dataset_rows(dataset_id=dataset_id, nit=nit, min_date=min_date)
+        self._store_rows(cache_key, rows, time.time())
+        return rows
+
+    def _fetch_dataset_columns(self, dataset_id: str, nit: str, min_date: str) -> StatementColumns:
+        mirrored = self._mirrored_rows(dataset_id, nit, min_date)
+        if mirrored:
+            return StatementColumns.from_rows(mirrored)
+
+        cache_key = self._cache_key(dataset_id, nit, min_date) + ("csv",)
+        entry = self._read_cache(cache_key, field_name="pages")
+        if entry is not None and self.cache.is_fresh(entry):
+            LOGGER.info("Socrata cache hit dataset_id=%s nit=%s", dataset_id, nit)
+            return _columns_from_csv_pages(entry.value["pages"])
+
+        cached_rows = self._cached_rows(self._cache_key(dataset_id, nit, min_date))
+        if cached_rows is not None:
+            return StatementColumns.from_rows(cached_rows)
+
+        if entry is not None:
+            stored_pages = entry.value["pages"]
+            full_sync_at = float(entry.value.get("full_sync_at", entry.stored_at))
+            stored = _columns_from_csv_pages(stored_pages)
+            watermark = _newest_filing(zip(stored.fecha_corte, stored.numero_radicado))
+            if watermark is not None and time.time() - full_sync_at <= SOCRATA_FULL_RESYNC_SECONDS:
+                columns = StatementColumns()
+                new_pages = self._query_csv_pages(
+                    dataset_id, self._newer_rows_where(dataset_id, nit, min_date, watermark), columns
+                )
+                LOGGER.info(
+                    "Socrata incremental sync dataset_id=%s nit=%s since=%s new_rows=%s",
+                    dataset_id,
+                    nit,
+                    watermark[0],
+                    len(columns),
                 )
+                # Same ordering argument as the row path: new pages go first.
+                for page in stored_pages:
+                    _append_csv_page(columns, page)
+                self._store_csv_pages(cache_key, new_pages + stored_pages, full_sync_at)
+                return columns
+
+        columns = StatementColumns()
+        pages = self._query_csv_pages(dataset_id, self._where_clause(dataset_id, f"nit={nit}", min_date), columns)
+        self._store_csv_pages(cache_key, pages, time.time())
+        return columns
+
+    def _query_csv_pages(self, dataset_id: str, where_clause: str, columns: StatementColumns) -> List[str]:
+        """Keyset-page the ``.csv`` resource into ``columns``; returns the non-empty pages."""
+        url = f"{SOCRATA_BASE_URL}/{dataset_id}.csv"
+        limit = SOCRATA_PAGE_LIMIT
+        pages: List[str] = []
+        page_where = where_clause
+
+        while True:
+            text = self._get(url, self._page_params(page_where, limit)).text
+            page_size, last_date, last_id = _append_csv_page(columns, text)
+            if page_size:
+                pages.append(text)
+            if page_size < limit:
+                return pages
+            page_where = self._keyset_where(where_clause, last_date, last_id)
+
+    def _read_cache(self, cache_key: tuple[str, ...], field_name: str = "rows") -> CacheEntry | None:
+        if self.cache is None:
+            return None
+        entry = self.cache.get_entry(cache_key)
+        if (
+            entry is None
+            or not isinstance(entry.value, dict)
+            or not isinstance(entry.value.get(field_name), list)
+        ):
+            return None
+        return entry
+
+    def _cached_rows(self, cache_key: tuple[str, ...]) -> List[dict] | None:
+        entry = self._read_cache(cache_key)
+        if entry is None or not self.cache.is_fresh(entry):
+            return None
+        return entry.value["rows"]
+
+    def _store_rows(self, cache_key: tuple[str, ...], rows: List[dict], full_sync_at: float) -> None:
+        if self.cache is not None:
+            self.cache.set(cache_key, {"rows": rows, "full_sync_at": full_sync_at})
+
+    def _store_csv_pages(self, cache_key: tuple[str, ...], pages: List[str], full_sync_at: float) -> None:
+        if self.cache is not None:
+            self.cache.set(cache_key, {"pages": pages, "full_sync_at": full_sync_at})
+
+    def _newer_rows_where(self, dataset_id: str, nit: str, min_date: str, watermark: tuple[str, str]) -> str:
+        newest_date, newest_radicado = (value.replace("'", "''") for value in watermark)
+        return (
+            f"{self._where_clause(dataset_id, f'nit={nit}', min_date)}"
+            f" AND (fecha_corte > '{newest_date}'"
+            f" OR (fecha_corte = '{newest_date}' AND numero_radicado > '{newest_radicado}'))"
+        )
 
-            rows.extend(chunk)
-            if len(chunk) < limit or offset > 100_000:
-                break
+    def _download_newer_rows(
+        self, dataset_id: str, nit: str, min_date: str, watermark: tuple[str, str]
+    ) -> List[dict]:
+        where_clause = self._newer_rows_where(dataset_id, nit, min_date, watermark)
+        return self._query_rows(dataset_id=dataset_id, where_clause=where_clause)
 
-            offset += limit
+    def _download_dataset_rows(self, dataset_id: str, nit: str, min_date: str) -> List[dict]:
+        where_clause = self._where_clause(dataset_id, f"nit={nit}", min_date)
+        return self._query_rows(dataset_id=dataset_id, where_clause=where_clause)
 
+    def _download_batch_rows(self, dataset_id: str, nits: List[str], min_date: str) -> Dict[str, List[dict]]:
+        where_clause = self._where_clause(dataset_id, f"nit in({','.join(nits)})", min_date)
+        rows_by_nit: Dict[str, List[dict]] = {nit: [] for nit in nits}
+        for row in self._query_rows(dataset_id=dataset_id, where_clause=where_clause):
+            bucket = rows_by_nit.get(normalize_nit(str(row.get("nit") or "")))
+            if bucket is not None:
+                bucket.append(row)
+        return rows_by_nit
+
+    def _query_rows(self, dataset_id: str, where_clause: str) -> List[dict]:
+        if self.page_concurrency > 1:
+            return self._query_rows_prefetched(dataset_id=dataset_id, where_clause=where_clause)
+
+        rows: List[dict] = []
+        for page in self._iter_pages(dataset_id=dataset_id, where_clause=where_clause):
+            rows.extend(page)
         return rows
+
+    def _query_rows_prefetched(self, dataset_id: str, where_clause: str) -> List[dict]:
+        """Fetch every page concurrently once the first page shows there are more.
+
+        Opt-in through ``page_concurrency`` > 1: it trades keyset paging's
+        cheap deep pages for parallel ``$offset`` requests. Small filers cost a
+        single request either way. When the first page is full, ``count(*)``
+        sizes the remaining pages, which are requested in parallel (at most
+        ``page_concurrency`` at a time) and reassembled in order.
+        """
+        url = f"{SOCRATA_BASE_URL}/{dataset_id}.json"
+        limit = SOCRATA_PAGE_LIMIT
+
+        first = self._get_json(url, self._page_params(where_clause, limit, offset=0))
+        pages = [first]
+        if len(first) == limit:
+            total = self._count_rows(url, where_clause)
+            offsets = list(range(limit, total, limit))
+            if offsets:
+                workers = min(self.page_concurrency, len(offsets))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="socrata-page") as executor:
+                    pages.extend(
+                        executor.map(
+                            lambda offset: self._get_json(url, self._page_params(where_clause, limit, offset)),
+                            offsets,
+                        )
+                    )
+
+        last_page = pages[-1]
+        if len(last_page) == limit:
+            # Filings published after the count sort first under fecha_corte
+            # DESC and push every later row down: the offset pages then repeat
+            # rows across their boundaries and the tail spills past the last
+            # page. Keyset paging picks up the tail; repeats are dropped below.
+            last = last_page[-1]
+            pages.extend(
+                self._iter_pages(
+                    dataset_id=dataset_id,
+                    where_clause=where_clause,
+                    after=(last.get("fecha_corte"), last.get(":id")),
+                )
+            )
+
+        rows: List[dict] = []
+        seen_ids = set()
+        for page in pages:
+            for row in page:
+                row_id = row.pop(":id", None)
+                if row_id is not None:
+                    if row_id in seen_ids:
+                        continue
+                    seen_ids.add(row_id)
+                rows.append(row)
+        return rows
+
+    def _count_rows(self, url: str, where_clause: str) -> int:
+        chunk = self._get_json(url, {"$select": "count(*) AS total", "$where": where_clause})
+        try:
+            return int(chunk[0]["total"])
+        except (IndexError, KeyError, TypeError, ValueError) as exc:
+            raise DataUnavailableError(
+                "La respuesta de datos.gov.co no tiene el formato esperado."
+            ) from exc
+
+    @staticmethod
+    def _page_params(where_clause: str, limit: int, offset: int | None = None) -> dict:
+        params = {
+            "$select": f"{SOCRATA_SELECT_COLUMNS},:id",
+            "$where": where_clause,
+            "$order": "fecha_corte DESC, :id ASC",
+            "$limit": limit,
+        }
+        if offset is not None:
+            params["$offset"] = offset
+        return params
+
+    def _iter_pages(
+        self,
+        dataset_id: str,
+        where_clause: str,
+        after: tuple[str | None, str | None] | None = None,
+    ) -> Iterator[List[dict]]:
+        """Yield result pages using keyset pagination on ``(fecha_corte, :id)``.
+
+        Each request resumes strictly after the last row already seen instead of
+        using ``$offset``, so deep pages stay cheap on the server and large
+        filers are never truncated. ``after`` resumes past an already known row.
+        """
+        url = f"{SOCRATA_BASE_URL}/{dataset_id}.json"
+        limit = SOCRATA_PAGE_LIMIT
+        page_where = where_clause if after is None else self._keyset_where(where_clause, *after)
+
+        while True:
+            chunk = self._get_json(url, self._page_params(page_where, limit))
+            if not chunk:
+                return
+
+            last = chunk[-1]
+            last_date = last.get("fecha_corte")
+            last_id = last.get(":id")
+            for row in chunk:
+                row.pop(":id", None)
+            yield chunk
+
+            if len(chunk) < limit:
+                return
+            page_where = self._keyset_where(where_clause, last_date, last_id)
+
+    @staticmethod
+    def _keyset_where(where_clause: str, last_date: str | None, last_id: str | None) -> str:
+        if not last_date or not last_id:
+            raise DataUnavailableError(
+                "La respuesta de datos.gov.co no tiene el formato esperado."
+            )
+        return (
+            f"({where_clause}) AND (fecha_corte < '{last_date}'"
+            f" OR (fecha_corte = '{last_date}' AND :id > '{last_id}'))"
+        )
+
+    def _get(self, url: str, params: dict) -> requests.Response:
+        try:
+            response = self.session.get(url, params=params, timeout=HTTP_TIMEOUT_SECONDS)
+            response.raise_for_status()
+        except requests.RequestException as exc:
+            raise ConnectivityError(
+                "No fue posible conectarse con datos.gov.co para descargar estados financieros."
+            ) from exc
+        return response
+
+    def _get_json(self, url: str, params: dict) -> List[dict]:
+        chunk = self._get(url, params).json()
+        if not isinstance(chunk, list):
+            raise DataUnavailableError(
+                "La respuesta de datos.gov.co no tiene el formato esperado."
+            )
+        return chunk
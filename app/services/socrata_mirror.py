@@ -0,0 +1,310 @@
+﻿"""Offline SQLite mirror of the Supersociedades NIIF datasets (datos.gov.co)."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import datetime as dt
+import io
+import logging
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+import requests
+from urllib3.exceptions import HTTPError as Urllib3Error
+
+from app.config import (
+    HTTP_TIMEOUT_SECONDS,
+    SOCRATA_BULK_EXPORT_URL,
+    SOCRATA_DATASETS,
+    SOCRATA_MIRROR_MAX_AGE_SECONDS,
+    SOCRATA_MIRROR_MMAP_BYTES,
+    USER_AGENT,
+)
+from app.core.exceptions import ConnectivityError, SourceFormatError
+from app.core.paths import get_mirror_path
+from app.services.company_index import CompanyNameIndex
+from app.utils.text import normalize_nit, normalize_text
+
+LOGGER = logging.getLogger(__name__)
+
+ROW_FIELDS = [
+    "nit",
+    "fecha_corte",
+    "periodo",
+    "concepto",
+    "valor",
+    "numero_radicado",
+    "id_punto_entrada",
+    "punto_entrada",
+    "id_taxonomia",
+    "codigo_instancia",
+]
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS statement_rows (
+    dataset_id TEXT NOT NULL,
+    anio INTEGER,
+    {", ".join(f"{field} TEXT" for field in ROW_FIELDS)}
+);
+CREATE INDEX IF NOT EXISTS idx_statement_rows_nit_year
+    ON statement_rows (dataset_id, nit, anio);
+CREATE TABLE IF NOT EXISTS companies (
+    nit TEXT PRIMARY KEY,
+    razon_social TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ingest_log (
+    dataset_id TEXT PRIMARY KEY,
+    ingested_at REAL NOT NULL,
+    row_count INTEGER NOT NULL
+);
+"""
+
+_HEADER_STOPWORDS = {"de", "del", "la", "el"}
+_THOUSANDS_RE = re.compile(r"^-?\d{1,3}(,\d{3})+(\.\d+)?$")
+_CSV_DATE_FORMATS = ("%m/%d/%Y %I:%M:%S %p", "%m/%d/%Y", "%Y/%m/%d", "%d/%m/%Y")
+
+
+def _header_tokens(text: str) -> frozenset[str]:
+    words = re.split(r"[^a-z0-9]+", normalize_text(text))
+    return frozenset(w for w in words if w and w not in _HEADER_STOPWORDS)
+
+
+def _resolve_columns(header: List[str]) -> Dict[str, int]:
+    """Map API field names to CSV positions.
+
+    Bulk exports label columns with display names ("Fecha de Corte",
+    "Numero Radicado"), so both the field name and its display form are
+    matched on their word sets.
+    """
+    wanted = {field: _header_tokens(field.replace("_", " ")) for field in ROW_FIELDS + ["razon_social"]}
+    positions: Dict[str, int] = {}
+    for index, name in enumerate(header):
+        tokens = _header_tokens(name)
+        for field, field_tokens in wanted.items():
+            if field not in positions and tokens == field_tokens:
+                positions[field] = index
+
+    missing = [field for field in ROW_FIELDS if field not in positions]
+    if missing:
+        raise SourceFormatError(
+            "La exportacion CSV de datos.gov.co no contiene las columnas esperadas: " + ", ".join(missing)
+        )
+    return positions
+
+
+def _iso_date(raw: str) -> str:
+    text = raw.strip()
+    if re.match(r"^\d{4}-\d{2}-\d{2}", text):
+        return text
+    for fmt in _CSV_DATE_FORMATS:
+        try:
+            return dt.datetime.strptime(text, fmt).strftime("%Y-%m-%dT%H:%M:%S.000")
+        except ValueError:
+            continue
+    return text
+
+
+def _clean_amount(raw: str) -> str:
+    text = raw.strip()
+    # Bulk exports may group thousands with commas, which parse_amount would
+    # read as a decimal comma.
+    if _THOUSANDS_RE.match(text):
+        return text.replace(",", "")
+    return text
+
+
+class SocrataMirror:
+    """Serve statement rows from a local SQLite copy of the NIIF datasets.
+
+    The database is read through short-lived read-only connections with
+    ``mmap_size`` enabled, so lookups by NIT hit the page cache instead of the
+    network. A dataset is only served while its last ingest is younger than
+    ``max_age_seconds``.
+    """
+
+    def __init__(
+        self, path: Path | None = None, max_age_seconds: float = SOCRATA_MIRROR_MAX_AGE_SECONDS
+    ) -> None:
+        self.path = path or get_mirror_path(create_if_missing=False) / "socrata_niif.sqlite"
+        self.max_age_seconds = max_age_seconds
+        self._ingested_at: Dict[str, float | None] = {}
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def has_dataset(self, dataset_id: str) -> bool:
+        """Whether ``dataset_id`` was ingested recently enough to be served."""
+        if dataset_id not in self._ingested_at:
+            if not self.exists():
+                return False
+            with self._read_connection() as conn:
+                row = conn.execute(
+                    "SELECT ingested_at FROM ingest_log WHERE dataset_id = ?", (dataset_id,)
+                ).fetchone()
+            self._ingested_at[dataset_id] = row[0] if row is not None else None
+        ingested_at = self._ingested_at[dataset_id]
+        return ingested_at is not None and time.time() - ingested_at <= self.max_age_seconds
+
+    def fetch_rows(self, dataset_id: str, nit: str, min_date: str) -> List[dict]:
+        min_year = int(min_date[:4])
+        with self._read_connection() as conn:
+            cursor = conn.execute(
+                f"SELECT {', '.join(ROW_FIELDS)} FROM statement_rows"
+                " WHERE dataset_id = ? AND nit = ? AND anio >= ? AND fecha_corte >= ?"
+                " ORDER BY fecha_corte DESC",
+                (dataset_id, nit, min_year, min_date),
+            )
+            return [dict(zip(ROW_FIELDS, values)) for values in cursor]
+
+    def iter_companies(self) -> Iterator[tuple[str, str]]:
+        """Yield ``(nit, razon_social)`` pairs captured during ingest, if any."""
+        if not self.exists():
+            return
+        with self._read_connection() as conn:
+            yield from conn.execute("SELECT nit, razon_social FROM companies")
+
+    def ingest(self, dataset: str, session: requests.Session | None = None) -> int:
+        """Download one dataset's bulk CSV export and replace its mirrored rows."""
+        dataset_id = SOCRATA_DATASETS[dataset]
+        session = session or requests.Session()
+        session.headers.update({"User-Agent": USER_AGENT})
+        url = SOCRATA_BULK_EXPORT_URL.format(dataset_id=dataset_id)
+
+        started = time.time()
+        try:
+            response = session.get(url, stream=True, timeout=HTTP_TIMEOUT_SECONDS)
+            response.raise_for_status()
+            response.raw.decode_content = True
+            reader = csv.reader(io.TextIOWrapper(response.raw, encoding="utf-8-sig", newline=""))
+            count = self._load_rows(dataset_id, reader)
+        # Reading response.raw directly surfaces urllib3 errors unwrapped.
+        except (requests.RequestException, Urllib3Error) as exc:
+            raise ConnectivityError(
+                "No fue posible descargar la exportacion masiva de datos.gov.co."
+            ) from exc
+
+        LOGGER.info(
+            "Mirror ingest dataset=%s rows=%s seconds=%.1f", dataset, count, time.time() - started
+        )
+        return count
+
+    def _load_rows(self, dataset_id: str, reader: Iterable[List[str]]) -> int:
+        rows_iter = iter(reader)
+        header = next(rows_iter, None)
+        if header is None:
+            raise SourceFormatError("La exportacion CSV de datos.gov.co llego vacia.")
+        positions = _resolve_columns(header)
+        name_position = positions.get("razon_social")
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        try:
+            conn.executescript(_SCHEMA)
+            conn.execute("DELETE FROM statement_rows WHERE dataset_id = ?", (dataset_id,))
+            conn.execute("DELETE FROM ingest_log WHERE dataset_id = ?", (dataset_id,))
+
+            count = 0
+            batch: List[tuple] = []
+            companies: Dict[str, str] = {}
+            for record in rows_iter:
+                if len(record) < len(header):
+                    continue
+                values = {field: record[index] for field, index in positions.items()}
+                nit = normalize_nit(values["nit"])
+                if not nit:
+                    continue
+                fecha_corte = _iso_date(values["fecha_corte"])
+                year = int(fecha_corte[:4]) if fecha_corte[:4].isdigit() else None
+                values["nit"] = nit
+                values["fecha_corte"] = fecha_corte
+                values["valor"] = _clean_amount(values["valor"])
+                batch.append((dataset_id, year, *(values[field] or None for field in ROW_FIELDS)))
+                if name_position is not None and record[name_position].strip():
+                    companies[nit] = record[name_position].strip()
+
+                if len(batch) >= 20_000:
+                    self._insert_batch(conn, batch)
+                    count += len(batch)
+                    batch.clear()
+
+            self._insert_batch(conn, batch)
+            count += len(batch)
+            conn.executemany(
+                "INSERT OR REPLACE INTO companies (nit, razon_social) VALUES (?, ?)",
+                companies.items(),
+            )
+            ingested_at = time.time()
+            conn.execute(
+                "INSERT INTO ingest_log (dataset_id, ingested_at, row_count) VALUES (?, ?, ?)",
+                (dataset_id, ingested_at, count),
+            )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        self._ingested_at[dataset_id] = ingested_at
+        return count
+
+    @staticmethod
+    def _insert_batch(conn: sqlite3.Connection, batch: List[tuple]) -> None:
+        if not batch:
+            return
+        placeholders = ", ".join("?" for _ in range(len(ROW_FIELDS) + 2))
+        conn.executemany(
+            f"INSERT INTO statement_rows (dataset_id, anio, {', '.join(ROW_FIELDS)}) VALUES ({placeholders})",
+            batch,
+        )
+
+    def _read_connection(self) -> "_ClosingConnection":
+        conn = sqlite3.connect(f"{self.path.as_uri()}?mode=ro", uri=True)
+        conn.execute(f"PRAGMA mmap_size = {SOCRATA_MIRROR_MMAP_BYTES}")
+        return _ClosingConnection(conn)
+
+
+class _ClosingConnection:
+    """Context manager that closes (not just commits) a SQLite connection."""
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self.conn
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.conn.close()
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Descarga los datasets NIIF de datos.gov.co a un espejo local SQLite."
+    )
+    parser.add_argument(
+        "--dataset",
+        choices=sorted(SOCRATA_DATASETS),
+        action="append",
+        help="Dataset a descargar (por defecto, todos).",
+    )
+    parser.add_argument("--path", type=Path, help="Ruta del archivo SQLite del espejo.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    mirror = SocrataMirror(path=args.path)
+    for dataset in args.dataset or list(SOCRATA_DATASETS):
+        mirror.ingest(dataset)
+
+    # Seed the offline name search with every company seen in the exports.
+    index = CompanyNameIndex()
+    added = index.add_names(mirror.iter_companies())
+    index.save()
+    LOGGER.info("Company index seeded from mirror added=%s total=%s", added, len(index))
+
+
+if __name__ == "__main__":
+    main()
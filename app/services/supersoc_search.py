@@ -2,27 +2,88 @@
 
 from __future__ import annotations
 
+import html
 import logging
-from typing import List
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict
+from typing import Callable, Iterable, Iterator, List
 from urllib.parse import parse_qs, urlparse
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 
-from app.config import HTTP_TIMEOUT_SECONDS, MAX_SEARCH_RESULTS, SUPERWAS_QUERY_URL, USER_AGENT
-from app.core.exceptions import CompanyNotFoundError, ConnectivityError, SourceFormatError
-from app.models.entities import CompanyRecord
-from app.utils.text import normalize_nit
+from app.config import (
+    HTTP_TIMEOUT_SECONDS,
+    MAX_SEARCH_RESULTS,
+    SEARCH_CACHE_MAX_BYTES,
+    SEARCH_CACHE_MAX_ENTRIES,
+    SEARCH_CACHE_TTL_SECONDS,
+    SEARCH_MAX_WORKERS,
+    SUPERWAS_MAX_REQUESTS_PER_SECOND,
+    SUPERWAS_QUERY_URL,
+    USER_AGENT,
+)
+from app.core.disk_cache import DiskCache
+from app.core.exceptions import (
+    AnalyzerError,
+    CompanyNotFoundError,
+    ConnectivityError,
+    SourceFormatError,
+)
+from app.core.rate_limit import HostRateLimiter
+from app.core.singleflight import SingleFlight
+from app.core.ttl_cache import TTLCache
+from app.models.entities import CompanyRecord, NitLookupResult
+from app.services.company_index import CompanyNameIndex
+from app.utils.html_tables import TableRow, extract_table_rows
+from app.utils.text import normalize_nit, normalize_text
 
 LOGGER = logging.getLogger(__name__)
 
+# Concurrent identical searches (same mode and query) share one POST.
+_IN_FLIGHT = SingleFlight()
+# Shared by every service instance so parallel lookups respect one budget.
+_SUPERWAS_RATE_LIMITER = HostRateLimiter(SUPERWAS_MAX_REQUESTS_PER_SECOND)
+
+_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title\s*>", re.IGNORECASE | re.DOTALL)
+
+
+def _page_title(text: str) -> str:
+    match = _TITLE_RE.search(text)
+    return html.unescape(match.group(1)).strip() if match else ""
+
 
 class SupersocSearchService:
     """Connector for https://superwas.supersociedades.gov.co/ConsultaGeneralSociedadesWeb."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        persistent_cache: bool = True,
+        name_index: CompanyNameIndex | None = None,
+        rate_limiter: HostRateLimiter | None = None,
+    ) -> None:
         self.session = requests.Session()
         self.session.headers.update({"User-Agent": USER_AGENT})
+        # Pool sized for resolve_many so parallel lookups reuse connections.
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=SEARCH_MAX_WORKERS))
+        self.rate_limiter = rate_limiter or _SUPERWAS_RATE_LIMITER
+        self.memory_cache: TTLCache[List[CompanyRecord]] = TTLCache(
+            max_entries=SEARCH_CACHE_MAX_ENTRIES,
+            ttl_seconds=SEARCH_CACHE_TTL_SECONDS,
+        )
+        self.disk_cache = (
+            DiskCache(
+                namespace="supersoc",
+                ttl_seconds=SEARCH_CACHE_TTL_SECONDS,
+                max_bytes=SEARCH_CACHE_MAX_BYTES,
+            )
+            if persistent_cache
+            else None
+        )
+        # Every portal response is harvested into the index, which answers
+        # name searches only while the portal is unreachable.
+        self.name_index = name_index if name_index is not None else CompanyNameIndex()
 
     def search(self, query: str, by: str) -> List[CompanyRecord]:
         query = (query or "").strip()
@@ -38,6 +99,50 @@ class SupersocSearchService:
         if not clean_nit:
             raise CompanyNotFoundError("El NIT ingresado no tiene un formato valido.")
 
+        return self._cached_search("nit", clean_nit, lambda: self._fetch_by_nit(clean_nit))
+
+    def resolve_many(
+        self, nits: Iterable[str], max_workers: int = SEARCH_MAX_WORKERS
+    ) -> Iterator[NitLookupResult]:
+        """Look up several NITs in parallel, yielding each result as it completes.
+
+        A NIT that fails (not found, portal down, unexpected page) yields a
+        result carrying its error instead of stopping the batch. Repeated
+        NITs, however they are formatted, are looked up once. Closing the
+        iterator early cancels lookups that have not started yet.
+        """
+        pending = list(dict.fromkeys(normalize_nit(nit) or nit for nit in nits))
+        if not pending:
+            return
+
+        workers = max(1, min(max_workers, len(pending)))
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="supersoc") as executor:
+                futures = [executor.submit(self._resolve_one, nit) for nit in pending]
+                try:
+                    for future in as_completed(futures):
+                        yield future.result()
+                finally:
+                    for future in futures:
+                        future.cancel()
+        finally:
+            # Lookups only mark the index dirty; the batch is written once.
+            self.name_index.save()
+
+    def close(self) -> None:
+        """Write index changes still pending; call when the app shuts down."""
+        self.name_index.save()
+
+    def _resolve_one(self, nit: str) -> NitLookupResult:
+        try:
+            company = self.search_by_nit(nit)[0]
+        except AnalyzerError as exc:
+            LOGGER.info("SuperSoc batch lookup failed nit=%s: %s", nit, exc)
+            return NitLookupResult(nit=normalize_nit(nit) or nit, error=exc)
+        return NitLookupResult(nit=company.nit, company=company)
+
+    def _fetch_by_nit(self, clean_nit: str) -> List[CompanyRecord]:
+        self.rate_limiter.wait(SUPERWAS_QUERY_URL)
         try:
             response = self.session.post(
                 SUPERWAS_QUERY_URL,
@@ -50,15 +155,13 @@ class SupersocSearchService:
                 "No fue posible conectar con Supersociedades. Verifica tu conexion e intenta de nuevo."
             ) from exc
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        title = (soup.title.string if soup.title else "").strip().lower()
-
+        title = _page_title(response.text).lower()
         if "detalle" not in title and "sociedad" not in response.text.lower():
             raise CompanyNotFoundError(
                 f"No se encontro una empresa con el NIT {clean_nit} en Supersociedades."
             )
 
-        company = self._parse_detail_page(soup, fallback_nit=clean_nit)
+        company = self._parse_detail_page(extract_table_rows(response.text), fallback_nit=clean_nit)
         if not company.razon_social:
             raise SourceFormatError(
                 "La estructura de la pagina de detalle cambio y no fue posible leer la empresa."
@@ -66,6 +169,51 @@ class SupersocSearchService:
         return [company]
 
     def search_by_name(self, name: str) -> List[CompanyRecord]:
+        """Search the portal (through the search caches); the local index only answers offline.
+
+        Index hits, even on the whole name, can miss other portal matches or
+        pick the wrong company, so they are used only if superwas is unreachable.
+        """
+        name = (name or "").strip()
+        try:
+            return self._cached_search("nombre", normalize_text(name), lambda: self._fetch_by_name(name))
+        except ConnectivityError:
+            local = self.name_index.search(name)
+            if not local:
+                raise
+            LOGGER.warning("SuperSoc unreachable; local index name='%s' -> %s", name, len(local))
+            return local
+
+    def _cached_search(
+        self, mode: str, key: str, fetch: Callable[[], List[CompanyRecord]]
+    ) -> List[CompanyRecord]:
+        """Serve a search from memory, then disk, then one shared network call.
+
+        Only successful searches are cached; "not found" keeps raising so a
+        company registered later is picked up on the next search.
+        """
+        cache_key = (mode, key)
+        records = self.memory_cache.get(cache_key)
+        if records is None and self.disk_cache is not None:
+            stored = self.disk_cache.get(cache_key)
+            if stored is not None:
+                records = [CompanyRecord(**item) for item in stored]
+                self.memory_cache.set(cache_key, records)
+
+        if records is None:
+            records = _IN_FLIGHT.do(("supersoc", *cache_key), fetch)
+            self.memory_cache.set(cache_key, records)
+            if self.disk_cache is not None:
+                self.disk_cache.set(cache_key, [asdict(record) for record in records])
+            if self.name_index.add(records):
+                self.name_index.save_if_due()
+        else:
+            LOGGER.info("SuperSoc search cache hit mode=%s query='%s'", mode, key)
+
+        return list(records)
+
+    def _fetch_by_name(self, name: str) -> List[CompanyRecord]:
+        self.rate_limiter.wait(SUPERWAS_QUERY_URL)
         try:
             response = self.session.post(
                 SUPERWAS_QUERY_URL,
@@ -78,19 +226,31 @@ class SupersocSearchService:
                 "No fue posible conectar con Supersociedades. Verifica tu conexion e intenta de nuevo."
             ) from exc
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        # Only the result table matters; it is tokenized in one streaming
+        # pass instead of building a BeautifulSoup tree of the whole page.
+        rows = self._parse_result_rows(extract_table_rows(response.text))
+        if not rows:
+            raise CompanyNotFoundError(
+                f"No se encontraron coincidencias para '{name}' en Supersociedades."
+            )
+
+        LOGGER.info("SuperSoc search by name='%s' -> %s results", name, len(rows))
+        return rows[:MAX_SEARCH_RESULTS]
+
+    @staticmethod
+    def _parse_result_rows(table_rows: List[TableRow]) -> List[CompanyRecord]:
         rows = []
-        for tr in soup.select("table tr"):
-            cells = tr.find_all("td")
+        for tr in table_rows:
+            cells = tr.data_cells()
             if len(cells) < 5:
                 continue
 
-            anchor = cells[0].find("a")
-            nit_text = anchor.get_text(strip=True) if anchor else cells[0].get_text(strip=True)
+            anchor = cells[0].anchor
+            nit_text = anchor.text() if anchor else cells[0].text("")
             nit = normalize_nit(nit_text)
 
-            if not nit and anchor and anchor.has_attr("href"):
-                href = anchor["href"]
+            if not nit and anchor and anchor.href is not None:
+                href = anchor.href
                 parsed = urlparse(href)
                 query_args = parse_qs(parsed.query)
                 nit = normalize_nit((query_args.get("nit") or [""])[0])
@@ -101,23 +261,16 @@ class SupersocSearchService:
             rows.append(
                 CompanyRecord(
                     nit=nit,
-                    razon_social=cells[1].get_text(" ", strip=True),
-                    estado=cells[2].get_text(" ", strip=True),
-                    etapa_situacion=cells[3].get_text(" ", strip=True),
-                    dependencia=cells[4].get_text(" ", strip=True),
+                    razon_social=cells[1].text(),
+                    estado=cells[2].text(),
+                    etapa_situacion=cells[3].text(),
+                    dependencia=cells[4].text(),
                 )
             )
-
-        if not rows:
-            raise CompanyNotFoundError(
-                f"No se encontraron coincidencias para '{name}' en Supersociedades."
-            )
-
-        LOGGER.info("SuperSoc search by name='%s' -> %s results", name, len(rows))
-        return rows[:MAX_SEARCH_RESULTS]
+        return rows
 
     @staticmethod
-    def _parse_detail_page(soup: BeautifulSoup, fallback_nit: str) -> CompanyRecord:
+    def _parse_detail_page(table_rows: List[TableRow], fallback_nit: str) -> CompanyRecord:
         record = {
             "nit": fallback_nit,
             "razon social": "",
@@ -127,27 +280,26 @@ class SupersocSearchService:
             "expediente": "",
         }
 
-        for table in soup.select("table"):
-            for row in table.select("tr"):
-                header = row.find("th")
-                value = row.find("td")
-                if not header or not value:
-                    continue
-                key = header.get_text(" ", strip=True).lower()
-                text = value.get_text(" ", strip=True)
-
-                if key.startswith("nit"):
-                    record["nit"] = normalize_nit(text) or fallback_nit
-                elif "razon social" in key:
-                    record["razon social"] = text
-                elif key.startswith("estado"):
-                    record["estado"] = text
-                elif "etapa" in key:
-                    record["etapa situacion"] = text
-                elif "dependencia" in key:
-                    record["dependencia"] = text
-                elif "expediente" in key:
-                    record["expediente"] = text
+        for row in table_rows:
+            header = row.first("th")
+            value = row.first("td")
+            if not header or not value:
+                continue
+            key = header.text().lower()
+            text = value.text()
+
+            if key.startswith("nit"):
+                record["nit"] = normalize_nit(text) or fallback_nit
+            elif "razon social" in key:
+                record["razon social"] = text
+            elif key.startswith("estado"):
+                record["estado"] = text
+            elif "etapa" in key:
+                record["etapa situacion"] = text
+            elif "dependencia" in key:
+                record["dependencia"] = text
+            elif "expediente" in key:
+                record["expediente"] = text
 
         return CompanyRecord(
             nit=record["nit"],
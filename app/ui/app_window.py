@@ -127,6 +127,7 @@ class AnalyzerApp(ctk.CTk):
             highlightthickness=0,
         )
         self.results_listbox.grid(row=0, column=0, sticky="nsew", padx=6, pady=6)
+        self.results_listbox.bind("<<ListboxSelect>>", self._on_result_selected)
 
         self.load_button = ctk.CTkButton(
             sidebar,
@@ -363,6 +364,15 @@ class AnalyzerApp(ctk.CTk):
             self.results_listbox.selection_set(0)
             self.results_listbox.activate(0)
             self._set_status(f"Empresas encontradas: {len(results)}. Selecciona una y carga el analisis.")
+        if len(results) == 1:
+            self.analysis_service.prefetch_financials(results[0])
+
+    def _on_result_selected(self, _event: tk.Event | None = None) -> None:
+        # Start downloading while the user is still deciding to press "Cargar".
+        if self.results_listbox.curselection():
+            company = self._selected_company()
+            if company:
+                self.analysis_service.prefetch_financials(company)
 
     def _selected_company(self) -> CompanyRecord | None:
         selection = self.results_listbox.curselection()
@@ -377,12 +387,30 @@ class AnalyzerApp(ctk.CTk):
             return
 
         self._set_status(f"Descargando y consolidando datos financieros para {company.razon_social}...")
+        # Only the ticked metrics are computed; ticking more later reloads.
+        metric_keys = [k for k, var in self.metric_vars.items() if var.get()] or None
 
         def worker() -> AnalysisPackage:
-            return self.analysis_service.analyze_company(company=company)
+            return self.analysis_service.analyze_company(company=company, metric_keys=metric_keys)
 
         self._run_in_thread(worker=worker, on_success=self._after_analysis_loaded)
 
+    def _load_missing_metrics(self, selected_metrics: List[str]) -> None:
+        analysis = self.full_analysis
+        loaded = set(analysis.metric_keys or []) | set(selected_metrics)
+        metric_keys = [k for k in self.metric_keys if k in loaded]
+        self._set_status(f"Calculando metricas adicionales para {analysis.company.razon_social}...")
+
+        def worker() -> AnalysisPackage:
+            return self.analysis_service.analyze_company(company=analysis.company, metric_keys=metric_keys)
+
+        def on_success(result: AnalysisPackage) -> None:
+            self.full_analysis = result
+            self._refresh_view()
+            self._set_status(f"Analisis actualizado para {result.company.razon_social}.")
+
+        self._run_in_thread(worker=worker, on_success=on_success)
+
     def _after_analysis_loaded(self, analysis: AnalysisPackage) -> None:
         self.full_analysis = analysis
         self._populate_year_checkboxes(analysis.years)
@@ -405,11 +433,16 @@ class AnalyzerApp(ctk.CTk):
             messagebox.showwarning("Metricas", "Selecciona al menos una metrica.")
             return
 
+        if self.full_analysis.missing_metrics(selected_metrics):
+            self._load_missing_metrics(selected_metrics)
+            return
+
         snapshots = {y: self.full_analysis.snapshots[y] for y in selected_years}
         self.current_analysis = AnalysisPackage(
             company=self.full_analysis.company,
             years=selected_years,
             snapshots=snapshots,
+            metric_keys=self.full_analysis.metric_keys,
         )
         self.current_explanations = build_explanations(
             analysis=self.current_analysis,
@@ -544,6 +577,11 @@ class AnalyzerApp(ctk.CTk):
         if not metric_keys:
             messagebox.showwarning("Exportar", "Selecciona al menos una metrica para exportar.")
             return
+        if self.current_analysis.missing_metrics(metric_keys):
+            messagebox.showwarning(
+                "Exportar", "Presiona 'Actualizar vista' para calcular las metricas seleccionadas antes de exportar."
+            )
+            return
 
         self._set_status("Generando reporte... esto puede tomar unos segundos.")
 
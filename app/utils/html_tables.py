@@ -0,0 +1,145 @@
+﻿"""Streaming extraction of HTML table rows without building a document tree."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import List
+
+# Elements that never have content or a closing tag (HTML spec), plus the
+# raw-text elements whose contents are not page text.
+_VOID_TAGS = frozenset(
+    "area base br col embed hr img input link meta param source track wbr".split()
+)
+_RAW_TEXT_TAGS = frozenset({"script", "style", "template"})
+
+
+@dataclass
+class TableCell:
+    tag: str
+    fragments: List[str] = field(default_factory=list)
+    anchor: "TableAnchor | None" = None
+
+    def text(self, separator: str = " ") -> str:
+        """Same result as BeautifulSoup's ``get_text(separator, strip=True)``."""
+        return separator.join(fragment for fragment in self.fragments if fragment)
+
+
+@dataclass
+class TableAnchor:
+    href: str | None
+    fragments: List[str] = field(default_factory=list)
+
+    def text(self, separator: str = "") -> str:
+        return separator.join(fragment for fragment in self.fragments if fragment)
+
+
+@dataclass
+class TableRow:
+    cells: List[TableCell] = field(default_factory=list)
+
+    def first(self, tag: str) -> TableCell | None:
+        for cell in self.cells:
+            if cell.tag == tag:
+                return cell
+        return None
+
+    def data_cells(self) -> List[TableCell]:
+        return [cell for cell in self.cells if cell.tag == "td"]
+
+
+class _TableRowParser(HTMLParser):
+    """Collect every ``<tr>`` inside a ``<table>`` in document order.
+
+    Element nesting follows BeautifulSoup's ``html.parser`` tree builder: an
+    end tag closes the innermost open element with that name and everything
+    opened after it, and unmatched end tags are ignored. Cells, anchors and
+    text are attributed to every enclosing row/cell, as recursive
+    ``find_all``/``get_text`` calls would see them.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.rows: List[TableRow] = []
+        self._stack: List[tuple[str, object]] = []
+        self._open_rows: List[TableRow] = []
+        self._open_cells: List[TableCell] = []
+        self._open_anchors: List[TableAnchor] = []
+        self._table_depth = 0
+        self._raw_text_depth = 0
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if tag in _VOID_TAGS:
+            return
+        item: object = None
+        if tag == "table":
+            self._table_depth += 1
+        elif tag in _RAW_TEXT_TAGS:
+            self._raw_text_depth += 1
+        elif tag == "tr" and self._table_depth:
+            item = TableRow()
+            self.rows.append(item)
+            self._open_rows.append(item)
+        elif tag in ("td", "th") and self._open_rows:
+            item = TableCell(tag=tag)
+            for row in self._open_rows:
+                row.cells.append(item)
+            self._open_cells.append(item)
+        elif tag == "a" and self._open_cells:
+            item = TableAnchor(href=dict(attrs).get("href"))
+            for cell in self._open_cells:
+                if cell.anchor is None:
+                    cell.anchor = item
+            self._open_anchors.append(item)
+        self._stack.append((tag, item))
+
+    def handle_startendtag(self, tag: str, attrs: list) -> None:
+        # ``<td/>`` and friends open and close an empty element.
+        if tag in _VOID_TAGS:
+            return
+        self.handle_starttag(tag, attrs)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        for position in range(len(self._stack) - 1, -1, -1):
+            if self._stack[position][0] == tag:
+                break
+        else:
+            return
+        while len(self._stack) > position:
+            self._close(*self._stack.pop())
+
+    def handle_data(self, data: str) -> None:
+        if self._raw_text_depth or not self._open_cells:
+            return
+        text = data.strip()
+        if not text:
+            return
+        for cell in self._open_cells:
+            cell.fragments.append(text)
+        for anchor in self._open_anchors:
+            anchor.fragments.append(text)
+
+    def close(self) -> None:
+        super().close()
+        while self._stack:
+            self._close(*self._stack.pop())
+
+    def _close(self, tag: str, item: object) -> None:
+        if tag == "table":
+            self._table_depth -= 1
+        elif tag in _RAW_TEXT_TAGS:
+            self._raw_text_depth -= 1
+        elif item is not None:
+            for open_items in (self._open_rows, self._open_cells, self._open_anchors):
+                if open_items and open_items[-1] is item:
+                    open_items.pop()
+                    break
+
+
+def extract_table_rows(html_text: str) -> List[TableRow]:
+    """Return the rows of every table in ``html_text``, in document order."""
+    parser = _TableRowParser()
+    parser.feed(html_text)
+    parser.close()
+    return parser.rows
@@ -4,11 +4,22 @@ from __future__ import annotations
 
 import math
 import re
+from typing import Iterable, Sequence
+
+import numpy as np
+
+# Socrata sends most amounts as bare "-1234" / "1234.5"; for those float()
+# gives exactly what the general cleanup below would.
+_PLAIN_NUMBER = re.compile(r"-?[0-9]+(?:\.[0-9]+)?")
+# Lines of a "\n"-joined column that are *not* plain numbers.
+_NON_PLAIN_LINE = re.compile(r"^(?!-?[0-9]+(?:\.[0-9]+)?$).*$", re.MULTILINE)
 
 
 def parse_amount(raw: str | int | float | None) -> float | None:
     if raw is None:
         return None
+    if type(raw) is str and _PLAIN_NUMBER.fullmatch(raw):
+        return float(raw)
     if isinstance(raw, (int, float)):
         if isinstance(raw, float) and math.isnan(raw):
             return None
@@ -43,6 +54,54 @@ def parse_amount(raw: str | int | float | None) -> float | None:
     return -value if negative else value
 
 
+def parse_amounts(values: Sequence[object] | Iterable[object]) -> tuple[np.ndarray, np.ndarray]:
+    """Batch ``parse_amount`` over a column.
+
+    Returns ``(amounts, missing)``: a float64 array with NaN wherever
+    ``parse_amount`` would return ``None``, and the boolean mask of those
+    positions. Plain numeric strings are converted in one NumPy cast; only
+    the rest (separators, "$", parentheses, non-strings) go through
+    ``parse_amount`` one by one.
+    """
+    items = np.asarray(values if isinstance(values, (list, tuple, np.ndarray)) else list(values), dtype=object)
+    amounts = np.full(len(items), np.nan)
+    missing = np.zeros(len(items), dtype=bool)
+    if not len(items):
+        return amounts, missing
+
+    plain = _plain_number_mask(items)
+    amounts[plain] = items[plain].astype(np.float64)
+    others = np.flatnonzero(~plain)
+    if len(others):
+        parsed = [parse_amount(item) for item in items[others].tolist()]
+        missing[others] = [value is None for value in parsed]
+        amounts[others] = [math.nan if value is None else value for value in parsed]
+    return amounts, missing
+
+
+def _plain_number_mask(items: np.ndarray) -> np.ndarray:
+    # One regex scan over the joined column finds the few non-plain entries
+    # without a Python-level call per row.
+    try:
+        text = "\n".join(items)
+    except TypeError:
+        text = None
+    if text is None or text.count("\n") != len(items) - 1:
+        fullmatch = _PLAIN_NUMBER.fullmatch
+        return np.fromiter(
+            (type(item) is str and fullmatch(item) is not None for item in items),
+            dtype=bool,
+            count=len(items),
+        )
+
+    lengths = np.fromiter(map(len, items), dtype=np.int64, count=len(items)) + 1
+    line_starts = np.cumsum(lengths) - lengths
+    bad_offsets = np.fromiter((match.start() for match in _NON_PLAIN_LINE.finditer(text)), dtype=np.int64)
+    plain = np.ones(len(items), dtype=bool)
+    plain[np.searchsorted(line_starts, bad_offsets, side="right") - 1] = False
+    return plain
+
+
 def format_currency(value: float | None) -> str:
     if value is None:
         return "N/D"
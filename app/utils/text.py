@@ -3,12 +3,30 @@
 from __future__ import annotations
 
 import re
+import sys
+import threading
 import unicodedata
+from functools import lru_cache
+from typing import Dict, List
+
+from app.config import CONCEPT_VOCABULARY_MAX_LABELS, TEXT_NORMALIZE_CACHE_SIZE
 
 
 def normalize_text(value: str | None) -> str:
     if not value:
         return ""
+    return _normalize_text_cached(value)
+
+
+def normalize_text_cache_stats() -> Dict[str, int]:
+    info = _normalize_text_cached.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+
+
+@lru_cache(maxsize=TEXT_NORMALIZE_CACHE_SIZE)
+def _normalize_text_cached(value: str) -> str:
+    # Row data repeats a few thousand NIIF labels and config patterns are
+    # normalized on every lookup, so nearly every call is a cache hit.
     normalized = unicodedata.normalize("NFKD", value)
     without_accents = "".join(c for c in normalized if not unicodedata.combining(c))
     lowered = without_accents.lower()
@@ -25,3 +43,69 @@ def normalize_nit(raw_nit: str) -> str:
     if len(cleaned) >= 9:
         return cleaned[:9]
     return cleaned
+
+
+class ConceptVocabulary:
+    """Canonical, interned form of concept labels with a stable integer id each.
+
+    ``canonical`` returns the ``normalize_text`` form of a raw label; every
+    raw spelling of the same concept gets the very same string object, and
+    ``id_for`` a small integer, so callers can compare and key by identity.
+    Ids stay valid for the life of the process; only the raw-label lookup
+    table is bounded and starts over when it grows past ``max_labels``.
+    """
+
+    def __init__(self, max_labels: int = CONCEPT_VOCABULARY_MAX_LABELS) -> None:
+        self.max_labels = max_labels
+        self._lock = threading.Lock()
+        self._by_raw: Dict[str, int] = {}
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self.hits = 0
+        self.misses = 0
+
+    def id_for(self, raw: str | None) -> int:
+        """Return the concept id for ``raw``, or -1 when it normalizes to ""."""
+        if not raw:
+            return -1
+        concept_id = self._by_raw.get(raw)
+        if concept_id is not None:
+            self.hits += 1
+            return concept_id
+
+        canonical = normalize_text(raw)
+        with self._lock:
+            self.misses += 1
+            if not canonical:
+                concept_id = -1
+            else:
+                concept_id = self._ids.get(canonical)
+                if concept_id is None:
+                    concept_id = self._ids[canonical] = len(self._names)
+                    self._names.append(sys.intern(canonical))
+            if len(self._by_raw) >= self.max_labels:
+                self._by_raw.clear()
+            self._by_raw[raw] = concept_id
+        return concept_id
+
+    def canonical(self, raw: str | None) -> str:
+        concept_id = self.id_for(raw)
+        return self._names[concept_id] if concept_id >= 0 else ""
+
+    def name(self, concept_id: int) -> str:
+        return self._names[concept_id]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "labels": len(self._by_raw),
+            "concepts": len(self._names),
+        }
+
+
+# Shared by the normalizers and the indicator matchers.
+CONCEPT_VOCABULARY = ConceptVocabulary()
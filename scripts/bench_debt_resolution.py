@@ -0,0 +1,232 @@
+﻿"""Check and time ``_resolve_financial_debt`` against the original implementation.
+
+Usage::
+
+    python scripts/bench_debt_resolution.py [--sheets 2000] [--lines 300]
+
+Builds synthetic balance sheets with hundreds of debt-like lines (mixed
+current/non-current/total wording, repeated amounts, excluded payables and
+``None`` values). The reference is the original per-call implementation
+with its eleven ``re.sub`` passes per candidate; the script fails if any
+``deuda`` differs and prints the time of both, first with a new layout per
+sheet and then with layouts repeating as they do across filers.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.finance.indicators import (  # noqa: E402
+    DEBT_CURRENT_HINTS,
+    DEBT_EXCLUDE_TERMS,
+    DEBT_INCLUDE_TERMS,
+    DEBT_NON_CURRENT_HINTS,
+    DEBT_TOTAL_HINTS,
+    _resolve_financial_debt,
+)
+from app.utils.text import normalize_text  # noqa: E402
+
+
+def _contains_any(text: str, terms: Iterable[str]) -> bool:
+    return any(term in text for term in terms)
+
+
+def _reference_score(concept: str, value: float) -> float:
+    score = 0.0
+    if "deuda total" in concept:
+        score += 150
+    if _contains_any(concept, DEBT_TOTAL_HINTS):
+        score += 120
+    if "obligaciones financieras" in concept:
+        score += 70
+    if "pasivos financieros" in concept:
+        score += 65
+    if "deuda financiera" in concept:
+        score += 60
+    if "prestamo" in concept or "prestamos" in concept:
+        score += 45
+    if _contains_any(concept, DEBT_CURRENT_HINTS) or _contains_any(concept, DEBT_NON_CURRENT_HINTS):
+        score += 20
+    score += abs(value) ** 0.1
+    return score
+
+
+def _reference_pick(
+    candidates: Iterable[tuple[str, float]],
+    predicate: Callable[[str], bool] | None = None,
+) -> tuple[str, float] | None:
+    best: tuple[str, float, float] | None = None
+    for concept, value in candidates:
+        if predicate and not predicate(concept):
+            continue
+        score = _reference_score(concept, value)
+        if best is None or score > best[2] or (score == best[2] and abs(value) > abs(best[1])):
+            best = (concept, value, score)
+    if best is None:
+        return None
+    return best[0], best[1]
+
+
+def _reference_core(concept: str) -> str:
+    base = normalize_text(concept)
+    base = re.sub(r"\botros?\b", " ", base)
+    base = re.sub(r"\btotales?\b", " ", base)
+    base = re.sub(r"\bpasivos?\b", " ", base)
+    base = re.sub(r"\bobligaciones?\b", " ", base)
+    base = re.sub(r"\bfinancier[oa]s?\b", " ", base)
+    base = re.sub(r"\bdeuda\b", " ", base)
+    base = re.sub(r"\bprestamos?\b", " ", base)
+    base = re.sub(r"\bno corrientes?\b", " ", base)
+    base = re.sub(r"\bcorrientes?\b", " ", base)
+    base = re.sub(r"\bcorto plazo\b", " ", base)
+    base = re.sub(r"\blargo plazo\b", " ", base)
+    return re.sub(r"\s+", " ", base).strip()
+
+
+def reference_debt(balance_concepts: Dict[str, float]) -> float | None:
+    candidates: list[tuple[str, float]] = []
+    for raw_concept, value in balance_concepts.items():
+        if value is None:
+            continue
+        concept = normalize_text(raw_concept)
+        if not _contains_any(concept, DEBT_INCLUDE_TERMS):
+            continue
+        if _contains_any(concept, DEBT_EXCLUDE_TERMS):
+            continue
+        candidates.append((concept, float(value)))
+
+    if not candidates:
+        return None
+
+    def is_current(concept: str) -> bool:
+        return (not is_non_current(concept)) and _contains_any(concept, DEBT_CURRENT_HINTS)
+
+    def is_non_current(concept: str) -> bool:
+        return _contains_any(concept, DEBT_NON_CURRENT_HINTS)
+
+    def is_total(concept: str) -> bool:
+        if is_current(concept) or is_non_current(concept):
+            return False
+        return _contains_any(concept, DEBT_TOTAL_HINTS)
+
+    def concept_segment(concept: str) -> str:
+        if is_total(concept):
+            return "total"
+        if is_current(concept):
+            return "current"
+        if is_non_current(concept):
+            return "non_current"
+        return "other"
+
+    deduped: dict[str, tuple[str, float, float]] = {}
+    for concept, value in candidates:
+        fingerprint = f"{concept_segment(concept)}|{_reference_core(concept) or 'deuda'}"
+        dedupe_key = f"{fingerprint}|{round(abs(value))}"
+        score = _reference_score(concept, value)
+        current = deduped.get(dedupe_key)
+        if current is None or score > current[2] or (score == current[2] and abs(value) > abs(current[1])):
+            deduped[dedupe_key] = (concept, value, score)
+    candidates = [(concept, value) for concept, value, _ in deduped.values()]
+
+    total_candidate = _reference_pick(candidates, is_total)
+    if total_candidate is not None:
+        return total_candidate[1]
+
+    current_candidate = _reference_pick(candidates, is_current)
+    non_current_candidate = _reference_pick(candidates, is_non_current)
+    components = [c for c in [current_candidate, non_current_candidate] if c is not None]
+    unique_components: dict[str, tuple[float, float]] = {}
+    for concept, value in components:
+        dedupe_key = f"{_reference_core(concept) or 'deuda'}|{round(abs(value))}"
+        score = _reference_score(concept, value)
+        current = unique_components.get(dedupe_key)
+        if current is None or score > current[1] or (score == current[1] and abs(value) > abs(current[0])):
+            unique_components[dedupe_key] = (value, score)
+    if unique_components:
+        return float(sum(value for value, _ in unique_components.values()))
+
+    direct_candidate = _reference_pick(candidates)
+    return direct_candidate[1] if direct_candidate is not None else None
+
+
+_HEADS = [
+    "obligaciones financieras",
+    "otros pasivos financieros",
+    "pasivos financieros",
+    "deuda financiera",
+    "prestamos",
+    "prestamo",
+    "deuda total",
+    "total obligaciones financieras",
+    "cuentas por pagar comerciales y prestamos",
+    "impuestos sobre prestamos",
+    "proveedores",
+]
+_SEGMENTS = ["", "corrientes", "no corrientes", "corto plazo", "largo plazo", "totales"]
+_DETAILS = ["", "con bancos", "en moneda extranjera", "leasing", "bonos emitidos", "con vinculados"]
+
+
+def synthetic_sheets(count: int, lines: int, layouts: int | None, seed: int = 11) -> list[Dict[str, float]]:
+    """Balance sheets with ``lines`` concepts each; ``layouts`` bounds distinct key sets."""
+    rng = random.Random(seed)
+    shapes = []
+    for _ in range(layouts or count):
+        keys = {}
+        for index in range(lines):
+            if rng.random() < 0.3:
+                keys[f"concepto no financiero {index}"] = None
+                continue
+            label = " ".join(
+                part for part in (rng.choice(_HEADS), rng.choice(_SEGMENTS), rng.choice(_DETAILS)) if part
+            )
+            keys[f"{label} {rng.randrange(lines // 4)}" if rng.random() < 0.5 else label] = None
+        shapes.append(list(keys))
+    amounts = [0.0, 1e6, -2.5e6, 1e6 + 0.4, 3.75e8]
+    sheets = []
+    for index in range(count):
+        sheet: Dict[str, float] = {}
+        for key in shapes[index % len(shapes)]:
+            roll = rng.random()
+            sheet[key] = None if roll < 0.05 else rng.choice(amounts) if roll < 0.4 else rng.uniform(-1e9, 1e9)
+        sheets.append(sheet)
+    return sheets
+
+
+def _timed(func: Callable[[Dict[str, float]], float | None], sheets: list) -> tuple[list, float]:
+    started = time.perf_counter()
+    results = [func(sheet) for sheet in sheets]
+    return results, time.perf_counter() - started
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compara la resolucion de deuda con la implementacion original.")
+    parser.add_argument("--sheets", type=int, default=2000)
+    parser.add_argument("--lines", type=int, default=300)
+    args = parser.parse_args(argv)
+
+    mismatches = 0
+    for title, layouts in (("layouts nuevos", None), ("layouts repetidos", 20)):
+        sheets = synthetic_sheets(args.sheets, args.lines, layouts)
+        expected, reference_seconds = _timed(reference_debt, sheets)
+        actual, seconds = _timed(_resolve_financial_debt, sheets)
+        different = sum(repr(a) != repr(b) for a, b in zip(actual, expected))
+        mismatches += different
+        print(
+            f"{title}: balances={len(sheets)} lineas={args.lines} diferentes={different} "
+            f"original={reference_seconds * 1000 / len(sheets):.3f}ms "
+            f"actual={seconds * 1000 / len(sheets):.3f}ms "
+            f"speedup={reference_seconds / seconds:.1f}x"
+        )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
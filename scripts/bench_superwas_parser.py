@@ -0,0 +1,111 @@
+﻿"""Check and time the streaming superwas parser against BeautifulSoup.
+
+Usage::
+
+    python scripts/bench_superwas_parser.py paginas/*.html [--repeat 20]
+
+Each file is a page saved from ConsultaGeneral (search results or company
+detail). The reference path is the original BeautifulSoup(html.parser)
+extraction; the script fails if the streaming parser returns anything
+different for any page, and prints the average parse time of both.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.models.entities import CompanyRecord  # noqa: E402
+from app.services.supersoc_search import SupersocSearchService, _page_title  # noqa: E402
+from app.utils.html_tables import extract_table_rows  # noqa: E402
+from app.utils.text import normalize_nit  # noqa: E402
+
+
+def _reference_results(soup: BeautifulSoup) -> list[CompanyRecord]:
+    rows = []
+    for tr in soup.select("table tr"):
+        cells = tr.find_all("td")
+        if len(cells) < 5:
+            continue
+        anchor = cells[0].find("a")
+        nit_text = anchor.get_text(strip=True) if anchor else cells[0].get_text(strip=True)
+        nit = normalize_nit(nit_text)
+        if not nit and anchor and anchor.has_attr("href"):
+            nit = normalize_nit((parse_qs(urlparse(anchor["href"]).query).get("nit") or [""])[0])
+        if not nit:
+            continue
+        rows.append(
+            CompanyRecord(
+                nit=nit,
+                razon_social=cells[1].get_text(" ", strip=True),
+                estado=cells[2].get_text(" ", strip=True),
+                etapa_situacion=cells[3].get_text(" ", strip=True),
+                dependencia=cells[4].get_text(" ", strip=True),
+            )
+        )
+    return rows
+
+
+def _reference_detail(soup: BeautifulSoup) -> dict:
+    fields = {}
+    for table in soup.select("table"):
+        for row in table.select("tr"):
+            header = row.find("th")
+            value = row.find("td")
+            if header and value:
+                fields[header.get_text(" ", strip=True).lower()] = value.get_text(" ", strip=True)
+    return fields
+
+
+def _reference(text: str) -> tuple:
+    soup = BeautifulSoup(text, "html.parser")
+    title = (soup.title.string if soup.title else "") or ""
+    return title.strip().lower(), _reference_results(soup), _reference_detail(soup)
+
+
+def _streaming(text: str) -> tuple:
+    rows = extract_table_rows(text)
+    detail = {}
+    for row in rows:
+        header, value = row.first("th"), row.first("td")
+        if header and value:
+            detail[header.text().lower()] = value.text()
+    return _page_title(text).lower(), SupersocSearchService._parse_result_rows(rows), detail
+
+
+def _average_ms(func, text: str, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(text)
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compara el parser de superwas con BeautifulSoup.")
+    parser.add_argument("pages", nargs="+", type=Path, help="Paginas HTML guardadas de superwas.")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    mismatches = 0
+    for page in args.pages:
+        text = page.read_text(encoding="utf-8", errors="replace")
+        expected = _reference(text)
+        same = _streaming(text) == expected
+        mismatches += not same
+        print(
+            f"{page.name}: rows={len(expected[1])} equal={same} "
+            f"beautifulsoup={_average_ms(_reference, text, args.repeat):.2f}ms "
+            f"streaming={_average_ms(_streaming, text, args.repeat):.2f}ms"
+        )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+﻿"""Measure memory held by raw Socrata rows versus ``StatementColumns``.
+
+Usage::
+
+    python scripts/measure_statement_memory.py [--rows 1000000]
+
+Synthetic rows mimic a NIIF dataset export (a few hundred concepts, seven
+cut-off dates, a handful of filings per company) and are decoded from JSON
+like a real API page, so every row owns its own strings.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.models.entities import StatementColumns  # noqa: E402
+
+
+def _synthetic_payload(count: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    concepts = [f"Concepto NIIF numero {index} del estado financiero" for index in range(400)]
+    rows = []
+    for index in range(count):
+        company = index // 2000
+        year = 2018 + rng.randrange(7)
+        filing = rng.randrange(2)
+        rows.append(
+            {
+                "nit": str(800000000 + company),
+                "fecha_corte": f"{year}-12-31T00:00:00.000",
+                "periodo": rng.choice(["Periodo Actual", "Periodo Anterior"]),
+                "concepto": rng.choice(concepts),
+                "valor": str(rng.randrange(-10**9, 10**10)),
+                "numero_radicado": f"{year + 1}-01-{company * 10 + filing:06d}",
+                "id_punto_entrada": str(420 + filing),
+                "punto_entrada": ["50 NIIF Pymes - Separado Grupo 2", "60 NIIF Pymes - Consolidado Grupo 2"][filing],
+                "id_taxonomia": "411",
+                "codigo_instancia": str(400000 + company * 10 + filing),
+            }
+        )
+    return json.dumps(rows)
+
+
+def _measure(build) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, current
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Compara la memoria de filas crudas y StatementColumns.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    payload = _synthetic_payload(args.rows)
+    rows, rows_bytes = _measure(lambda: json.loads(payload))
+    columns, columns_bytes = _measure(lambda: StatementColumns.from_rows(rows))
+    assert len(columns) == len(rows)
+
+    scale = 1_000_000 / args.rows
+    for label, size in (("list[dict]", rows_bytes), ("StatementColumns", columns_bytes)):
+        print(f"{label:>17}: {size / args.rows:7.1f} B/row  {size * scale / 2**20:8.1f} MiB per 1M rows")
+    print(f"{'reduction':>17}: {rows_bytes / columns_bytes:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import threading
+
+import pytest
+
+from app.config import SOCRATA_CACHE_TTL_SECONDS
+from app.core.exceptions import ConnectivityError
+from app.models.entities import CompanyRecord, StatementColumns
+from app.services import analysis_service
+from app.services.analysis_service import AnalysisService
+
+COMPANY = CompanyRecord(nit="800000001", razon_social="ACME S.A.S.")
+
+
+def _row(concepto, valor, year=2023):
+    return {
+        "fecha_corte": f"{year}-12-31T00:00:00.000",
+        "periodo": "Periodo Actual",
+        "concepto": concepto,
+        "valor": valor,
+        "numero_radicado": "1",
+        "id_punto_entrada": "422",
+        "punto_entrada": "50 NIIF Pymes - Separado Grupo 2",
+        "id_taxonomia": "411",
+        "codigo_instancia": "1",
+    }
+
+
+DATASETS = {
+    "income": [_row("Ingresos de actividades ordinarias", "1000"), _row("Ganancia (pérdida)", "120")],
+    "balance": [_row("Total de activos", "2000"), _row("Total pasivos", "900")],
+    "cashflow": [],
+}
+
+
+class FakeFinancialService:
+    """Serves ``DATASETS`` through the streaming and the columns interfaces.
+
+    ``before_fetch`` runs at the start of every columns fetch, to block or fail it.
+    """
+
+    def __init__(self, cache=None, before_fetch=None):
+        self.cache = cache
+        self.before_fetch = before_fetch
+        self.pages_served = []
+        self.column_fetches = []
+
+    def iter_dataset_pages(self, nit, dataset, lookback_years):
+        for row in DATASETS[dataset]:
+            self.pages_served.append(dataset)
+            yield [dict(row)]
+
+    def fetch_company_financial_columns(self, nit, lookback_years):
+        self.column_fetches.append(nit)
+        if self.before_fetch is not None:
+            self.before_fetch()
+        return {dataset: StatementColumns.from_rows(rows) for dataset, rows in DATASETS.items()}
+
+
+def _service(financial_service):
+    return AnalysisService(search_service=object(), financial_service=financial_service)
+
+
+def test_uncached_analysis_streams_pages_into_the_normalizer():
+    financial = FakeFinancialService(cache=None)
+
+    package = _service(financial).analyze_company(COMPANY)
+
+    assert package.years == [2023]
+    assert package.snapshots[2023].metrics["ingresos"] == 1000
+    assert package.snapshots[2023].metrics["utilidad_neta"] == 120
+    assert financial.pages_served == ["income", "income", "balance", "balance"]
+    assert financial.column_fetches == []
+
+
+def test_cached_analysis_keeps_the_columns():
+    financial = FakeFinancialService(cache=object())
+
+    streamed = _service(FakeFinancialService(cache=None)).analyze_company(COMPANY)
+    package = _service(financial).analyze_company(COMPANY)
+
+    assert financial.column_fetches == ["800000001"]
+    assert financial.pages_served == []
+    assert package.snapshots[2023].metrics == streamed.snapshots[2023].metrics
+
+
+@pytest.fixture
+def no_delay(monkeypatch):
+    monkeypatch.setattr(analysis_service, "PREFETCH_DELAY_SECONDS", 0)
+
+
+def _prefetched(service):
+    (future,) = service._prefetches.values()
+    return future
+
+
+def test_pending_prefetch_is_cancelled_and_fetched_directly(monkeypatch):
+    monkeypatch.setattr(analysis_service, "PREFETCH_DELAY_SECONDS", 60)
+    financial = FakeFinancialService(cache=object())
+    service = _service(financial)
+
+    service.prefetch_financials(COMPANY)
+    future = _prefetched(service)
+    package = service.analyze_company(COMPANY)
+
+    assert future.cancelled()
+    assert financial.column_fetches == ["800000001"]
+    assert package.years == [2023]
+    assert service._prefetches == {}
+
+
+def test_running_prefetch_is_awaited(no_delay):
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        assert release.wait(5)
+
+    financial = FakeFinancialService(cache=object(), before_fetch=block)
+    service = _service(financial)
+    service.prefetch_financials(COMPANY)
+    assert started.wait(5)
+
+    packages = []
+    worker = threading.Thread(target=lambda: packages.append(service.analyze_company(COMPANY)))
+    worker.start()
+    worker.join(0.1)
+    assert worker.is_alive()
+    release.set()
+    worker.join(5)
+
+    assert packages[0].years == [2023]
+    assert financial.column_fetches == ["800000001"]
+
+
+def _failing_once():
+    failures = [ConnectivityError("Sin conexion")]
+
+    def fail_once():
+        if failures:
+            raise failures.pop()
+
+    return FakeFinancialService(cache=object(), before_fetch=fail_once)
+
+
+def test_failed_prefetch_is_fetched_again(no_delay):
+    financial = _failing_once()
+    service = _service(financial)
+    service.prefetch_financials(COMPANY)
+    assert isinstance(_prefetched(service).exception(timeout=5), ConnectivityError)
+
+    package = service.analyze_company(COMPANY)
+
+    assert package.years == [2023]
+    assert financial.column_fetches == ["800000001", "800000001"]
+
+
+def test_failed_prefetch_is_replaced_by_the_next_one(no_delay):
+    financial = _failing_once()
+    service = _service(financial)
+    service.prefetch_financials(COMPANY)
+    failed = _prefetched(service)
+    assert isinstance(failed.exception(timeout=5), ConnectivityError)
+
+    service.prefetch_financials(COMPANY)
+
+    assert _prefetched(service) is not failed
+    _prefetched(service).result(timeout=5)
+    assert financial.column_fetches == ["800000001", "800000001"]
+
+
+def test_prefetched_rows_expire_with_the_cache_ttl(no_delay, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(analysis_service.time, "time", lambda: now[0])
+    financial = FakeFinancialService(cache=object())
+    service = _service(financial)
+
+    service.prefetch_financials(COMPANY)
+    future = _prefetched(service)
+    future.result(timeout=5)
+    service.prefetch_financials(COMPANY)
+    assert _prefetched(service) is future
+
+    now[0] += SOCRATA_CACHE_TTL_SECONDS + 1
+    service.analyze_company(COMPANY)
+    assert financial.column_fetches == ["800000001", "800000001"]
+    assert service._prefetches == {}
+
+    service.prefetch_financials(COMPANY)
+    _prefetched(service).result(timeout=5)
+    now[0] += SOCRATA_CACHE_TTL_SECONDS + 1
+    service.prefetch_financials(COMPANY)
+    _prefetched(service).result(timeout=5)
+    assert financial.column_fetches == ["800000001"] * 4
@@ -0,0 +1,56 @@
+import math
+
+import numpy as np
+
+from app.finance.batch_indicators import compute_metrics_batch, line_item_arrays
+from app.finance.indicators import compute_year_snapshot
+
+
+def _statements():
+    income = {
+        "ingresos de actividades ordinarias": 1000.0,
+        "ganancia (perdida)": 120.0,
+        "ganancia (perdida) por actividades de operacion": 200.0,
+        "gastos de administracion": 150.0,
+        "depreciacion": 30.0,
+    }
+    balance = {
+        "activos corrientes totales": 600.0,
+        "pasivos corrientes totales": 300.0,
+        "total de activos": 2000.0,
+        "total pasivos": 900.0,
+        "obligaciones financieras corrientes": 250.0,
+        "patrimonio total": 1100.0,
+        "ganancias acumuladas": 500.0,
+    }
+    cash = {"flujo de efectivo neto": 80.0}
+    return [
+        (income, balance, cash),
+        ({**income, "ebitda": 410.0}, balance, cash),
+        ({**income, "ingresos de actividades ordinarias": 0.0}, {**balance, "total pasivos": 0.0}, cash),
+        ({"utilidad operacional": 50.0}, {"total de activos": 0.0}, {}),
+        (income, {}, {}),
+        ({}, {}, {}),
+    ]
+
+
+def test_batch_metrics_match_per_snapshot_reference():
+    statements = _statements()
+    items = {name: values.reshape(2, 3) for name, values in line_item_arrays(statements).items()}
+
+    batch = compute_metrics_batch(items)
+
+    for index, triple in enumerate(statements):
+        expected = compute_year_snapshot(*triple)[3]
+        assert list(batch) == list(expected)
+        for key, value in expected.items():
+            actual = batch[key][divmod(index, 3)]
+            assert (None if math.isnan(actual) else actual) == value, key
+
+
+def test_batch_metrics_treat_absent_items_as_missing():
+    batch = compute_metrics_batch({"ingresos": np.array([10.0, np.nan]), "ebit": np.array([1.0, 2.0])})
+
+    assert batch["ebitda"].tolist() == [1.0, 2.0]
+    assert np.isnan(batch["z_altman"]).all()
+    assert np.isnan(batch["dias_capital_trabajo"]).all()
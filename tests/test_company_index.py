@@ -0,0 +1,75 @@
+from app.models.entities import CompanyRecord
+from app.services import company_index
+from app.services.company_index import CompanyNameIndex
+
+
+def _index(tmp_path, *records):
+    index = CompanyNameIndex(path=tmp_path / "company_index.json.gz")
+    index.add(records)
+    return index
+
+
+ARGOS = CompanyRecord(nit="890900240", razon_social="GRUPO ARGOS S.A.", estado="ACTIVA")
+NUTRESA = CompanyRecord(nit="890900050", razon_social="Grupo Nutresa S.A.", estado="ACTIVA")
+EJEMPLO = CompanyRecord(nit="800123456", razon_social="Compañía de Ejemplo S.A.S.", estado="ACTIVA")
+CEMENTOS = CompanyRecord(nit="890900266", razon_social="CEMENTOS ARGOS S.A.", estado="ACTIVA")
+
+
+def _nits(records):
+    return [record.nit for record in records]
+
+
+def test_prefix_matches_rank_first_in_name_order(tmp_path):
+    index = _index(tmp_path, ARGOS, NUTRESA, EJEMPLO, CEMENTOS)
+
+    assert _nits(index.search("grupo")) == ["890900240", "890900050"]
+    assert _nits(index.search("Grupo Arg")) == ["890900240"]
+
+
+def test_every_query_word_may_prefix_any_name_word(tmp_path):
+    index = _index(tmp_path, ARGOS, NUTRESA, EJEMPLO, CEMENTOS)
+
+    assert _nits(index.search("argos")) == ["890900266", "890900240"]
+    assert _nits(index.search("ejem compa")) == ["800123456"]
+
+
+def test_typos_match_by_trigram_similarity(tmp_path):
+    index = _index(tmp_path, ARGOS, NUTRESA, EJEMPLO, CEMENTOS)
+
+    assert _nits(index.search("compania de ejenplo")) == ["800123456"]
+    assert index.search("xyz") == []
+    assert index.search("  ") == []
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = _index(tmp_path, ARGOS, EJEMPLO)
+    index.add_names([("890900240", "GRUPO ARGOS"), ("900111222", "NUEVA S.A.S.")])
+    index.save()
+
+    loaded = CompanyNameIndex(path=index.path)
+    assert len(loaded) == 3
+    # The bulk name did not replace the richer portal record.
+    assert loaded.search("grupo argos") == [ARGOS]
+    assert _nits(loaded.search("nueva")) == ["900111222"]
+
+
+def test_save_if_due_batches_writes(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(company_index.time, "time", lambda: now[0])
+    index = CompanyNameIndex(path=tmp_path / "company_index.json.gz", save_interval_seconds=60)
+
+    index.add([ARGOS])
+    index.save_if_due()
+    assert not index.path.exists()
+
+    now[0] += 60
+    index.save_if_due()
+    assert len(CompanyNameIndex(path=index.path)) == 1
+
+    now[0] += 30
+    index.add([NUTRESA])
+    index.save_if_due()
+    assert len(CompanyNameIndex(path=index.path)) == 1
+
+    index.save()
+    assert len(CompanyNameIndex(path=index.path)) == 2
@@ -0,0 +1,143 @@
+import itertools
+
+from app.models.entities import StatementColumns
+from app.services import data_normalizer
+from app.services.data_normalizer import (
+    normalize_statement_columns,
+    normalize_statement_frame,
+    normalize_statement_rows,
+    normalize_statement_stream,
+    normalize_statements,
+    statement_rows_frame,
+)
+
+
+def _rows():
+    dates = ["2024-12-31T00:00:00.000", "2023-12-31T00:00:00.000", "sin fecha", None]
+    periods = ["Periodo Actual", "Periodo Anterior", "2023", None]
+    concepts = ["Total de activos", "TOTAL DE ACTIVOS ", "Ganancia (pérdida)", "", None]
+    values = ["1000", "(250)", "0", "-0", "1.234,56", "", None, 12.5]
+    instances = [
+        ("2025-01-1", "422", "50 NIIF Pymes - Separado Grupo 2"),
+        (" 2025-01-1", "422", "50 NIIF Pymes - Separado Grupo 2"),
+        ("2025-01-2", "423", "60 NIIF Pymes - Consolidado Grupo 2"),
+        (None, None, None),
+    ]
+    rows = []
+    combos = itertools.product(dates, periods, concepts, values, instances)
+    for index, (fecha, periodo, concepto, valor, (radicado, punto, nombre)) in enumerate(combos):
+        if index % 3 == 0:
+            continue
+        row = {
+            "fecha_corte": fecha,
+            "periodo": periodo,
+            "concepto": concepto,
+            "valor": valor,
+            "numero_radicado": radicado,
+            "id_punto_entrada": punto,
+            "punto_entrada": nombre,
+            "id_taxonomia": "411",
+            "codigo_instancia": str(index % 2),
+        }
+        if index % 7 == 0:
+            del row["periodo"]
+        rows.append(row)
+    return rows
+
+
+def test_vectorized_normalizer_matches_reference_including_order():
+    rows = _rows()
+    for chunk in (rows, rows[::-1], rows[: len(rows) // 3]):
+        assert repr(normalize_statement_frame(statement_rows_frame(chunk))) == repr(
+            normalize_statement_rows(chunk)
+        )
+    assert normalize_statement_rows(rows)
+
+
+def test_vectorized_normalizer_empty_frame():
+    assert normalize_statement_frame(statement_rows_frame([])) == {}
+
+
+def test_streaming_normalizer_matches_reference_from_a_generator():
+    rows = _rows()
+    for chunk in (rows, rows[::-1], rows[: len(rows) // 3]):
+        pages = (chunk[start : start + 100] for start in range(0, len(chunk), 100))
+        assert repr(normalize_statement_stream(row for page in pages for row in page)) == repr(
+            normalize_statement_rows(chunk)
+        )
+    assert normalize_statement_stream(iter([])) == {}
+
+
+def test_columnar_normalizer_matches_reference():
+    rows = _rows()
+    columns = StatementColumns.from_rows(rows)
+    assert len(columns.concepto.categories) < len(columns)
+    assert list(columns.concepto) == [row["concepto"] or "" for row in rows]
+    assert repr(normalize_statement_columns(columns)) == repr(normalize_statement_rows(rows))
+    assert normalize_statement_columns(StatementColumns()) == {}
+
+
+def test_normalize_statements_switches_to_the_vectorized_engine(monkeypatch):
+    rows = _rows()
+    calls = []
+    vectorized = data_normalizer.normalize_statement_frame
+
+    def recording_frame(frame):
+        calls.append(len(frame))
+        return vectorized(frame)
+
+    monkeypatch.setattr(data_normalizer, "normalize_statement_frame", recording_frame)
+
+    monkeypatch.setattr(data_normalizer, "VECTORIZED_NORMALIZER_MIN_ROWS", len(rows) + 1)
+    assert repr(normalize_statements(rows)) == repr(normalize_statement_rows(rows))
+    assert not calls
+
+    monkeypatch.setattr(data_normalizer, "VECTORIZED_NORMALIZER_MIN_ROWS", len(rows))
+    assert repr(normalize_statements(rows)) == repr(normalize_statement_rows(rows))
+    assert calls == [len(rows)]
+    # Iterators have no length and are folded in a single pass.
+    assert repr(normalize_statements(iter(rows))) == repr(normalize_statement_rows(rows))
+    assert calls == [len(rows)]
+
+
+def test_current_period_then_largest_amount_wins_within_the_preferred_instance():
+    base = {
+        "fecha_corte": "2024-12-31T00:00:00.000",
+        "numero_radicado": "2025-01-1",
+        "id_punto_entrada": "422",
+        "punto_entrada": "50 NIIF Pymes - Separado Grupo 2",
+        "id_taxonomia": "411",
+        "codigo_instancia": "1",
+    }
+    rows = [
+        dict(base, periodo="Periodo Anterior", concepto="Ingresos", valor="900"),
+        dict(base, periodo="Periodo Actual", concepto="Ingresos", valor="100"),
+        dict(base, periodo="Periodo Actual", concepto="Total de activos", valor="(250)"),
+        dict(base, periodo="Periodo Actual", concepto="TOTAL DE ACTIVOS ", valor="-300"),
+        dict(
+            base,
+            numero_radicado="2025-01-2",
+            punto_entrada="60 NIIF Pymes - Consolidado Grupo 2",
+            periodo="Periodo Actual",
+            concepto="Ingresos",
+            valor="50",
+        ),
+        dict(base, fecha_corte="sin fecha", periodo="Periodo Actual", concepto="Ingresos", valor="1"),
+    ]
+
+    normalized = normalize_statement_rows(rows)
+
+    assert list(normalized) == [2024]
+    assert list(normalized[2024].items()) == [("ingresos", 100.0), ("total de activos", -300.0)]
+
+
+def test_concept_vocabulary_shares_one_canonical_string_per_concept():
+    from app.utils.text import ConceptVocabulary
+
+    vocabulary = ConceptVocabulary(max_labels=2)
+    first = vocabulary.id_for("Ganancia (Pérdida)")
+    assert vocabulary.id_for("GANANCIA  (perdida) ") == first
+    assert vocabulary.canonical("ganancia (pérdida)") is vocabulary.name(first)
+    assert vocabulary.id_for("   ") == -1
+    assert vocabulary.stats()["concepts"] == 1
+    assert vocabulary.stats()["labels"] <= 2
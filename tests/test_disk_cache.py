@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from app.core import disk_cache
+from app.core.disk_cache import DiskCache
+
+
+def _cache(tmp_path, ttl=60.0, max_bytes=1_000_000):
+    return DiskCache("test", ttl_seconds=ttl, max_bytes=max_bytes, root=tmp_path)
+
+
+def test_expired_entries_are_hidden_from_get_but_not_get_entry(tmp_path, monkeypatch):
+    cache = _cache(tmp_path, ttl=10)
+    monkeypatch.setattr(disk_cache.time, "time", lambda: 1000.0)
+    cache.set(["a"], {"rows": [1]})
+    assert cache.get(["a"]) == {"rows": [1]}
+
+    monkeypatch.setattr(disk_cache.time, "time", lambda: 1011.0)
+    assert cache.get(["a"]) is None
+    entry = cache.get_entry(["a"])
+    assert entry.value == {"rows": [1]}
+    assert entry.stored_at == 1000.0
+    assert not cache.is_fresh(entry)
+
+
+def test_eviction_drops_least_recently_used_first(tmp_path):
+    cache = _cache(tmp_path)
+    for index, key in enumerate("abc"):
+        cache.set([key], "x" * 2000)
+        os.utime(cache._path_for([key]), (1000 + index, 1000 + index))
+    size = cache._path_for(["a"]).stat().st_size
+    # Reading "a" makes it the most recently used entry.
+    assert cache.get(["a"]) is not None
+
+    # Entry sizes vary by a few bytes with the stored_at timestamp.
+    cache.max_bytes = 3 * size + size // 2
+    cache.set(["d"], "x" * 2000)
+
+    assert cache.get(["b"]) is None
+    assert cache.get(["a"]) is not None
+    assert cache.get(["c"]) is not None
+    assert cache.get(["d"]) is not None
+
+
+def test_writes_below_the_cap_do_not_list_the_folder(tmp_path, monkeypatch):
+    cache = _cache(tmp_path)
+    cache.set(["a"], 1)
+    monkeypatch.setattr(cache, "_evict", lambda: pytest.fail("unexpected eviction"))
+    for index in range(20):
+        cache.set([str(index)], index)
+
+
+def test_corrupt_entries_are_discarded(tmp_path):
+    cache = _cache(tmp_path)
+    cache.set(["a"], 1)
+    path = cache._path_for(["a"])
+    path.write_bytes(b"not gzip")
+
+    assert cache.get_entry(["a"]) is None
+    assert not path.exists()
+
+
+def test_failed_replace_keeps_previous_entry_and_no_temp_files(tmp_path, monkeypatch):
+    cache = _cache(tmp_path)
+    cache.set(["a"], "old")
+
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(disk_cache.os, "replace", failing_replace)
+    cache.set(["a"], "new")
+
+    assert cache.get(["a"]) == "old"
+    assert list(cache.folder.glob("*.tmp")) == []
@@ -0,0 +1,98 @@
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from bs4 import BeautifulSoup
+
+from app.models.entities import CompanyRecord
+from app.services.supersoc_search import SupersocSearchService, _page_title
+from app.utils.html_tables import extract_table_rows
+from app.utils.text import normalize_nit
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _page(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def _reference_results(text):
+    """The BeautifulSoup extraction the streaming parser replaced."""
+    rows = []
+    for tr in BeautifulSoup(text, "html.parser").select("table tr"):
+        cells = tr.find_all("td")
+        if len(cells) < 5:
+            continue
+        anchor = cells[0].find("a")
+        nit = normalize_nit(anchor.get_text(strip=True) if anchor else cells[0].get_text(strip=True))
+        if not nit and anchor and anchor.has_attr("href"):
+            nit = normalize_nit((parse_qs(urlparse(anchor["href"]).query).get("nit") or [""])[0])
+        if not nit:
+            continue
+        rows.append(
+            CompanyRecord(
+                nit=nit,
+                razon_social=cells[1].get_text(" ", strip=True),
+                estado=cells[2].get_text(" ", strip=True),
+                etapa_situacion=cells[3].get_text(" ", strip=True),
+                dependencia=cells[4].get_text(" ", strip=True),
+            )
+        )
+    return rows
+
+
+def _reference_detail_fields(text):
+    fields = {}
+    for table in BeautifulSoup(text, "html.parser").select("table"):
+        for row in table.select("tr"):
+            header, value = row.find("th"), row.find("td")
+            if header and value:
+                fields[header.get_text(" ", strip=True).lower()] = value.get_text(" ", strip=True)
+    return fields
+
+
+def _streaming_detail_fields(text):
+    fields = {}
+    for row in extract_table_rows(text):
+        header, value = row.first("th"), row.first("td")
+        if header and value:
+            fields[header.text().lower()] = value.text()
+    return fields
+
+
+@pytest.mark.parametrize("name", ["superwas_resultados.html", "superwas_detalle.html"])
+def test_streaming_parser_matches_beautifulsoup(name):
+    text = _page(name)
+    soup = BeautifulSoup(text, "html.parser")
+
+    assert _page_title(text) == soup.title.string.strip()
+    assert SupersocSearchService._parse_result_rows(extract_table_rows(text)) == _reference_results(text)
+    assert _streaming_detail_fields(text) == _reference_detail_fields(text)
+
+
+def test_result_rows_read_nits_from_text_or_href_only():
+    records = SupersocSearchService._parse_result_rows(extract_table_rows(_page("superwas_resultados.html")))
+    by_nit = {record.nit: record for record in records}
+
+    assert by_nit["800123456"].razon_social.startswith("Compañía Ejemplo S.A.S.")
+    assert by_nit["900555111"].razon_social == "INVERSIONES LA & CIA LTDA"
+    assert by_nit["900555111"].estado == "EN LIQUIDACION"
+    assert by_nit["901234567"].estado == "INACTIVA DESDE 2020"
+    # Script and comment markup never produce rows.
+    assert not {"900000000", "800999999"} & set(by_nit)
+    assert "860000001" not in by_nit
+
+
+def test_detail_page_fields():
+    company = SupersocSearchService._parse_detail_page(
+        extract_table_rows(_page("superwas_detalle.html")), fallback_nit="1"
+    )
+
+    assert company == CompanyRecord(
+        nit="890900240",
+        razon_social="GRUPO ARGOS S.A.",
+        estado="ACTIVA",
+        etapa_situacion="SIN ETAPA",
+        dependencia="Grupo Empresarial Bogota",
+        expediente="3\xa0416",
+    )
@@ -1,4 +1,13 @@
-﻿from app.finance.indicators import compute_year_snapshot, z_altman_zone
+﻿from app.config import DEP_AMORT_CONTAINS, INCOME_CONCEPT_PATTERNS, OPERATING_EXPENSE_CONTAINS
+from app.finance.concept_matcher import ConceptMatcher
+from app.finance.indicators import (
+    INCOME_MATCHER,
+    LazySnapshot,
+    _find_value,
+    _sum_if_contains,
+    compute_year_snapshot,
+    z_altman_zone,
+)
 
 
 def test_compute_year_snapshot_basic_metrics():
@@ -69,6 +78,82 @@ def test_compute_year_snapshot_debt_prefers_explicit_total():
     assert warnings == []
 
 
+def test_debt_collapses_repeated_lines_before_adding_components():
+    balance = {
+        "obligaciones financieras corrientes": 250,
+        "otras obligaciones financieras corrientes": 250.3,
+        "prestamos no corrientes": 350,
+        "proveedores": 999,
+        "pasivos financieros largo plazo": None,
+    }
+
+    _, _, _, metrics, _ = compute_year_snapshot({}, balance, {})
+    assert metrics["deuda"] == 600.3
+
+
+def test_compute_year_snapshot_only_computes_requested_metrics():
+    income = {"ingresos de actividades ordinarias": 1000, "utilidad operacional": 200}
+    balance = {"total de activos": 2000, "total pasivos": 900, "deuda total": 510}
+
+    income_statement, balance_sheet, cash_flow, metrics, warnings = compute_year_snapshot(
+        income, balance, {}, metrics=["ingresos", "balance_general"]
+    )
+    full_metrics = compute_year_snapshot(income, balance, {})[3]
+
+    assert metrics == {"ingresos": 1000, "balance_general": 2000}
+    assert metrics == {key: full_metrics[key] for key in metrics}
+    full_statements = compute_year_snapshot(income, balance, {})[:3]
+    assert (income_statement, balance_sheet, cash_flow) == full_statements
+    assert warnings == []
+
+    _, balance_sheet, _, metrics, _ = compute_year_snapshot(income, balance, {}, metrics=["deuda"])
+    assert metrics == {"deuda": 510}
+    assert balance_sheet["activos_totales"] == 2000
+
+    snapshot = LazySnapshot(income, balance, {})
+    assert snapshot["ebitda"] == 200
+    assert not snapshot.evaluated("deuda")
+
+
+def test_concept_matcher_matches_first_match_semantics():
+    income = {
+        "otros ingresos": 5,
+        "ingresos operacionales netos": 900,
+        "utilidad operacional": 210,
+        "resultado operacional antes de impuestos": 190,
+        "depreciacion y amortizacion": 40,
+        "amortizacion de intangibles": 10,
+        "gastos de ventas": 70,
+        "resultado del periodo": 80,
+    }
+    for concepts in (income, dict(reversed(list(income.items()))), {}):
+        match = INCOME_MATCHER.match(concepts)
+        for role, patterns in INCOME_CONCEPT_PATTERNS.items():
+            assert match.value(concepts, role) == _find_value(concepts, patterns.exact, patterns.contains)
+        assert match.total(concepts, "dep_amort") == _sum_if_contains(concepts, DEP_AMORT_CONTAINS)
+        assert match.total(concepts, "gastos_operacionales") == _sum_if_contains(
+            concepts, OPERATING_EXPENSE_CONTAINS
+        )
+
+    assert INCOME_MATCHER.match(income).first["ingresos"] == "ingresos operacionales netos"
+    assert INCOME_MATCHER.match(income).summed["dep_amort"] == (
+        "depreciacion y amortizacion",
+        "amortizacion de intangibles",
+    )
+
+
+def test_concept_matcher_reuses_layouts_by_ordered_keys():
+    matcher = ConceptMatcher(INCOME_CONCEPT_PATTERNS)
+    first = {"ingresos financieros": 1.0, "ingresos operacionales": 2.0}
+    same_layout = {"ingresos financieros": 5.0, "ingresos operacionales": 7.0}
+    reordered = dict(reversed(list(first.items())))
+
+    assert matcher.match(first).value(first, "ingresos") == 2.0
+    assert matcher.match(same_layout).value(same_layout, "ingresos") == 7.0
+    assert matcher.match(reordered).first["ingresos"] == "ingresos operacionales"
+    assert matcher.layouts.stats() == {"hits": 1, "misses": 2, "size": 2, "hit_rate": 0.333}
+
+
 def test_z_altman_zone_thresholds():
     assert z_altman_zone(3.1) == "solida"
     assert z_altman_zone(1.5) == "gris"
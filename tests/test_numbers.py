@@ -0,0 +1,39 @@
+import math
+
+from app.utils.numbers import parse_amount, parse_amounts
+
+
+def test_parse_amounts_matches_parse_amount():
+    values = [
+        "1234",
+        "-0",
+        "12.50",
+        "(1.234,56)",
+        "$ 1,234.56",
+        "1,5",
+        " 42 ",
+        "",
+        "-",
+        "abc",
+        "1e5",
+        None,
+        7,
+        2.5,
+        float("nan"),
+        "multi\nline 3",
+    ]
+
+    amounts, missing = parse_amounts(values)
+
+    for raw, amount, is_missing in zip(values, amounts, missing):
+        expected = parse_amount(raw)
+        assert is_missing == (expected is None)
+        if expected is None:
+            assert math.isnan(amount)
+        else:
+            assert repr(float(amount)) == repr(expected)
+
+
+def test_parse_amounts_empty_column():
+    amounts, missing = parse_amounts([])
+    assert len(amounts) == 0 and len(missing) == 0
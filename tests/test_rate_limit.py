@@ -0,0 +1,56 @@
+from app.core import rate_limit
+from app.core.rate_limit import HostRateLimiter
+
+
+class _FrozenClock:
+    """Clock that only moves when told to; sleeps are recorded, not slept."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+
+
+def _patch(monkeypatch):
+    clock = _FrozenClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limit.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_requests_to_one_host_are_spaced_by_the_interval(monkeypatch):
+    clock = _patch(monkeypatch)
+    limiter = HostRateLimiter(rate_per_second=4)
+
+    # Three threads arriving together reserve consecutive slots.
+    for _ in range(3):
+        limiter.wait("https://superwas.supersociedades.gov.co/ConsultaGeneral")
+    assert clock.sleeps == [0.25, 0.5]
+
+    clock.now += 10
+    limiter.wait("https://superwas.supersociedades.gov.co/otra")
+    assert clock.sleeps == [0.25, 0.5]
+
+
+def test_hosts_do_not_wait_for_each_other(monkeypatch):
+    clock = _patch(monkeypatch)
+    limiter = HostRateLimiter(rate_per_second=1)
+
+    limiter.wait("https://superwas.supersociedades.gov.co/a")
+    limiter.wait("https://www.datos.gov.co/resource/x.json")
+    limiter.wait("https://superwas.supersociedades.gov.co/b")
+    assert clock.sleeps == [1.0]
+
+
+def test_non_positive_rate_disables_limiting(monkeypatch):
+    clock = _patch(monkeypatch)
+    limiter = HostRateLimiter(rate_per_second=0)
+
+    for _ in range(5):
+        limiter.wait("https://superwas.supersociedades.gov.co/a")
+    assert clock.sleeps == []
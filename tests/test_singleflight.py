@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+def _wait_for_waiters(flight, key, count):
+    deadline = time.monotonic() + 5
+    while flight._calls[key].waiters < count:
+        assert time.monotonic() < deadline, "waiters never joined"
+        time.sleep(0.001)
+
+
+def _start_waiters(flight, key, count, func):
+    outcomes = []
+
+    def waiter():
+        try:
+            outcomes.append(flight.do(key, func))
+        except BaseException as exc:
+            outcomes.append(exc)
+
+    threads = [threading.Thread(target=waiter) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def leader_func():
+        calls.append("leader")
+        release.wait(5)
+        return {"rows": [1, 2]}
+
+    leader_threads, leader_outcome = _start_waiters(flight, "k", 1, leader_func)
+    while "k" not in flight._calls:
+        time.sleep(0.001)
+    threads, outcomes = _start_waiters(flight, "k", 3, lambda: calls.append("waiter"))
+    _wait_for_waiters(flight, "k", 3)
+    release.set()
+    for thread in leader_threads + threads:
+        thread.join(5)
+
+    assert calls == ["leader"]
+    assert all(outcome is leader_outcome[0] for outcome in outcomes)
+    assert flight.do("other", lambda: "independent") == "independent"
+
+
+def test_waiters_receive_the_leaders_exception():
+    flight = SingleFlight()
+    release = threading.Event()
+    error = ValueError("portal caido")
+
+    def failing():
+        release.wait(5)
+        raise error
+
+    leader_threads, leader_outcome = _start_waiters(flight, "k", 1, failing)
+    while "k" not in flight._calls:
+        time.sleep(0.001)
+    threads, outcomes = _start_waiters(flight, "k", 2, lambda: "unused")
+    _wait_for_waiters(flight, "k", 2)
+    release.set()
+    for thread in leader_threads + threads:
+        thread.join(5)
+
+    assert leader_outcome == [error]
+    assert outcomes == [error, error]
+    assert "k" not in flight._calls
+
+
+def test_completed_keys_are_removed_and_run_again():
+    flight = SingleFlight()
+    calls = []
+
+    assert flight.do(("a", 1), lambda: calls.append(1) or "first") == "first"
+    assert flight._calls == {}
+    assert flight.do(("a", 1), lambda: calls.append(2) or "second") == "second"
+    assert calls == [1, 2]
+
+    with pytest.raises(KeyError):
+        flight.do(("a", 1), lambda: {}["missing"])
+    assert flight._calls == {}
@@ -0,0 +1,607 @@
+import csv
+import io
+import re
+import threading
+import time
+
+import pytest
+import requests
+
+from app.core.disk_cache import DiskCache
+from app.core.exceptions import ConnectivityError, DataUnavailableError
+from app.models.entities import StatementColumns
+from app.services import socrata_financials, socrata_mirror
+from app.services.socrata_financials import (
+    _REDUCED_PAYLOAD_FILTERS,
+    SocrataFinancialService,
+    _reduced_payload_filter,
+    _soql_like_pattern,
+)
+from app.services.socrata_mirror import SocrataMirror
+
+BALANCE = "pfdp-zks5"
+INCOME = "prwj-nzxa"
+CASHFLOW = "ctcp-462n"
+MIN_DATE = "2015-01-01T00:00:00"
+
+_QUOTED = r"'((?:[^']|'')*)'"
+_KEYSET_RE = re.compile(rf"fecha_corte < {_QUOTED} OR \(fecha_corte = {_QUOTED} AND :id > {_QUOTED}\)")
+_WATERMARK_RE = re.compile(
+    rf"fecha_corte > {_QUOTED} OR \(fecha_corte = {_QUOTED} AND numero_radicado > {_QUOTED}\)"
+)
+
+
+def _unquote(value):
+    return value.replace("''", "'")
+
+
+class _Response:
+    def __init__(self, data=None, text=None):
+        self.data = data
+        self.text = text
+        self.status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class FakeSoqlSession:
+    """Answers the SoQL queries the service sends, over in-memory rows.
+
+    Understands the nit filters, ``fecha_corte >=``, the keyset and watermark
+    predicates, ``count(*)``, ``$offset`` and the ``.csv`` resource. ``on_count``
+    runs right after a count is answered, to simulate concurrent publication.
+    ``resources`` records the extension of every request.
+    """
+
+    def __init__(self, datasets=None):
+        self.datasets = {dataset_id: list(rows) for dataset_id, rows in (datasets or {}).items()}
+        self.calls = []
+        self.resources = []
+        self.headers = {}
+        self.on_count = None
+        self._lock = threading.Lock()
+
+    def mount(self, *args):
+        pass
+
+    def get(self, url, params=None, timeout=None):
+        params = dict(params or {})
+        dataset_id, extension = url.rsplit("/", 1)[1].split(".")
+        with self._lock:
+            self.calls.append((dataset_id, params))
+            self.resources.append(extension)
+            rows = self._select(self.datasets.get(dataset_id, []), params.get("$where", ""))
+
+        if params["$select"].startswith("count("):
+            response = _Response([{"total": str(len(rows))}])
+            if self.on_count is not None:
+                self.on_count()
+            return response
+
+        offset = int(params.get("$offset", 0))
+        rows = rows[offset : offset + int(params["$limit"])]
+        columns = params["$select"].split(",")
+        if extension == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            writer.writerows([row.get(column, "") for column in columns] for row in rows)
+            return _Response(text=buffer.getvalue())
+        return _Response([{column: row[column] for column in columns if column in row} for row in rows])
+
+    def pages_requested(self, dataset_id=BALANCE):
+        return [params for called, params in self.calls if called == dataset_id]
+
+    @staticmethod
+    def _select(rows, where):
+        single = re.search(r"nit=(\d+)", where)
+        many = re.search(r"nit in\(([^)]*)\)", where)
+        nits = {single.group(1)} if single else set(many.group(1).split(","))
+        min_date = re.search(rf"fecha_corte >= {_QUOTED}", where).group(1)
+        selected = [row for row in rows if row["nit"] in nits and row["fecha_corte"] >= min_date]
+
+        keyset = _KEYSET_RE.search(where)
+        if keyset:
+            date, _, row_id = (_unquote(value) for value in keyset.groups())
+            selected = [
+                row for row in selected
+                if row["fecha_corte"] < date or (row["fecha_corte"] == date and row[":id"] > row_id)
+            ]
+        watermark = _WATERMARK_RE.search(where)
+        if watermark:
+            date, _, radicado = (_unquote(value) for value in watermark.groups())
+            selected = [
+                row for row in selected
+                if row["fecha_corte"] > date or (row["fecha_corte"] == date and row["numero_radicado"] > radicado)
+            ]
+
+        selected.sort(key=lambda row: row[":id"])
+        selected.sort(key=lambda row: row["fecha_corte"], reverse=True)
+        return selected
+
+
+def _row(nit, year, index, radicado="1", concepto="Total de activos"):
+    return {
+        "nit": nit,
+        "fecha_corte": f"{year}-12-31T00:00:00.000",
+        "periodo": "Periodo Actual",
+        "concepto": concepto,
+        "valor": str(1000 + index),
+        "numero_radicado": radicado,
+        "id_punto_entrada": "1",
+        "punto_entrada": "Individual",
+        "id_taxonomia": "t",
+        "codigo_instancia": "1",
+        ":id": f"row-{nit}-{index:04d}",
+    }
+
+
+def _public(rows):
+    return [{key: value for key, value in row.items() if key != ":id"} for row in rows]
+
+
+def _service(tmp_path, session, **kwargs):
+    kwargs.setdefault("use_cache", False)
+    kwargs.setdefault("max_workers", 1)
+    service = SocrataFinancialService(mirror=SocrataMirror(path=tmp_path / "mirror.sqlite"), **kwargs)
+    service.session = session
+    return service
+
+
+class _HookedSession(FakeSoqlSession):
+    """``FakeSoqlSession`` that runs ``hooks[dataset_id]()`` before answering."""
+
+    def __init__(self, datasets, hooks):
+        super().__init__(datasets)
+        self.hooks = hooks
+
+    def get(self, url, params=None, timeout=None):
+        dataset_id = url.rsplit("/", 1)[1].split(".")[0]
+        self.hooks.get(dataset_id, lambda: None)()
+        return super().get(url, params=params, timeout=timeout)
+
+
+def _dataset_log(caplog):
+    return [
+        record.getMessage()
+        for record in caplog.records
+        if record.name == socrata_financials.__name__ and record.getMessage().startswith("Socrata dataset=")
+    ]
+
+
+def test_datasets_are_fetched_concurrently(tmp_path, caplog):
+    # Each request waits until all three are in flight, so a sequential
+    # fetch would time out the barrier.
+    barrier = threading.Barrier(3, timeout=5)
+    rows = {
+        BALANCE: [_row("800000001", 2023, 0)],
+        INCOME: [_row("800000001", 2023, 1, concepto="Ingresos"), _row("800000001", 2022, 2, concepto="Ingresos")],
+        CASHFLOW: [],
+    }
+    session = _HookedSession(rows, {dataset_id: barrier.wait for dataset_id in rows})
+    service = _service(tmp_path, session, max_workers=3)
+    caplog.set_level("INFO", logger=socrata_financials.__name__)
+
+    result = service.fetch_company_financial_rows("800000001")
+
+    assert {key: len(value) for key, value in result.items()} == {"balance": 1, "income": 2, "cashflow": 0}
+    assert result["income"] == _public(rows[INCOME])
+    assert _dataset_log(caplog) == [
+        "Socrata dataset=balance rows=1 nit=800000001",
+        "Socrata dataset=income rows=2 nit=800000001",
+        "Socrata dataset=cashflow rows=0 nit=800000001",
+    ]
+
+
+def test_first_dataset_failure_is_reraised_and_queued_datasets_are_cancelled(tmp_path, caplog):
+    # Two workers: balance fails once income is in flight, and cashflow is
+    # still queued when the failure cancels the rest.
+    income_started = threading.Event()
+    balance_failed = threading.Event()
+
+    def fail_balance():
+        assert income_started.wait(5)
+        balance_failed.set()
+        raise requests.ConnectionError("connection reset")
+
+    def slow_income():
+        income_started.set()
+        assert balance_failed.wait(5)
+        time.sleep(0.1)
+
+    rows = {BALANCE: [_row("800000001", 2023, 0)], INCOME: [_row("800000001", 2023, 1)], CASHFLOW: []}
+    session = _HookedSession(rows, {BALANCE: fail_balance, INCOME: slow_income})
+    service = _service(tmp_path, session, max_workers=2)
+    caplog.set_level("INFO", logger=socrata_financials.__name__)
+
+    with pytest.raises(ConnectivityError):
+        service.fetch_company_financial_rows("800000001")
+
+    assert session.pages_requested(INCOME)
+    assert session.pages_requested(CASHFLOW) == []
+    assert _dataset_log(caplog) == []
+
+
+@pytest.fixture
+def small_pages(monkeypatch):
+    monkeypatch.setattr(socrata_financials, "SOCRATA_PAGE_LIMIT", 3)
+
+
+@pytest.fixture
+def filer():
+    rows = [_row("900123456", 2018 + index % 5, index) for index in range(10)]
+    expected = sorted(rows, key=lambda row: row[":id"])
+    expected.sort(key=lambda row: row["fecha_corte"], reverse=True)
+    return rows, _public(expected)
+
+
+def test_prefetched_pages_are_reassembled_in_keyset_order(tmp_path, small_pages, filer):
+    rows, expected = filer
+    session = FakeSoqlSession({BALANCE: rows})
+    service = _service(tmp_path, session, page_concurrency=3)
+
+    assert service._download_dataset_rows(BALANCE, "900123456", MIN_DATE) == expected
+
+    requests_sent = session.pages_requested()
+    assert requests_sent[1]["$select"] == "count(*) AS total"
+    assert sorted(params.get("$offset") for params in requests_sent[2:]) == [3, 6, 9]
+
+    sequential = _service(tmp_path, FakeSoqlSession({BALANCE: rows}), page_concurrency=1)
+    assert sequential._download_dataset_rows(BALANCE, "900123456", MIN_DATE) == expected
+
+
+def test_rows_published_after_the_count_do_not_duplicate_offset_boundaries(tmp_path, small_pages, filer):
+    rows, expected = filer
+    session = FakeSoqlSession({BALANCE: rows[:9]})
+    newer = _row("900123456", 2024, 99)
+    session.on_count = lambda: session.datasets[BALANCE].append(newer)
+    service = _service(tmp_path, session, page_concurrency=2)
+
+    result = service._download_dataset_rows(BALANCE, "900123456", MIN_DATE)
+
+    # The new filing shifts every offset page by one row: page 3 repeats the
+    # last row of page 0 and the final page spills one row past the count,
+    # which the keyset continuation fetches.
+    original = [row for row in expected if row["valor"] != "1009"]
+    assert result == original
+    keyset_requests = [params for params in session.pages_requested() if ":id >" in params["$where"]]
+    assert len(keyset_requests) == 1
+
+
+class _Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock(1000.0)
+    monkeypatch.setattr(socrata_financials.time, "time", clock)
+    return clock
+
+
+def _cached_service(tmp_path, session, ttl=10.0):
+    cache = DiskCache("socrata", ttl_seconds=ttl, max_bytes=10_000_000, root=tmp_path / "cache")
+    return _service(tmp_path, session, cache=cache, page_concurrency=1)
+
+
+def _watermark_requests(session):
+    return [params for params in session.pages_requested() if "numero_radicado >" in params["$where"]]
+
+
+def test_expired_entry_is_topped_up_past_the_watermark(tmp_path, clock):
+    stored = [_row("900123456", 2019 + index % 3, index) for index in range(6)]
+    session = FakeSoqlSession({BALANCE: stored})
+    service = _cached_service(tmp_path, session)
+    first = service._fetch_dataset_rows(BALANCE, "900123456", MIN_DATE)
+
+    clock.now += 5
+    assert service._fetch_dataset_rows(BALANCE, "900123456", MIN_DATE) == first
+    assert len(session.calls) == 1
+
+    newer = [_row("900123456", 2022, 10), _row("900123456", 2022, 11, radicado="2")]
+    session.datasets[BALANCE].extend(newer)
+    clock.now += 60
+    rows = service._fetch_dataset_rows(BALANCE, "900123456", MIN_DATE)
+
+    (params,) = _watermark_requests(session)
+    assert "fecha_corte > '2021-12-31T00:00:00.000'" in params["$where"]
+    assert "numero_radicado > '1'" in params["$where"]
+    assert rows == _public(newer) + first
+
+
+def test_top_ups_keep_the_full_sync_time_until_a_full_resync(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(socrata_financials, "SOCRATA_FULL_RESYNC_SECONDS", 100)
+    session = FakeSoqlSession({BALANCE: [_row("900123456", 2020, 0)]})
+    service = _cached_service(tmp_path, session)
+    cache_key = service._cache_key(BALANCE, "900123456", MIN_DATE)
+    service._fetch_dataset_rows(BALANCE, "900123456", MIN_DATE)
+
+    for step in range(1, 4):
+        clock.now += 30
+        session.datasets[BALANCE].append(_row("900123456", 2020 + step, step))
+        service._fetch_dataset_rows(BALANCE, "900123456", MIN_DATE)
+        assert service.cache.get_entry(cache_key).value["full_sync_at"] == 1000.0
+    assert len(_watermark_requests(session)) == 3
+
+    clock.now += 30
+    requests_before = len(session.calls)
+    rows = service._fetch_dataset_rows(BALANCE, "900123456", MIN_DATE)
+
+    assert [params["$where"] for params in session.pages_requested()[requests_before:]] == [
+        f"nit=900123456 AND fecha_corte >= '{MIN_DATE}'"
+    ]
+    assert service.cache.get_entry(cache_key).value["full_sync_at"] == clock.now
+    assert [row["valor"] for row in rows] == ["1003", "1002", "1001", "1000"]
+
+
+def test_watermark_quotes_are_escaped(tmp_path, clock):
+    session = FakeSoqlSession({BALANCE: [_row("900123456", 2021, 0, radicado="R'1")]})
+    service = _cached_service(tmp_path, session)
+    service._fetch_dataset_rows(BALANCE, "900123456", MIN_DATE)
+
+    newer = _row("900123456", 2021, 1, radicado="R'2")
+    session.datasets[BALANCE].append(newer)
+    clock.now += 60
+    rows = service._fetch_dataset_rows(BALANCE, "900123456", MIN_DATE)
+
+    (params,) = _watermark_requests(session)
+    assert "numero_radicado > 'R''1'" in params["$where"]
+    assert [row["numero_radicado"] for row in rows] == ["R'2", "R'1"]
+
+
+def _load_mirror(mirror, dataset_id, rows):
+    fields = socrata_mirror.ROW_FIELDS
+    mirror._load_rows(dataset_id, [fields] + [[row[field] for field in fields] for row in rows])
+
+
+def test_fetch_many_splits_batches_per_nit_and_mixes_cache_and_mirror(tmp_path, monkeypatch):
+    monkeypatch.setattr(socrata_financials, "SOCRATA_NIT_BATCH_SIZE", 2)
+    nits = ["800000001", "800000002", "800000003", "800000004", "800000005"]
+    balance = {nit: [_row(nit, 2023, index), _row(nit, 2022, index + 1)] for index, nit in enumerate(nits[:4])}
+    session = FakeSoqlSession({BALANCE: [row for rows in balance.values() for row in rows]})
+    service = _cached_service(tmp_path, session, ttl=3600)
+    min_date = service._min_date(socrata_financials.DEFAULT_LOOKBACK_YEARS)
+
+    cached_balance = _public(balance[nits[0]][:1])
+    service._store_rows(service._cache_key(BALANCE, nits[0], min_date), cached_balance, time.time())
+    income = [_row(nit, 2023, 50 + index, concepto="Ingresos") for index, nit in enumerate(nits[:2])]
+    _load_mirror(service.mirror, INCOME, income)
+
+    result = service.fetch_many(nits + ["800.000.002"])
+
+    assert list(result) == nits
+    assert result[nits[0]]["balance"] == cached_balance
+    for nit in nits[1:4]:
+        assert result[nit]["balance"] == _public(balance[nit])
+    assert result[nits[4]]["balance"] == []
+    assert result[nits[0]]["income"] == _public(income[:1])
+    assert all(result[nit]["income"] == [] for nit in nits[2:])
+    assert all(result[nit]["cashflow"] == [] for nit in nits)
+
+    assert [params["$where"].split(" AND ")[0] for params in session.pages_requested(BALANCE)] == [
+        "nit in(800000002,800000003)",
+        "nit in(800000004,800000005)",
+    ]
+    # NITs the mirror holds no rows for may have filed after the export.
+    assert [params["$where"].split(" AND ")[0] for params in session.pages_requested(INCOME)] == [
+        "nit in(800000003,800000004)",
+        "nit in(800000005)",
+    ]
+    assert len(session.pages_requested(CASHFLOW)) == 3
+    assert service._cached_rows(service._cache_key(BALANCE, nits[4], min_date)) == []
+    assert service._cached_rows(service._cache_key(BALANCE, nits[2], min_date)) == _public(balance[nits[2]])
+
+
+def test_mirror_answers_only_for_nits_it_holds(tmp_path):
+    mirrored = _row("800000001", 2023, 0)
+    online = _row("800000002", 2023, 1)
+    session = FakeSoqlSession({BALANCE: [mirrored, online]})
+    service = _service(tmp_path, session)
+    _load_mirror(service.mirror, BALANCE, [mirrored])
+
+    assert service._fetch_dataset_rows(BALANCE, "800000001", MIN_DATE) == _public([mirrored])
+    assert session.calls == []
+    assert service._fetch_dataset_rows(BALANCE, "800000002", MIN_DATE) == _public([online])
+    assert len(session.calls) == 1
+
+
+def test_stale_mirror_is_bypassed(tmp_path):
+    row = _row("800000001", 2023, 0)
+    session = FakeSoqlSession({BALANCE: [row]})
+    service = _service(tmp_path, session)
+    _load_mirror(service.mirror, BALANCE, [row])
+    service.mirror.max_age_seconds = -1
+
+    assert service._fetch_dataset_rows(BALANCE, "800000001", MIN_DATE) == _public([row])
+    assert len(session.calls) == 1
+
+
+def test_iter_dataset_pages_streams_keyset_pages_lazily(tmp_path, small_pages, clock, filer):
+    rows, expected = filer
+    session = FakeSoqlSession({BALANCE: rows})
+    service = _cached_service(tmp_path, session)
+    min_date = service._min_date(socrata_financials.DEFAULT_LOOKBACK_YEARS)
+
+    pages = service.iter_dataset_pages("900.123.456", "balance")
+    assert session.calls == []
+    first = next(pages)
+    assert len(session.calls) == 1
+    streamed = [first] + list(pages)
+
+    assert [len(page) for page in streamed] == [3, 3, 3, 1]
+    assert [row for page in streamed for row in page] == expected
+    wheres = [params["$where"] for params in session.pages_requested()]
+    assert ":id >" not in wheres[0]
+    assert all("fecha_corte < " in where for where in wheres[1:])
+    # Streamed downloads are never held whole, so they are not cached.
+    assert service._cached_rows(service._cache_key(BALANCE, "900123456", min_date)) is None
+
+
+def test_iter_dataset_pages_serves_mirror_and_cache_as_one_page(tmp_path, clock):
+    mirrored = [_row("800000001", 2023, 0), _row("800000001", 2022, 1)]
+    cached = [_row("800000002", 2023, 2)]
+    session = FakeSoqlSession({BALANCE: mirrored + cached})
+    service = _cached_service(tmp_path, session)
+    min_date = service._min_date(socrata_financials.DEFAULT_LOOKBACK_YEARS)
+    _load_mirror(service.mirror, BALANCE, mirrored)
+    service._store_rows(service._cache_key(BALANCE, "800000002", min_date), _public(cached), clock.now)
+
+    assert list(service.iter_dataset_pages("800000001", "balance")) == [_public(mirrored)]
+    assert list(service.iter_dataset_pages("800000002", "balance")) == [_public(cached)]
+    assert session.calls == []
+    with pytest.raises(DataUnavailableError):
+        next(service.iter_dataset_pages("abc", "balance"))
+
+
+def _csv_pages(service, nit):
+    cache_key = service._cache_key(BALANCE, nit, MIN_DATE) + ("csv",)
+    return service.cache.get_entry(cache_key).value["pages"]
+
+
+def test_csv_columns_fill_and_top_up_the_cache(tmp_path, small_pages, clock, filer):
+    rows, expected = filer
+    session = FakeSoqlSession({BALANCE: rows})
+    service = _cached_service(tmp_path, session)
+
+    columns = service._fetch_dataset_columns(BALANCE, "900123456", MIN_DATE)
+    assert columns == StatementColumns.from_rows(expected)
+    assert set(session.resources) == {"csv"}
+    assert len(session.calls) == 4
+    assert len(_csv_pages(service, "900123456")) == 4
+
+    clock.now += 5
+    assert service._fetch_dataset_columns(BALANCE, "900123456", MIN_DATE) == columns
+    assert len(session.calls) == 4
+
+    newer = [_row("900123456", 2023, 20), _row("900123456", 2023, 21, radicado="2")]
+    session.datasets[BALANCE].extend(newer)
+    clock.now += 60
+    topped_up = service._fetch_dataset_columns(BALANCE, "900123456", MIN_DATE)
+
+    (params,) = _watermark_requests(session)
+    assert "fecha_corte > '2022-12-31T00:00:00.000'" in params["$where"]
+    assert "numero_radicado > '1'" in params["$where"]
+    assert topped_up == StatementColumns.from_rows(_public(newer) + expected)
+    assert len(_csv_pages(service, "900123456")) == 5
+    assert service._cached_rows(service._cache_key(BALANCE, "900123456", MIN_DATE)) is None
+
+    clock.now += 5
+    assert service._fetch_dataset_columns(BALANCE, "900123456", MIN_DATE) == topped_up
+    assert len(session.calls) == 5
+
+
+def test_columns_reuse_fresh_rows_from_a_row_download(tmp_path, clock):
+    session = FakeSoqlSession({BALANCE: [_row("800000001", 2023, 0), _row("800000001", 2022, 1)]})
+    service = _cached_service(tmp_path, session)
+
+    rows = service.fetch_company_financial_rows("800000001")
+    assert len(session.calls) == 3
+
+    columns = service.fetch_company_financial_columns("800000001")
+    assert list(columns["balance"].fecha_corte) == ["2023-12-31T00:00:00.000", "2022-12-31T00:00:00.000"]
+    assert list(columns["balance"].valor) == [1000.0, 1001.0]
+    assert columns["balance"] == StatementColumns.from_rows(rows["balance"])
+    assert len(session.calls) == 3
+
+
+class _RecordingFlight:
+    def __init__(self):
+        self.keys = []
+
+    def do(self, key, func):
+        self.keys.append(key)
+        return func()
+
+
+def test_concurrent_fetches_coalesce_on_nit_window_and_payload(tmp_path, monkeypatch):
+    flight = _RecordingFlight()
+    monkeypatch.setattr(socrata_financials, "_IN_FLIGHT", flight)
+    session = FakeSoqlSession({BALANCE: [_row("800000001", 2023, 0)]})
+    service = _service(tmp_path, session)
+    min_date = service._min_date(socrata_financials.DEFAULT_LOOKBACK_YEARS)
+
+    service.fetch_company_financial_rows("800.000.001-5")
+    service.fetch_company_financial_columns("800000001")
+    service.fetch_company_financial_rows("800000001", lookback_years=10)
+    _service(tmp_path, session, reduced_payload=True).fetch_company_financial_rows("800000001")
+
+    assert flight.keys == [
+        ("socrata.rows", "800000001", min_date, False),
+        ("socrata.columns", "800000001", min_date, False),
+        ("socrata.rows", "800000001", service._min_date(10), False),
+        ("socrata.rows", "800000001", min_date, True),
+    ]
+
+
+_PERIOD_FILTER = "(periodo IS NULL OR upper(periodo) not like '%ANTERIOR%')"
+
+
+def _like_patterns(soql_filter):
+    return [_unquote(pattern) for pattern in re.findall(rf"upper\(concepto\) like {_QUOTED}", soql_filter)]
+
+
+def _like_matches(pattern, text):
+    regex = "".join(".*" if char == "%" else "." if char == "_" else re.escape(char) for char in pattern)
+    return re.fullmatch(regex, text, re.DOTALL) is not None
+
+
+@pytest.mark.parametrize(
+    "needle, expected",
+    [
+        ("ingresos", "%_NGR_S_S%"),
+        ("gastos de ventas", "%G_ST_S%D_%V_NT_S%"),
+        ("ganancia (perdida)", "%G_N_NC__%(P_RD_D_)%"),
+        ("d'luis 2", "%D''L__S%2%"),
+    ],
+)
+def test_soql_like_pattern_wildcards_vowels_and_spaces(needle, expected):
+    assert _soql_like_pattern(needle) == expected
+
+
+def test_reduced_payload_filter_drops_needles_containing_a_shorter_one():
+    soql_filter = _reduced_payload_filter(
+        ["Ganancia (pérdida)", "ganancia", "UTILIDAD NETA", "  ", "utilidad", "o'brien"]
+    )
+
+    # Shortest needles first; "ganancia (perdida)" and "utilidad neta" add nothing.
+    assert _like_patterns(soql_filter) == ["%_'BR__N%", "%G_N_NC__%", "%_T_L_D_D%"]
+    assert "like '%_''BR__N%'" in soql_filter
+    assert soql_filter.endswith(f") AND {_PERIOD_FILTER}")
+
+
+@pytest.mark.parametrize(
+    "dataset_id, label",
+    [
+        (BALANCE, "Total de activos"),
+        (BALANCE, "Obligaciones financieras corrientes"),
+        (BALANCE, "Patrimonio total"),
+        (INCOME, "Ingresos de actividades ordinarias"),
+        (INCOME, "Ganancia (pérdida)"),
+        (INCOME, "Ganancia (pérdida) por actividades de operación"),
+        (INCOME, "Depreciación"),
+        (INCOME, "Amortización de activos intangibles"),
+        (INCOME, "Gastos de administración"),
+        (CASHFLOW, "Incremento (disminución) neto en el efectivo y equivalentes al efectivo"),
+    ],
+)
+def test_reduced_payload_filters_keep_accented_concept_labels(dataset_id, label):
+    soql_filter = _REDUCED_PAYLOAD_FILTERS[dataset_id]
+
+    assert any(_like_matches(pattern, label.upper()) for pattern in _like_patterns(soql_filter))
+    assert soql_filter.endswith(f") AND {_PERIOD_FILTER}")
+
+
+def test_reduced_payload_filters_prune_unused_concepts():
+    patterns = _like_patterns(_REDUCED_PAYLOAD_FILTERS[BALANCE])
+
+    assert not any(_like_matches(pattern, "INVENTARIOS") for pattern in patterns)
+    assert _like_matches("%T_T_L%D_%_CT_V_S%", "TOTAL DE ACTIVOS")
+    assert not _like_matches("%T_T_L%D_%_CT_V_S%", "TOTAL PASIVOS")
@@ -0,0 +1,153 @@
+import io
+
+import pytest
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+
+from app.core.exceptions import ConnectivityError, SourceFormatError
+from app.services import socrata_mirror
+from app.services.socrata_mirror import SocrataMirror, _clean_amount, _iso_date, _resolve_columns
+
+BALANCE = "pfdp-zks5"
+EXPORT_HEADER = [
+    "NIT",
+    "Razon Social",
+    "Fecha de Corte",
+    "Periodo",
+    "Concepto",
+    "Valor",
+    "Número Radicado",
+    "Id Punto Entrada",
+    "Punto Entrada",
+    "Id Taxonomia",
+    "Codigo Instancia",
+]
+
+
+def _export_record(nit, fecha, valor, name="ACME S.A.S.", radicado="1"):
+    return [nit, name, fecha, "Periodo Actual", "Total de activos", valor, radicado, "1", "Individual", "t", "1"]
+
+
+def test_resolve_columns_matches_display_names():
+    positions = _resolve_columns(EXPORT_HEADER)
+
+    assert positions["nit"] == 0
+    assert positions["razon_social"] == 1
+    assert positions["fecha_corte"] == 2
+    assert positions["numero_radicado"] == 6
+    assert positions["codigo_instancia"] == 10
+    assert _resolve_columns(socrata_mirror.ROW_FIELDS)["valor"] == 4
+
+
+def test_resolve_columns_lists_missing_fields():
+    with pytest.raises(SourceFormatError, match="valor, numero_radicado"):
+        _resolve_columns([name for name in EXPORT_HEADER if name not in ("Valor", "Número Radicado")])
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("2022-12-31T00:00:00.000", "2022-12-31T00:00:00.000"),
+        ("12/31/2022 12:00:00 AM", "2022-12-31T00:00:00.000"),
+        ("12/31/2022", "2022-12-31T00:00:00.000"),
+        ("2022/12/31", "2022-12-31T00:00:00.000"),
+        ("31/12/2022", "2022-12-31T00:00:00.000"),
+        (" sin fecha ", "sin fecha"),
+    ],
+)
+def test_iso_date(raw, expected):
+    assert _iso_date(raw) == expected
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("1,234,567", "1234567"),
+        ("-1,234.50", "-1234.50"),
+        (" 987 ", "987"),
+        ("1234,5", "1234,5"),
+        ("12,34", "12,34"),
+    ],
+)
+def test_clean_amount(raw, expected):
+    assert _clean_amount(raw) == expected
+
+
+def test_load_rows_round_trips_through_fetch_rows(tmp_path):
+    mirror = SocrataMirror(path=tmp_path / "mirror.sqlite")
+    assert not mirror.has_dataset(BALANCE)
+
+    count = mirror._load_rows(
+        BALANCE,
+        [
+            EXPORT_HEADER,
+            _export_record("800.123.456-1", "12/31/2021", "1,500,000"),
+            _export_record("800123456", "12/31/2023 12:00:00 AM", "2,000"),
+            _export_record("800123456", "12/31/2015", "10"),
+            _export_record("900999999", "12/31/2023", "7", name="OTRA S.A."),
+            _export_record("", "12/31/2023", "1"),
+            ["800123456", "incompleta"],
+        ],
+    )
+
+    assert count == 4
+    assert mirror.has_dataset(BALANCE)
+    rows = mirror.fetch_rows(BALANCE, "800123456", "2019-01-01T00:00:00")
+    assert [(row["fecha_corte"], row["valor"]) for row in rows] == [
+        ("2023-12-31T00:00:00.000", "2000"),
+        ("2021-12-31T00:00:00.000", "1500000"),
+    ]
+    assert rows[0]["nit"] == "800123456"
+    assert set(rows[0]) == set(socrata_mirror.ROW_FIELDS)
+    assert sorted(mirror.iter_companies()) == [("800123456", "ACME S.A.S."), ("900999999", "OTRA S.A.")]
+
+    mirror._load_rows(BALANCE, [EXPORT_HEADER, _export_record("800123456", "12/31/2024", "3")])
+    assert [row["valor"] for row in mirror.fetch_rows(BALANCE, "800123456", "2019-01-01T00:00:00")] == ["3"]
+
+
+def test_stale_datasets_are_not_served(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(socrata_mirror.time, "time", lambda: now[0])
+    path = tmp_path / "mirror.sqlite"
+    SocrataMirror(path=path)._load_rows(BALANCE, [EXPORT_HEADER, _export_record("800123456", "12/31/2023", "1")])
+
+    mirror = SocrataMirror(path=path, max_age_seconds=100)
+    assert mirror.has_dataset(BALANCE)
+    now[0] += 101
+    assert not mirror.has_dataset(BALANCE)
+    assert not mirror.has_dataset("prwj-nzxa")
+
+
+class _BrokenStream(io.RawIOBase):
+    def __init__(self, error):
+        self.error = error
+        self.decode_content = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        raise self.error
+
+
+class _StreamingSession:
+    def __init__(self, error):
+        self.headers = {}
+        self.error = error
+
+    def get(self, url, stream=False, timeout=None):
+        response = type("Response", (), {})()
+        response.raise_for_status = lambda: None
+        response.raw = _BrokenStream(self.error)
+        return response
+
+
+@pytest.mark.parametrize(
+    "error",
+    [ProtocolError("Connection broken"), ReadTimeoutError(None, "/rows.csv", "Read timed out.")],
+)
+def test_ingest_wraps_stream_errors(tmp_path, error):
+    mirror = SocrataMirror(path=tmp_path / "mirror.sqlite")
+
+    with pytest.raises(ConnectivityError):
+        mirror.ingest("balance", session=_StreamingSession(error))
+    assert not mirror.has_dataset(BALANCE)
@@ -0,0 +1,179 @@
+import threading
+
+import pytest
+
+from app.core.exceptions import CompanyNotFoundError, ConnectivityError
+from app.models.entities import CompanyRecord
+from app.services import supersoc_search
+from app.services.company_index import CompanyNameIndex
+from app.services.supersoc_search import SupersocSearchService
+
+
+class _RecordingFlight:
+    def __init__(self):
+        self.keys = []
+
+    def do(self, key, func):
+        self.keys.append(key)
+        return func()
+
+
+def _service(tmp_path):
+    return SupersocSearchService(
+        persistent_cache=False, name_index=CompanyNameIndex(path=tmp_path / "index.json.gz")
+    )
+
+
+def _record(nit, name="ACME S.A.S.", estado="ACTIVA"):
+    return CompanyRecord(nit=nit, razon_social=name, estado=estado)
+
+
+@pytest.fixture
+def flight(monkeypatch):
+    flight = _RecordingFlight()
+    monkeypatch.setattr(supersoc_search, "_IN_FLIGHT", flight)
+    return flight
+
+
+def test_searches_coalesce_on_mode_and_normalized_query(tmp_path, flight, monkeypatch):
+    service = _service(tmp_path)
+    monkeypatch.setattr(service, "_fetch_by_nit", lambda nit: [_record(nit)])
+    monkeypatch.setattr(service, "_fetch_by_name", lambda name: [_record("800000009", name.upper())])
+
+    service.search_by_nit("800.000.001-5")
+    service.search_by_nit("800000001")
+    service.search_by_name("  Compañía  Ejemplo ")
+
+    assert flight.keys == [
+        ("supersoc", "nit", "800000001"),
+        ("supersoc", "nombre", "compania ejemplo"),
+    ]
+
+
+def test_resolve_many_reports_errors_per_nit_and_looks_up_each_nit_once(tmp_path, monkeypatch):
+    service = _service(tmp_path)
+    looked_up = []
+
+    def fetch_by_nit(nit):
+        looked_up.append(nit)
+        if nit == "800000002":
+            raise CompanyNotFoundError("No se encontro")
+        if nit == "800000003":
+            raise ConnectivityError("Sin conexion")
+        return [_record(nit)]
+
+    monkeypatch.setattr(service, "_fetch_by_nit", fetch_by_nit)
+    nits = ["800000001", "800.000.001-5", "800000002", "800000003", "abc"]
+    results = {result.nit: result for result in service.resolve_many(nits, max_workers=2)}
+
+    assert sorted(looked_up) == ["800000001", "800000002", "800000003"]
+    assert results["800000001"].ok and results["800000001"].company.nit == "800000001"
+    assert isinstance(results["800000002"].error, CompanyNotFoundError)
+    assert isinstance(results["800000003"].error, ConnectivityError)
+    assert isinstance(results["abc"].error, CompanyNotFoundError)
+    assert list(service.resolve_many([])) == []
+
+
+def test_resolve_many_writes_the_index_once_per_batch(tmp_path, monkeypatch):
+    service = _service(tmp_path)
+    saves = []
+    save = service.name_index.save
+
+    def recording_save():
+        saves.append(len(service.name_index))
+        save()
+
+    monkeypatch.setattr(service.name_index, "save", recording_save)
+    monkeypatch.setattr(service, "_fetch_by_nit", lambda nit: [_record(nit, name=f"EMPRESA {nit} S.A.S.")])
+
+    results = list(service.resolve_many([f"80000000{index}" for index in range(1, 6)], max_workers=3))
+
+    assert len(results) == 5
+    assert saves == [5]
+    assert len(CompanyNameIndex(path=service.name_index.path)) == 5
+
+    service.search_by_nit("800000009")
+    assert saves == [5]
+    service.close()
+    assert saves == [5, 6]
+    assert len(CompanyNameIndex(path=service.name_index.path)) == 6
+
+
+def test_resolve_many_yields_results_as_they_complete(tmp_path, monkeypatch):
+    service = _service(tmp_path)
+    release = threading.Event()
+
+    def search_by_nit(nit):
+        if nit == "800000001":
+            assert release.wait(5)
+        return [_record(nit)]
+
+    monkeypatch.setattr(service, "search_by_nit", search_by_nit)
+    results = service.resolve_many(["800000001", "800000002"], max_workers=2)
+
+    assert next(results).nit == "800000002"
+    release.set()
+    assert next(results).nit == "800000001"
+    assert list(results) == []
+
+
+ARGOS = CompanyRecord(nit="890900240", razon_social="GRUPO ARGOS S.A.", estado="ACTIVA")
+NUTRESA = CompanyRecord(nit="890900050", razon_social="GRUPO NUTRESA S.A.", estado="ACTIVA")
+ARGOS_HOLDING = CompanyRecord(nit="901000001", razon_social="GRUPO ARGOS HOLDING S.A.S.", estado="ACTIVA")
+
+
+def _portal(service, monkeypatch, outcome):
+    queries = []
+
+    def fetch_by_name(name):
+        queries.append(name)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return list(outcome)
+
+    monkeypatch.setattr(service, "_fetch_by_name", fetch_by_name)
+    return queries
+
+
+def test_partial_index_hits_still_ask_the_portal(tmp_path, monkeypatch):
+    service = _service(tmp_path)
+    service.name_index.add([ARGOS])
+    queries = _portal(service, monkeypatch, [ARGOS, NUTRESA])
+
+    assert service.search_by_name("grupo") == [ARGOS, NUTRESA]
+    assert queries == ["grupo"]
+    assert service.search_by_name("Grupo") == [ARGOS, NUTRESA]
+    assert queries == ["grupo"]
+
+
+def test_repeated_whole_name_searches_keep_every_portal_match(tmp_path, monkeypatch):
+    service = _service(tmp_path)
+    queries = _portal(service, monkeypatch, [ARGOS, ARGOS_HOLDING])
+
+    assert service.search_by_name("Grupo Argos") == [ARGOS, ARGOS_HOLDING]
+    # Both records are now indexed and "Grupo Argos" names the first one
+    # whole; the repeat still comes from the portal's cached answer.
+    assert service.search_by_name("Grupo Argos") == [ARGOS, ARGOS_HOLDING]
+    assert queries == ["Grupo Argos"]
+
+    assert service.search_by_name("grupo argos s.a.") == [ARGOS, ARGOS_HOLDING]
+    assert queries == ["Grupo Argos", "grupo argos s.a."]
+
+
+def test_index_answers_when_the_portal_is_unreachable(tmp_path, monkeypatch):
+    service = _service(tmp_path)
+    service.name_index.add([ARGOS])
+    _portal(service, monkeypatch, ConnectivityError("Sin conexion"))
+
+    assert service.search_by_name("grupo argo") == [ARGOS]
+    with pytest.raises(ConnectivityError):
+        service.search_by_name("cementos")
+
+
+def test_portal_not_found_is_not_masked_by_fuzzy_hits(tmp_path, monkeypatch):
+    service = _service(tmp_path)
+    service.name_index.add([ARGOS])
+    _portal(service, monkeypatch, CompanyNotFoundError("Sin coincidencias"))
+
+    with pytest.raises(CompanyNotFoundError):
+        service.search_by_name("grupo argoz")
@@ -0,0 +1,49 @@
+from app.core import ttl_cache
+from app.core.ttl_cache import TTLCache
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [50.0]
+    monkeypatch.setattr(ttl_cache.time, "monotonic", lambda: now[0])
+    cache = TTLCache(max_entries=4, ttl_seconds=10)
+    cache.set("a", [1])
+
+    now[0] += 10
+    assert cache.get("a") == [1]
+    now[0] += 0.5
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+    cache.set("a", 10)
+    cache.set("d", 4)
+    assert cache.get("c") is None
+    assert cache.get("a") == 10
+
+
+def test_setting_refreshes_the_expiry_and_clear_empties(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(ttl_cache.time, "monotonic", lambda: now[0])
+    cache = TTLCache(max_entries=0, ttl_seconds=5)
+    assert cache.max_entries == 1
+
+    cache.set("a", 1)
+    now[0] += 4
+    cache.set("a", 2)
+    now[0] += 4
+    assert cache.get("a") == 2
+
+    cache.clear()
+    assert cache.get("a") is None